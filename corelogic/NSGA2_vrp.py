@@ -1,12 +1,18 @@
 import os
 import io
+import sys
+import time
+import uuid
 import random
+import logging
+import threading
 import numpy
 import fnmatch
 import csv
 import array
 
 from csv import DictWriter
+from contextlib import nullcontext
 from json import load, dump
 from deap import base, creator, tools, algorithms, benchmarks
 from deap.benchmarks.tools import diversity, convergence, hypervolume
@@ -14,58 +20,211 @@ from deap.benchmarks.tools import diversity, convergence, hypervolume
 
 BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
-
-
-# Load the given problem, which can be a json file
+# Solver pieces shared with the Django app, the vrpcore package next to it
+sys.path.append(os.path.join(BASE_DIR, 'dronehackon'))
+from vrpcore.parallel import ParallelEvaluator
+from vrpcore.instancefile import isInstanceFile, readInstanceFile
+from vrpcore.distances import unpackDistances, DistanceOracle
+from vrpcore.instance import CompiledInstance, compileInstance
+from vrpcore.variation import varyBatch
+from vrpcore.selection import selNSGA2Biobjective, selTournamentDCDBiobjective, fitnessArray, sortFronts
+from vrpcore.stopping import HypervolumeStopping
+from vrpcore.checkpoint import saveCheckpoint, loadCheckpoint
+from vrpcore.genstats import GenerationStats
+from vrpcore.runlog import RunLog, runHistory, exportHistory
+from vrpcore.instrumentation import PhaseTimer, RunProfiler
+from vrpcore.synthetic import syntheticInstance
+
+logger = logging.getLogger(__name__)
+
+
+# Load the given problem, which can be a json file or a binary instance file
 def load_instance(json_file):
     """
-    Inputs: path to json file
-    Outputs: json file object if it exists, or else returns NoneType
+    Inputs: path to json file, or to a binary instance file from instancefile
+    Outputs: json file object if it exists, or else returns NoneType. The distance
+             matrix of a binary instance file is a read-only memory-mapped array,
+             unless the file holds the packed upper triangle
     """
-    if os.path.exists(path=json_file):
+    if not os.path.exists(path=json_file):
+        return None
+    if isInstanceFile(json_file):
+        instance = readInstanceFile(json_file)
+    else:
         with io.open(json_file, 'rt', newline='') as file_object:
-            return load(file_object)
-    return None
+            instance = load(file_object)
+
+    # Distances stored as the packed upper triangle are unpacked to the full matrix
+    if 'distance_matrix' not in instance and 'distance_matrix_packed' in instance:
+        instance['distance_matrix'] = unpackDistances(numpy.asarray(instance.pop('distance_matrix_packed')),
+                                                      instance['Number_of_customers'] + 1)
+    return instance
 
 
 # Take a route of given length, divide it into subroute where each subroute is assigned to vehicle
-def routeToSubroute(individual, instance):
+def routeToSubroute(individual, instance, split_mode="greedy", drone=None):
     """
     Inputs: Sequence of customers that a route has
-            Loaded instance problem
+            Compiled instance problem
+            split_mode - "greedy" or "optimal", see evaluateRoute
+            drone - drone costing the subroutes, the compiled instance's if None
     Outputs: Route that is divided in to subroutes
              which is assigned to each vechicle.
     """
+    # Returning the final route with each list inside for a vehicle
+    return evaluateRoute(individual, instance, drone or instance.drone, return_route=True, split_mode=split_mode)[2]
+
+
+# Split a route with the fewest vehicles, then the lowest cost, as a shortest path over its positions
+def optimalSplit(individual, instance, drone):
+    """
+    Inputs: Sequence of customers that a route has
+            Compiled instance problem
+            Drone whose parameters give the cost of a subroute
+    Outputs: Route divided in to subroutes, keeping the customer order, that needs
+             the least vehicles and among those costs the least.
+    """
+    num_positions = len(individual)
+    vehicle_capacity = instance.vehicle_capacity
+    demands = instance.demand.tolist()
+    distance_between = instance.distance_matrix.item
+
+    # Best (vehicles, cost) label of serving the first i customers, and where its last subroute starts
+    best_vehicles = [0] + [num_positions + 1] * num_positions
+    best_cost = [0] + [float('inf')] * num_positions
+    predecessor = [0] * (num_positions + 1)
+
+    for start in range(num_positions):
+        vehicles = best_vehicles[start] + 1
+        vehicle_load = 0
+        path_length = 0
+        demand_path = 0
+        last_customer_id = 0
+
+        # Extending the subroute that starts at this position while it fits in the vehicle,
+        #   weighted distance = weight_drone * (path + return) + sum(demand_i * path_upto_i)
+        for end in range(start, num_positions):
+            customer_id = individual[end]
+            demand = demands[customer_id]
+            vehicle_load = vehicle_load + demand
+            if end > start and vehicle_load > vehicle_capacity:
+                break
+
+            path_length = path_length + distance_between(last_customer_id, customer_id)
+            demand_path = demand_path + demand * path_length
+            sub_route_distance = drone.weight * (path_length + distance_between(customer_id, 0)) + demand_path
+            sub_route_transport_cost = drone.battery_consumption_perKM_perHr*sub_route_distance + (end - start + 2)*drone.battery_consumption_takeoff_landing
+
+            cost = best_cost[start] + sub_route_transport_cost
+            if (vehicles, cost) < (best_vehicles[end + 1], best_cost[end + 1]):
+                best_vehicles[end + 1] = vehicles
+                best_cost[end + 1] = cost
+                predecessor[end + 1] = start
+
+            # A single customer above capacity still gets its own vehicle
+            if vehicle_load > vehicle_capacity:
+                break
+            last_customer_id = customer_id
+
+    # Walking back from the last position to recover the subroutes
+    route = []
+    end = num_positions
+    while end > 0:
+        start = predecessor[end]
+        route.append(list(individual[start:end]))
+        end = start
+    route.reverse()
+    return route
+
+
+# Battery cost of a closed subroute, flying out fully loaded and dropping demand at every customer
+def subRouteCost(sub_route, demands, distance_between, drone):
+    """
+    Inputs: Subroute as a list of customer ids
+            Demand list and distance lookup of the compiled instance
+    Outputs: Cost for the drone flying this subroute
+    """
+    # Initializing the subroute distance to 0
+    sub_route_distance = 0
+    # Initializing customer id for depot as 0
+    last_customer_id = 0
+    weight = drone.weight
+    for customer_id in sub_route:
+        demand = demands[customer_id]
+        weight += demand
+
+    for customer_id in sub_route:
+        # Distance from the last customer id to next one in the given subroute
+        distance = distance_between(last_customer_id, customer_id)
+        sub_route_distance += distance*weight
+        # Update last_customer_id to the new one
+        demand = demands[customer_id]
+        weight -= demand
+        last_customer_id = customer_id
+
+    # After adding distances in subroute, adding the route cost from last customer to depot
+    # that is 0
+    sub_route_distance = sub_route_distance + distance_between(last_customer_id, 0)*weight
+
+    # Cost for this particular sub route
+    return drone.battery_consumption_perKM_perHr*sub_route_distance + (len(sub_route) +1)*drone.battery_consumption_takeoff_landing
+
+
+# Split a route into subroutes and cost them in the same traversal
+def evaluateRoute(individual, instance, drone, unit_cost=1, return_route=False, split_mode="greedy"):
+    """
+    Inputs: Sequence of customers that a route has
+            Compiled instance problem
+            Drone whose parameters give the cost of a subroute
+            unit_cost for the distance
+            return_route - also return the subroutes
+            split_mode - "greedy" cuts as soon as the vehicle is full,
+                         "optimal" splits with optimalSplit
+    Outputs: Tuple of (Number of vechicles, Route cost from all the vechicles),
+             with the route divided in to subroutes as third item if return_route
+    """
+    demands = instance.demand.tolist()
+    distance_between = instance.distance_matrix.item
+    total_cost = 0
+
+    if split_mode == "optimal":
+        route = optimalSplit(individual, instance, drone)
+        for sub_route in route:
+            total_cost = total_cost + subRouteCost(sub_route, demands, distance_between, drone)
+        if return_route:
+            return len(route), total_cost, route
+        return len(route), total_cost
+
     route = []
     sub_route = []
     vehicle_load = 0
-    last_customer_id = 0
-    vehicle_capacity = instance['vehicle_capacity']
-    
+    vehicle_capacity = instance.vehicle_capacity
+
     for customer_id in individual:
-        # print(customer_id)
-        demand = instance[f"customer_{customer_id}"]["demand"]
-        # print(f"The demand for customer_{customer_id}  is {demand}")
+        demand = demands[customer_id]
         updated_vehicle_load = vehicle_load + demand
 
         if(updated_vehicle_load <= vehicle_capacity):
             sub_route.append(customer_id)
             vehicle_load = updated_vehicle_load
         else:
+            # Closing the subroute, its cost is added the same way getRouteCost added it
+            total_cost = total_cost + subRouteCost(sub_route, demands, distance_between, drone)
             route.append(sub_route)
             sub_route = [customer_id]
             vehicle_load = demand
-        
-        last_customer_id = customer_id
 
     if sub_route != []:
+        total_cost = total_cost + subRouteCost(sub_route, demands, distance_between, drone)
         route.append(sub_route)
 
-    # Returning the final route with each list inside for a vehicle
-    return route
+    if return_route:
+        return len(route), total_cost, route
+    return len(route), total_cost
 
 
-def printRoute(route, merge=False):
+def printRoute(route, merge=False, output=print):
+    # Vehicle by vehicle, or as one line if merge, written with output, print or a logger method
     route_str = '0'
     sub_route_count = 0
     for sub_route in route:
@@ -76,91 +235,136 @@ def printRoute(route, merge=False):
             route_str = f'{route_str} - {customer_id}'
         sub_route_str = f'{sub_route_str} - 0'
         if not merge:
-            print(f'  Vehicle {sub_route_count}\'s route: {sub_route_str}')
+            output(f'  Vehicle {sub_route_count}\'s route: {sub_route_str}')
         route_str = f'{route_str} - 0'
     if merge:
-        print(route_str)
+        output(route_str)
 
 
 # Calculate the number of vehicles required, given a route
-def getNumVehiclesRequired(individual, instance):
+def getNumVehiclesRequired(individual, instance, split_mode="greedy", drone=None):
     """
     Inputs: Individual route
-            Json file object loaded instance
+            Compiled instance problem
     Outputs: Number of vechiles according to the given problem and the route
     """
     # Get the route with subroutes divided according to demand
-    updated_route = routeToSubroute(individual, instance)
+    updated_route = routeToSubroute(individual, instance, split_mode, drone)
     num_of_vehicles = len(updated_route)
     return num_of_vehicles
 
 
 # Given a route, give its total cost
-def getRouteCost(individual, instance, drone, unit_cost=1):
+def getRouteCost(individual, instance, drone, unit_cost=1, split_mode="greedy"):
     """
     Inputs : 
         - Individual route
-        - Problem instance, json file that is loaded
+        - Compiled problem instance
         - Unit cost for the route (can be petrol etc)
 
     Outputs:
         - Total cost for the route taken by all the vehicles
     """
-    total_cost = 0
-    updated_route = routeToSubroute(individual, instance)
-
-
-    for sub_route in updated_route:
-        # Initializing the subroute distance to 0
-        sub_route_distance = 0
-        # Initializing customer id for depot as 0
-        last_customer_id = 0
-        weight = drone.weight
-        for customer_id in sub_route:
-            demand = instance[f"customer_{customer_id}"]["demand"]
-            weight += demand
-
-        for customer_id in sub_route:
-            # Distance from the last customer id to next one in the given subroute
-            distance = instance["distance_matrix"][last_customer_id][customer_id]
-            sub_route_distance += distance*weight
-            # Update last_customer_id to the new one
-            demand = instance[f"customer_{customer_id}"]["demand"]
-            weight -= demand
-            last_customer_id = customer_id
-        
-        # After adding distances in subroute, adding the route cost from last customer to depot
-        # that is 0
-        sub_route_distance = sub_route_distance + instance["distance_matrix"][last_customer_id][0]*weight
-
-        # Cost for this particular sub route
-        sub_route_transport_cost = drone.battery_consumption_perKM_perHr*sub_route_distance + (len(sub_route) +1)*drone.battery_consumption_takeoff_landing
-
-        # Adding this to total cost
-        total_cost = total_cost + sub_route_transport_cost
-    
-     
-    return total_cost
+    return evaluateRoute(individual, instance, drone, unit_cost, split_mode=split_mode)[1]
 
 
 # Get the fitness of a given route
-def eval_indvidual_fitness(individual, instance, drone, unit_cost):
+def eval_indvidual_fitness(individual, instance, drone, unit_cost, split_mode="greedy"):
     """
     Inputs: individual route as a sequence
-            Json object that is loaded as file object
-            unit_cost for the distance 
+            Compiled instance problem
+            unit_cost for the distance
     Outputs: Returns a tuple of (Number of vechicles, Route cost from all the vechicles)
     """
 
-    # we have to minimize number of vehicles
-    # TO calculate req vechicles for given route
-    vehicles = getNumVehiclesRequired(individual, instance)
-
-    # we also have to minimize route cost for all the vehicles
-    route_cost = getRouteCost(individual, instance, drone, unit_cost)
+    # Both objectives, number of vehicles and route cost of all the vehicles, in one pass
+    return evaluateRoute(individual, instance, drone, unit_cost, split_mode=split_mode)
 
-    return (vehicles, route_cost)
 
+# Get the fitness of a whole population of routes at once
+def eval_population_fitness(routes, instance, drone, unit_cost, split_mode="greedy"):
+    """
+    Inputs: routes - 2-D integer array, one individual route per row
+            Compiled instance problem
+            unit_cost for the distance
+            split_mode - "greedy" or "optimal", see routeToSubroute
+    Outputs: Tuple of (array of number of vehicles, array of route costs),
+             identical to calling eval_indvidual_fitness on every row
+    """
+    routes = numpy.asarray(routes, dtype=numpy.int64)
+    if routes.ndim != 2:
+        routes = routes.reshape(len(routes), -1)
+
+    # The optimal split is a shortest path per route, it is run row by row
+    if split_mode == "optimal":
+        vehicles = numpy.zeros(len(routes), dtype=numpy.int64)
+        total_cost = numpy.zeros(len(routes))
+        for row, route in enumerate(routes.tolist()):
+            vehicles[row], total_cost[row] = eval_indvidual_fitness(route, instance, drone, unit_cost, split_mode)
+        return vehicles, total_cost
+
+    demand = instance.demand
+    distance_matrix = instance.distance_matrix
+
+    num_routes, route_length = routes.shape
+    if route_length == 0:
+        return numpy.zeros(num_routes, dtype=numpy.int64), numpy.zeros(num_routes)
+    vehicle_capacity = instance.vehicle_capacity
+    per_km = drone.battery_consumption_perKM_perHr
+    takeoff_landing = drone.battery_consumption_takeoff_landing
+
+    # Pass 1 : Splitting every route into subroutes on capacity, one position at a time
+    starts = numpy.zeros(routes.shape, dtype=bool)
+    vehicle_load = numpy.zeros(num_routes)
+    for position in range(route_length):
+        demands = demand[routes[:, position]]
+        updated_vehicle_load = vehicle_load + demands
+        fits = updated_vehicle_load <= vehicle_capacity
+        starts[:, position] = ~fits
+        vehicle_load = numpy.where(fits, updated_vehicle_load, demands)
+
+    # A cut at the very first customer leaves an empty subroute behind, as in routeToSubroute
+    vehicles = starts.sum(axis=1) + 1
+    ends = numpy.ones(routes.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+
+    # Pass 2 : Loaded weight at takeoff for every subroute, summed in route order
+    #   and then carried back from the last customer to every customer of the subroute
+    takeoff_weight = numpy.zeros(routes.shape)
+    weight = numpy.zeros(num_routes)
+    for position in range(route_length):
+        weight = numpy.where(starts[:, position] | (position == 0), drone.weight, weight)
+        weight = weight + demand[routes[:, position]]
+        takeoff_weight[:, position] = weight
+    for position in range(route_length - 2, -1, -1):
+        takeoff_weight[:, position] = numpy.where(ends[:, position], takeoff_weight[:, position],
+                                                  takeoff_weight[:, position + 1])
+
+    # Pass 3 : Cost of every subroute with the same arithmetic as getRouteCost
+    empty_sub_route_cost = per_km * (0 + distance_matrix[0, 0] * drone.weight) + 1 * takeoff_landing
+    total_cost = numpy.where(starts[:, 0], 0 + empty_sub_route_cost, 0.0)
+    sub_route_distance = numpy.zeros(num_routes)
+    weight = numpy.zeros(num_routes)
+    sub_route_length = numpy.zeros(num_routes)
+    last_customer = numpy.zeros(num_routes, dtype=numpy.int64)
+    for position in range(route_length):
+        customers = routes[:, position]
+        new_sub_route = starts[:, position] | (position == 0)
+        weight = numpy.where(new_sub_route, takeoff_weight[:, position], weight)
+        sub_route_distance = numpy.where(new_sub_route, 0.0, sub_route_distance)
+        sub_route_length = numpy.where(new_sub_route, 0, sub_route_length)
+        last_customer = numpy.where(new_sub_route, 0, last_customer)
+
+        sub_route_distance = sub_route_distance + distance_matrix[last_customer, customers] * weight
+        weight = weight - demand[customers]
+        sub_route_length = sub_route_length + 1
+        last_customer = customers
+
+        closed_distance = sub_route_distance + distance_matrix[customers, 0] * weight
+        closed_cost = per_km * closed_distance + (sub_route_length + 1) * takeoff_landing
+        total_cost = numpy.where(ends[:, position], total_cost + closed_cost, total_cost)
+
+    return vehicles, total_cost
 
 
 # Crossover method with ordering
@@ -230,45 +434,42 @@ def mutationShuffle(individual, indpb):
 
 ## Statistics and Logging
 
-def createStatsObjs():
+def createStatsObjs(interval=1, keep_best=False, logbook_limit=None):
     # Method to create stats and logbook objects
     """
-    Inputs : None
+    Inputs : interval - generations between two logbook records
+             keep_best - record the whole best route, not only its digest
+             logbook_limit - most records kept in memory, None for all
     Outputs : tuple of logbook and stats objects.
     """
-    stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("avg", numpy.mean, axis=0)
-    stats.register("std", numpy.std, axis=0)
-    stats.register("min", numpy.min, axis=0)
-    stats.register("max", numpy.max, axis=0)
+    stats = GenerationStats(interval, keep_best, logger, logbook_limit=logbook_limit)
 
     # Methods for logging
     logbook = tools.Logbook()
-    logbook.header = "Generation", "evals", "avg", "std", "min", "max", "best_one", "fitness_best_one"
+    logbook.header = stats.header()
     return logbook, stats
 
 
-def recordStat(invalid_ind, logbook, pop, stats, gen):
+def recordStat(invalid_ind, logbook, pop, stats, gen, force=False, timer=None, **fields):
     """
     Inputs : invalid_ind - Number of children for which fitness is calculated
              logbook - Logbook object that logs data
              pop - population
-             stats - stats object that compiles statistics
-    Outputs: None, prints the logs
+             stats - GenerationStats deciding which generations are recorded
+             force - record this generation even between two intervals
+             timer - PhaseTimer of the generations, if their phases are timed
+             fields - further values to log for this generation
+    Outputs: None, the record goes to the logbook and the logger
     """
-    record = stats.compile(pop)
-    best_individual = tools.selBest(pop, 1)[0]
-    record["best_one"] = best_individual
-    record["fitness_best_one"] = best_individual.fitness
-    logbook.record(Generation=gen, evals=len(invalid_ind), **record)
-    print(logbook.stream)
+    stats.record(logbook, gen, pop, len(invalid_ind), force=force, timer=timer, **fields)
 
 
 
 ## Exporting CSV files
 
 def exportCsv(csv_file_name, logbook):
-    csv_columns = logbook[0].keys()
+    # Some columns, like the stop reason, are only in the last records
+    csv_columns = list(dict.fromkeys(key for data in logbook for key in data))
     csv_path = os.path.join(BASE_DIR, "results", csv_file_name)
     try:
         with open(csv_path, 'w') as csvfile:
@@ -277,10 +478,10 @@ def exportCsv(csv_file_name, logbook):
             for data in logbook:
                 writer.writerow(data)
     except IOError:
-        print("I/O error")
+        logger.exception(f"Could not write the logbook to {csv_path}")
 
 class drone():
-    def _init_(self):
+    def __init__(self):
         self.weight = 20
         self.battery_consumption_perKM_perHr = 0.02
         self.battery_consumption_takeoff_landing = 0.05
@@ -288,18 +489,70 @@ class drone():
         
 
 
+# Keyword arguments of eval_population_fitness in a worker, built on its shared arrays
+def sharedEvaluationArguments(arrays, fields):
+    distance_matrix = arrays.get('distance_matrix')
+    if distance_matrix is None:
+        distance_matrix = DistanceOracle(arrays['coordinates'], **fields['distance_oracle'])
+    instance = CompiledInstance(fields['instance_name'], fields['vehicle_capacity'], fields['max_vehicle_number'],
+                                arrays['demand'], distance_matrix, arrays['coordinates'],
+                                fields['coordinate_keys'], fields['drone'])
+    return {'instance': instance}
+
+
 class nsgaAlgo(object):
 
-    def _init_(self):
-        self.json_instance = load_instance('./data/json/Input_Data.json')
-        self.ind_size = self.json_instance['Number_of_customers']
+    def __init__(self, json_instance=None, split_mode="greedy", workers=1, rng=None, selection_mode="biobjective",
+                 stopping=None, eval_chunk_size=None,
+                 checkpoint_path=None, checkpoint_interval=10, stats_interval=1, keep_best=False,
+                 run_log_path=None, history_path=None, logbook_limit=None, profile=None, profile_path=None):
+        if json_instance is None:
+            json_instance = load_instance('./data/json/Input_Data.json')
+        self.json_instance = json_instance
+        self.drone = drone()
+
+        # Demand and distance arrays the evaluations read, without a distance matrix the distances are
+        #   computed on demand from the coordinates
+        self.instance = compileInstance(self.json_instance, self.drone)
+        self.split_mode = split_mode
+        self.selection_mode = selection_mode
+        self.stopping = stopping
+        self.stop_reason = None
+
+        # Wall clock budget, the offspring are evaluated in chunks of eval_chunk_size to check it more often
+        self.deadline = None
+        self.eval_chunk_size = eval_chunk_size
+
+        # Checkpoint file written every checkpoint_interval generations, if given
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        # Best solutions so far, read by snapshot from other threads while the solver runs
+        self.lock = threading.Lock()
+        self.latest = None
+        self.workers = workers
+        self.rng = numpy.random.default_rng(rng)
+        self.ind_size = self.instance.num_customers
         self.pop_size = 400
         self.cross_prob = 0.85
         self.mut_prob = 0.02
         self.num_gen = 150
         self.toolbox = base.Toolbox()
-        self.logbook, self.stats = createStatsObjs()
-        self.drone = drone()
+        self.stats_interval = stats_interval
+        self.keep_best = keep_best
+        self.logbook, self.stats = createStatsObjs(stats_interval, keep_best, logbook_limit)
+
+        # JSON lines file the records are streamed to during runMain, and .npz file of the fitness
+        #   history written from it at the end, if given
+        self.run_log_path = run_log_path
+        self.history_path = history_path
+        self.run_id = None
+
+        # Wall time of every phase of a generation, logged with the statistics, and cprofile or
+        #   tracemalloc profiling of runMain, dumped to profile_path if given
+        self.timer = PhaseTimer()
+        self.profile = profile
+        self.profile_path = profile_path
         self.createCreators()
 
     def createCreators(self):
@@ -316,100 +569,260 @@ class nsgaAlgo(object):
         # Creating evaluate function using our custom fitness
         #   toolbox.register is partial, *args and **kwargs can be given here
         #   and the rest of args are supplied in code
-        self.toolbox.register('evaluate', eval_indvidual_fitness, instance=self.json_instance, drone = self.drone, unit_cost=1)
+        self.toolbox.register('evaluate', eval_indvidual_fitness, instance=self.instance, drone=self.drone, unit_cost=1,
+                              split_mode=self.split_mode)
+
+        # Evaluating the whole population in one go, split over worker processes if asked for,
+        #   which map the compiled instance's arrays
+        self.evaluator = None
+        if self.workers > 1:
+            self.evaluator = ParallelEvaluator(eval_population_fitness, self.instance.sharedArrays(),
+                                               sharedEvaluationArguments, self.instance.sharedFields(),
+                                               processes=self.workers, drone=self.drone, unit_cost=1,
+                                               split_mode=self.split_mode)
+            self.toolbox.register('evaluate_batch', self.evaluator.evaluate)
+        else:
+            self.toolbox.register('evaluate_batch', eval_population_fitness, instance=self.instance,
+                                  drone=self.drone, unit_cost=1, split_mode=self.split_mode)
+
+        # Selection method, DEAP's generic NSGA-II or the array version for our two objectives
+        if self.selection_mode == "deap":
+            self.toolbox.register("select", tools.selNSGA2)
+            self.toolbox.register("select_parents", tools.selTournamentDCD)
+        elif self.selection_mode == "biobjective":
+            self.toolbox.register("select", selNSGA2Biobjective)
+            self.toolbox.register("select_parents", selTournamentDCDBiobjective, rng=self.rng)
+        else:
+            raise ValueError(f"Unknown selection mode {self.selection_mode}, expected deap or biobjective")
 
-        # Selection method
-        self.toolbox.register("select", tools.selNSGA2)
+        # Crossover and mutation of the whole offspring as one array, the batched cxOrderedVrp
+        #   and mutationShuffle
+        self.toolbox.register("vary", varyBatch)
 
-        # Crossover method
-        self.toolbox.register("mate", cxOrderedVrp)
 
-        # Mutation method
-        self.toolbox.register("mutate", mutationShuffle, indpb=self.mut_prob)
+    def evaluateInvalid(self, individuals, deadline=None):
+        # Evaluating all the given individuals as a single 2-D array, or chunk by chunk until the deadline
+        #   if one is given, the individuals left when it passes stay invalid
+        invalid_ind = [ind for ind in individuals if not ind.fitness.valid]
+        if not invalid_ind:
+            return invalid_ind
 
+        chunk_size = self.eval_chunk_size if deadline is not None and self.eval_chunk_size else len(invalid_ind)
+        for start in range(0, len(invalid_ind), chunk_size):
+            if start > 0 and time.monotonic() >= deadline:
+                return invalid_ind[:start]
+
+            chunk = invalid_ind[start:start + chunk_size]
+            vehicles, costs = self.toolbox.evaluate_batch(numpy.array(chunk))
+            for ind, num_vehicles, cost in zip(chunk, vehicles.tolist(), costs.tolist()):
+                ind.fitness.values = (num_vehicles, cost)
+        return invalid_ind
 
     def generatingPopFitness(self):
         self.pop = self.toolbox.population(n=self.pop_size)
-        self.invalid_ind = [ind for ind in self.pop if not ind.fitness.valid]
-        self.fitnesses = list(map(self.toolbox.evaluate, self.invalid_ind))
+        with self.timer.phase("evaluate"):
+            self.invalid_ind = self.evaluateInvalid(self.pop)
 
-        for ind, fit in zip(self.invalid_ind, self.fitnesses):
-            ind.fitness.values = fit
+        with self.timer.phase("select"):
+            self.pop = self.toolbox.select(self.pop, len(self.pop))
+        self.generation = 0
+        self.stop_reason = None
 
-        self.pop = self.toolbox.select(self.pop, len(self.pop))
+        # Stopping policy starts over with the first population
+        fields = {}
+        if self.stopping is not None:
+            self.stopping.reset()
+            fields['hypervolume'], _ = self.stopping.update(fitnessArray(self.pop), 0)
 
-        recordStat(self.invalid_ind, self.logbook, self.pop, self.stats, gen = 0)
+        recordStat(self.invalid_ind, self.logbook, self.pop, self.stats, gen = 0, timer=self.timer, **fields)
+        self.publishSnapshot()
 
 
     def runGenerations(self):
-        # Running algorithm for given number of generations
-        for gen in range(self.num_gen):
-            print(f"{20*'#'} Currently Evaluating {gen} Generation {20*'#'}")
+        # Running algorithm up to the given number of generations, from where a resumed run stopped
+        self.stop_reason = None
+        for gen in range(self.generation, self.num_gen):
+            logger.debug(f"{20*'#'} Currently Evaluating {gen} Generation {20*'#'}")
 
             # Selecting individuals
             # Selecting offsprings from the population, about 1/2 of them
-            self.offspring = tools.selTournamentDCD(self.pop, len(self.pop))
-            self.offspring = [self.toolbox.clone(ind) for ind in self.offspring]
-
-            # Performing , crossover and mutation operations according to their probabilities
-            for ind1, ind2 in zip(self.offspring[::2], self.offspring[1::2]):
-                # Mating will happen 80% of time if cross_prob is 0.8
-                if random.random() <= self.cross_prob:
-                    # print("Mating happened")
-                    self.toolbox.mate(ind1, ind2)
-
-                    # If cross over happened to the individuals then we are deleting those individual
-                    #   fitness values, This operations are being done on the offspring population.
-                self.toolbox.mutate(ind1)
-                self.toolbox.mutate(ind2)
-                del ind1.fitness.values, ind2.fitness.values
-
-            # Calculating fitness for all the invalid individuals in offspring
-            self.invalid_ind = [ind for ind in self.offspring if not ind.fitness.valid]
-            self.fitnesses = self.toolbox.map(self.toolbox.evaluate, self.invalid_ind)
-            for ind, fit in zip(self.invalid_ind, self.fitnesses):
-                ind.fitness.values = fit
+            with self.timer.phase("select_parents"):
+                parents = self.toolbox.select_parents(self.pop, len(self.pop))
 
-            # Recalcuate the population with newly added offsprings and parents
-            # We are using NSGA2 selection method, We have to select same population size
-            self.pop = self.toolbox.select(self.pop + self.offspring, self.pop_size)
+            # Performing crossover and mutation on all the offspring at once according to their probabilities
+            #   Mating will happen 80% of time if cross_prob is 0.8
+            with self.timer.phase("vary"):
+                routes, changed = self.toolbox.vary(numpy.array(parents), self.cross_prob, self.mut_prob, self.rng)
+
+            # Offspring identical to their parent keep its fitness, the others have to be evaluated
+            with self.timer.phase("clone"):
+                self.offspring = [creator.Individual(route) if is_changed else self.toolbox.clone(parent)
+                                  for parent, route, is_changed in zip(parents, routes.tolist(), changed.tolist())]
 
-            # Recording stats in this generation
-            recordStat(self.invalid_ind, self.logbook, self.pop, self.stats, gen + 1)
+            # Calculating fitness for all the invalid individuals in offspring, the ones the time limit
+            #   left unevaluated take no part in the selection
+            with self.timer.phase("evaluate"):
+                self.invalid_ind = self.evaluateInvalid(self.offspring, self.deadline)
+                self.offspring = [ind for ind in self.offspring if ind.fitness.valid]
 
-        print(f"{20 * '#'} End of Generations {20 * '#'} ")
+            # Recalcuate the population with newly added offsprings and parents
+            # We are using NSGA2 selection method, We have to select same population size
+            with self.timer.phase("select"):
+                self.pop = self.toolbox.select(self.pop + self.offspring, self.pop_size)
+
+            # Checking the stopping policy, its reason is logged with the generation it stopped at
+            fields = {}
+            if self.stopping is not None:
+                with self.timer.phase("stopping"):
+                    fields['hypervolume'], self.stop_reason = self.stopping.update(fitnessArray(self.pop), gen + 1)
+            if self.stop_reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stop_reason = "time limit reached"
+            if self.stop_reason is None and gen + 1 >= self.num_gen:
+                self.stop_reason = f"reached {self.num_gen} generations"
+            if self.stop_reason is not None:
+                fields['stop_reason'] = self.stop_reason
+
+            # Recording stats every stats_interval generations, and for the generation the run ends with
+            with self.timer.phase("statistics"):
+                recordStat(self.invalid_ind, self.logbook, self.pop, self.stats, gen + 1,
+                           force=self.stop_reason is not None or gen + 1 == self.num_gen, timer=self.timer, **fields)
+            self.generation = gen + 1
+            with self.timer.phase("snapshot"):
+                self.publishSnapshot()
+                if self.checkpoint_path and self.generation % self.checkpoint_interval == 0:
+                    self.writeCheckpoint()
+            if self.stop_reason is not None:
+                break
+
+        if self.stop_reason is None:
+            self.stop_reason = f"reached {self.num_gen} generations"
+            self.logbook[-1]['stop_reason'] = self.stop_reason
+            self.publishSnapshot()
+
+        logger.info(f"{20 * '#'} End of Generations {20 * '#'} ")
 
 
     def getBestInd(self):
         self.best_individual = tools.selBest(self.pop, 1)[0]
 
-        # Printing the best after all generations
-        print(f"Best individual is {self.best_individual}")
-        print(f"Number of vechicles required are "
-              f"{self.best_individual.fitness.values[0]}")
-        print(f"Cost required for the transportation is "
-              f"{self.best_individual.fitness.values[1]}")
+        # Logging the best after all generations
+        logger.info(f"Best individual is {self.best_individual}")
+        logger.info(f"Number of vechicles required are "
+                    f"{self.best_individual.fitness.values[0]}")
+        logger.info(f"Cost required for the transportation is "
+                    f"{self.best_individual.fitness.values[1]}")
 
-        # Printing the route from the best individual
-        printRoute(routeToSubroute(self.best_individual, self.json_instance))
+        # Logging the route from the best individual
+        printRoute(routeToSubroute(self.best_individual, self.instance, self.split_mode, self.drone),
+                   output=logger.info)
 
     def doExport(self):
-        csv_file_name = f"{self.json_instance['instance_name']}_" \
+        csv_file_name = f"{self.instance.instance_name}_" \
                         f"pop{self.pop_size}_crossProb{self.cross_prob}" \
                         f"_mutProb{self.mut_prob}_numGen{self.num_gen}.csv"
         exportCsv(csv_file_name, self.logbook)
 
-    def runMain(self):
-        self.generatingPopFitness()
-        print("gen")
-        self.runGenerations()
+        # Whole history of this run from the run log, the logbook may only hold its last records
+        if self.history_path:
+            exportHistory(self.history_path,
+                          runHistory(self.run_log_path, self.run_id) if self.run_log_path else self.logbook)
+
+    def writeCheckpoint(self, path=None):
+        # Saving everything the next generations depend on, the population with its crowding distances,
+        #   the logbook, the stopping policy and both random generators
+        arrays = {'population': numpy.array(self.pop, dtype=numpy.int32),
+                  'fitness': fitnessArray(self.pop),
+                  'crowding': numpy.array([getattr(ind.fitness, 'crowding_dist', 0.0) for ind in self.pop])}
+        state = {'generation': self.generation, 'stop_reason': self.stop_reason, 'logbook': self.logbook,
+                 'run_id': self.run_id,
+                 'stopping': self.stopping, 'random_state': random.getstate(),
+                 'rng_state': self.rng.bit_generator.state}
+        saveCheckpoint(path or self.checkpoint_path, arrays, state)
+
+    def restoreCheckpoint(self, path=None):
+        # Continuing from a checkpoint exactly as if the run had not been interrupted
+        arrays, state = loadCheckpoint(path or self.checkpoint_path)
+        self.pop = []
+        for route, values, crowding in zip(arrays['population'].tolist(), arrays['fitness'].tolist(),
+                                           arrays['crowding'].tolist()):
+            ind = creator.Individual(route)
+            ind.fitness.values = tuple(values)
+            ind.fitness.crowding_dist = crowding
+            self.pop.append(ind)
+
+        self.generation = state['generation']
+        self.stop_reason = state['stop_reason']
+        self.logbook = state['logbook']
+        self.run_id = state.get('run_id') or uuid.uuid4().hex
+        self.stopping = state['stopping']
+        random.setstate(state['random_state'])
+        self.rng.bit_generator.state = state['rng_state']
+        self.publishSnapshot()
+
+    def publishSnapshot(self):
+        # Copying the first front and the best individual of the population for snapshot
+        first_front = numpy.flatnonzero(sortFronts(fitnessArray(self.pop))[0] == 0).tolist()
+        best_individual = tools.selBest(self.pop, 1)[0]
+        latest = {'generation': self.generation,
+                  'pareto_front': [(list(self.pop[index]), self.pop[index].fitness.values) for index in first_front],
+                  'best_individual': list(best_individual),
+                  'best_fitness': best_individual.fitness.values,
+                  'stop_reason': self.stop_reason}
+        with self.lock:
+            self.latest = latest
+
+    def snapshot(self):
+        """
+        Inputs : None, safe to call from another thread while the solver runs
+        Outputs : dict with the generation, the pareto_front as (route, fitness values) pairs,
+                  the best_individual, its best_fitness and the stop_reason, None before the first population
+        """
+        with self.lock:
+            return None if self.latest is None else dict(self.latest)
+
+    def runMain(self, time_limit=None, resume=False):
+        """
+        Inputs : time_limit - seconds after which no new generation is started, None for no limit
+                 resume - carry on from checkpoint_path instead of a new population, up to num_gen generations
+        Outputs : snapshot of the final population
+        """
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+
+        # A new run gets a new id for its run log records, a resumed run keeps the one of its checkpoint
+        #   and logs the generations after the checkpoint again, runHistory keeps the later records
+        if resume:
+            self.restoreCheckpoint()
+        else:
+            self.run_id = uuid.uuid4().hex
+        self.stats.run_log = RunLog(self.run_log_path, run_id=self.run_id) if self.run_log_path else None
+        try:
+            with RunProfiler(self.profile, self.profile_path) if self.profile else nullcontext():
+                if not resume:
+                    self.generatingPopFitness()
+                self.runGenerations()
+        finally:
+            if self.stats.run_log is not None:
+                self.stats.run_log.close()
+                self.stats.run_log = None
         self.getBestInd()
         self.doExport()
+        return self.snapshot()
+
+    def close(self):
+        # Shutting down the worker processes, if any were started
+        if self.evaluator is not None:
+            self.evaluator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-if __name__ == "_main_":
+if __name__ == "__main__":
     print("Running file directly, Executing nsga2vrp")
     # nsga2vrp()
-    someinstance = nsgaAlgo()
+    someinstance = nsgaAlgo(syntheticInstance(25, layout="xy"))
     someinstance.runMain()
     # someinstance.generatingPopFitness()
     #
@@ -427,7 +840,8 @@ if __name__ == "_main_":
 
 def testcosts():
     # Sample instance
-    test_instance = load_instance('./data/json/Input_Data.json')
+    test_drone = drone()
+    test_instance = compileInstance(syntheticInstance(25, seed=0, layout="xy"), test_drone)
 
     # Sample individual
     sample_individual = [19, 5, 24, 7, 16, 23, 22, 2, 12, 8, 20, 25, 21, 18,11,15, 1, 14, 17, 6, 4, 13, 10, 3, 9]
@@ -438,16 +852,17 @@ def testcosts():
     print(f"Sample individual 2 is {sample_ind_2}")
 
     # Cost for each route
-    print(f"Sample individual cost is {getRouteCost(sample_individual, test_instance, 1)}")
-    print(f"Sample individual 2 cost is {getRouteCost(sample_ind_2, test_instance, 1)}")
+    print(f"Sample individual cost is {getRouteCost(sample_individual, test_instance, test_drone, 1)}")
+    print(f"Sample individual 2 cost is {getRouteCost(sample_ind_2, test_instance, test_drone, 1)}")
 
     # Fitness for each route
-    print(f"Sample individual fitness is {eval_indvidual_fitness(sample_individual, test_instance, 1)}")
-    print(f"Sample individual 2 fitness is {eval_indvidual_fitness(sample_ind_2, test_instance, 1)}")
+    print(f"Sample individual fitness is {eval_indvidual_fitness(sample_individual, test_instance, test_drone, 1)}")
+    print(f"Sample individual 2 fitness is {eval_indvidual_fitness(sample_ind_2, test_instance, test_drone, 1)}")
 
 def testroutes():
     # Sample instance
-    test_instance = load_instance('./data/json/Input_Data.json')
+    test_drone = drone()
+    test_instance = compileInstance(syntheticInstance(25, seed=0, layout="xy"), test_drone)
 
     # Sample individual
     sample_individual = [19, 5, 24, 7, 16, 23, 22, 2, 12, 8, 20, 25, 21, 18,11,15, 1, 14, 17, 6, 4, 13, 10, 3, 9]
@@ -461,14 +876,14 @@ def testroutes():
     print(f"Best individual 300 generations is {best_ind_300_gen}")
 
     # Getting routes
-    print(f"Subroutes for first sample individual is {routeToSubroute(sample_individual, test_instance)}")
-    print(f"Subroutes for second sample indivudal is {routeToSubroute(sample_ind_2, test_instance)}")
-    print(f"Subroutes for best sample indivudal is {routeToSubroute(best_ind_300_gen, test_instance)}")
+    print(f"Subroutes for first sample individual is {routeToSubroute(sample_individual, test_instance, drone=test_drone)}")
+    print(f"Subroutes for second sample indivudal is {routeToSubroute(sample_ind_2, test_instance, drone=test_drone)}")
+    print(f"Subroutes for best sample indivudal is {routeToSubroute(best_ind_300_gen, test_instance, drone=test_drone)}")
 
     # Getting num of vehicles
-    print(f"Vehicles for sample individual {getNumVehiclesRequired(sample_individual, test_instance)}")
-    print(f"Vehicles for second sample individual {getNumVehiclesRequired(sample_ind_2, test_instance)}")
-    print(f"Vehicles for best sample individual {getNumVehiclesRequired(best_ind_300_gen, test_instance)}")
+    print(f"Vehicles for sample individual {getNumVehiclesRequired(sample_individual, test_instance, drone=test_drone)}")
+    print(f"Vehicles for second sample individual {getNumVehiclesRequired(sample_ind_2, test_instance, drone=test_drone)}")
+    print(f"Vehicles for best sample individual {getNumVehiclesRequired(best_ind_300_gen, test_instance, drone=test_drone)}")
 
 def testcrossover():
     ind1 = [3,2,5,1,6,9,8,7,4]
@@ -490,7 +905,7 @@ def testcrossover():
 
 def testmutation():
     ind1 = [3,2,5,1,6,9,8,7,4]
-    mut1 = mutationShuffle(ind1)
+    mut1 = mutationShuffle(list(ind1), 0.2)
 
     print(f"Given individual is {ind1}")
     print(f"Mutation from first method {mut1}")
\ No newline at end of file
@@ -0,0 +1,211 @@
+from NSGA2_vrp import *
+from vrpcore.synthetic import syntheticInstance
+from vrpcore.stopping import hypervolume2d
+from utils import textToJson
+import argparse
+import platform
+import json
+
+# End-to-end regression gate of the solver: fixed seed solves of a bank of reference instances compared
+#   with the baselines committed in corelogic/baselines, run from the corelogic directory as
+#       python regression.py                 report the regressions, exit status 1 if there are any
+#       python regression.py --update        record the current results as the new baselines
+#   Only the seeded, deterministic metrics are gated. Times depend on the machine and its load, they are
+#   recorded with the baselines and reported next to them for information only
+
+BASELINE_DIR = os.path.join(BASE_DIR, 'corelogic', 'baselines')
+TEXT_DIR = os.path.join(BASE_DIR, 'data', 'text')
+
+# Synthetic city-scale instances, the Solomon format files of TEXT_DIR are added to them when present
+SYNTHETIC_CASES = [
+    {'name': 'synthetic_xy_100', 'num_customers': 100, 'pop_size': 100, 'num_gen': 40, 'seed': 0},
+    {'name': 'synthetic_xy_400', 'num_customers': 400, 'pop_size': 80, 'num_gen': 25, 'seed': 0},
+    {'name': 'synthetic_xy_1000', 'num_customers': 1000, 'pop_size': 60, 'num_gen': 15, 'seed': 0},
+]
+SOLOMON_SETTINGS = {'pop_size': 100, 'num_gen': 40, 'seed': 0}
+
+# Direction and relative tolerance of every compared metric, a baseline file may override the tolerances.
+#   The cost is only compared when the number of vehicles is the same, fewer vehicles may cost more
+TOLERANCES = {'evaluations': ('lower', 0.05), 'vehicles': ('lower', 0.0), 'cost': ('lower', 0.01),
+              'hypervolume': ('higher', 0.01)}
+
+
+def referenceCases(text_dir=TEXT_DIR):
+    """
+    Inputs : text_dir - directory of the Solomon format *.txt files, skipped if missing
+    Outputs : list of case dicts, name, solve settings and the text file or number of synthetic customers
+    """
+    cases = [dict(case, source='synthetic') for case in SYNTHETIC_CASES]
+    if os.path.isdir(text_dir):
+        for text_filename in sorted(fnmatch.filter(os.listdir(text_dir), '*.txt')):
+            cases.append(dict(SOLOMON_SETTINGS, name=os.path.splitext(text_filename)[0], source='solomon',
+                              text_file=text_filename))
+    return cases
+
+
+def caseInstance(case, text_dir=TEXT_DIR):
+    # Json instance of a case, converted from its text file like converttext2json does
+    if case['source'] == 'solomon':
+        return textToJson(os.path.join(text_dir, case['text_file']))
+    return syntheticInstance(case['num_customers'], seed=case['seed'], layout="xy")
+
+
+# Hypervolume reference of an instance, one vehicle more than customers and the cost of serving every
+#   customer on its own subroute, fixed so that runs before and after a change can be compared
+def hypervolumeReference(json_instance):
+    instance = compileInstance(json_instance, drone())
+    single_costs = [getRouteCost([customer_id], instance, instance.drone, 1)
+                    for customer_id in range(1, instance.num_customers + 1)]
+    return [instance.num_customers + 1, float(sum(single_costs))]
+
+
+def solveCase(case, json_instance, reference, repeat=1):
+    """
+    Inputs : case - case dict of referenceCases
+             json_instance - its instance
+             reference - hypervolume reference point
+             repeat - number of solves, the fastest one is timed, the seeded results are the same
+    Outputs : (dict of the evaluations, generations, best vehicles and cost and hypervolume of the
+               first front, seconds to solution of the fastest solve)
+    """
+    seconds = []
+    for _ in range(max(1, repeat)):
+        random.seed(case['seed'])
+        algo = nsgaAlgo(json_instance, rng=case['seed'])
+        algo.pop_size = case['pop_size']
+        algo.num_gen = case['num_gen']
+        started = time.perf_counter()
+        algo.generatingPopFitness()
+        algo.runGenerations()
+        seconds.append(time.perf_counter() - started)
+        algo.close()
+
+    latest = algo.snapshot()
+    front = numpy.array([values for _, values in latest['pareto_front']], dtype=numpy.float64)
+    return {'evaluations': int(sum(record['evals'] for record in algo.logbook)),
+            'generations': latest['generation'],
+            'vehicles': int(latest['best_fitness'][0]),
+            'cost': float(latest['best_fitness'][1]),
+            'hypervolume': hypervolume2d(front, reference)}, min(seconds)
+
+
+def compareMetrics(metrics, baseline_metrics, tolerances):
+    """
+    Inputs : metrics - current metrics of a case
+             baseline_metrics - its baseline metrics
+             tolerances - metric -> (direction, relative tolerance), see TOLERANCES
+    Outputs : list of regression messages, empty if the case is within its tolerances
+    """
+    regressions = []
+    for metric, (direction, tolerance) in tolerances.items():
+        if metric not in baseline_metrics or metric not in metrics:
+            continue
+        if metric == 'cost' and metrics.get('vehicles') != baseline_metrics.get('vehicles'):
+            continue
+        baseline, current = baseline_metrics[metric], metrics[metric]
+        if direction == 'lower':
+            limit = baseline + abs(baseline) * tolerance
+            worse = current > limit
+        else:
+            limit = baseline - abs(baseline) * tolerance
+            worse = current < limit
+        if worse:
+            change = (current - baseline) / abs(baseline) if baseline else float('inf')
+            regressions.append(f"{metric} {current:.6g} against {baseline:.6g} ({change:+.1%}, limit {limit:.6g})")
+    return regressions
+
+
+def baselinePath(name, baseline_dir=BASELINE_DIR):
+    return os.path.join(baseline_dir, f"{name}.json")
+
+
+def runRegression(cases, baseline_dir=BASELINE_DIR, text_dir=TEXT_DIR, update=False, repeat=1):
+    """
+    Inputs : cases - case dicts to run, see referenceCases
+             baseline_dir - directory of the baseline files
+             text_dir - directory of the Solomon format files
+             update - write the results as the new baselines instead of comparing them
+             repeat - solves per case, see solveCase
+    Outputs : list of one result dict per case, with its status 'ok', 'regression', 'new' or 'updated',
+              the regression messages and the seconds, not compared
+    """
+    results = []
+    for case in cases:
+        path = baselinePath(case['name'], baseline_dir)
+        baseline = None
+        if os.path.exists(path):
+            with io.open(path, 'rt') as baseline_file:
+                baseline = load(baseline_file)
+
+        json_instance = caseInstance(case, text_dir)
+        reference = baseline['reference'] if baseline and not update else hypervolumeReference(json_instance)
+        metrics, seconds = solveCase(case, json_instance, reference, repeat)
+        result = {'case': case, 'metrics': metrics, 'seconds': seconds, 'regressions': []}
+
+        if update:
+            os.makedirs(baseline_dir, exist_ok=True)
+            with io.open(path, 'wt') as baseline_file:
+                dump({'case': case, 'reference': reference, 'metrics': metrics, 'seconds': seconds,
+                      'tolerances': {metric: tolerance for metric, (_, tolerance) in TOLERANCES.items()},
+                      'python': platform.python_version(), 'numpy': numpy.__version__,
+                      'platform': platform.platform()}, baseline_file, indent=4, sort_keys=True)
+            result['status'] = 'updated'
+        elif baseline is None:
+            result['status'] = 'new'
+        else:
+            # The solve settings have to be those of the baseline for its numbers to mean anything
+            if baseline['case'] != case:
+                result['regressions'].append(f"baseline recorded for {baseline['case']}, run with --update")
+            tolerances = {metric: (direction, baseline.get('tolerances', {}).get(metric, tolerance))
+                          for metric, (direction, tolerance) in TOLERANCES.items()}
+            result['regressions'] += compareMetrics(metrics, baseline['metrics'], tolerances)
+            result['baseline'] = baseline['metrics']
+            result['baseline_seconds'] = baseline.get('seconds')
+            result['status'] = 'regression' if result['regressions'] else 'ok'
+        results.append(result)
+        timing = f"{seconds:.2f}s" if result.get('baseline_seconds') is None else \
+            f"{seconds:.2f}s, baseline {result['baseline_seconds']:.2f}s"
+        print(f"{case['name']}: {result['status']} in {timing}, "
+              f"{metrics['vehicles']} vehicles, cost {metrics['cost']:.4f}, "
+              f"hypervolume {metrics['hypervolume']:.6g}")
+        for message in result['regressions']:
+            print(f"    {message}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end solver regression gate against stored baselines")
+    parser.add_argument('--cases', type=str, nargs='+', default=None, required=False,
+                        help="Names of the cases to run, all of them if not given")
+    parser.add_argument('--baselineDir', type=str, default=BASELINE_DIR, required=False,
+                        help="Directory of the baseline files")
+    parser.add_argument('--textDir', type=str, default=TEXT_DIR, required=False,
+                        help="Directory of the Solomon format reference instances")
+    parser.add_argument('--update', action='store_true',
+                        help="Record the results as the new baselines")
+    parser.add_argument('--repeat', type=int, default=1, required=False,
+                        help="Solves per case, the fastest is compared")
+    parser.add_argument('--report', type=str, default=None, required=False,
+                        help="JSON file the results and regressions are written to")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    cases = referenceCases(args.textDir)
+    if args.cases:
+        unknown = set(args.cases) - {case['name'] for case in cases}
+        if unknown:
+            parser.error(f"unknown cases {sorted(unknown)}")
+        cases = [case for case in cases if case['name'] in args.cases]
+
+    results = runRegression(cases, args.baselineDir, args.textDir, args.update, args.repeat)
+    if args.report:
+        with io.open(args.report, 'wt') as report_file:
+            json.dump(results, report_file, indent=4)
+
+    regressions = [result for result in results if result['status'] == 'regression']
+    print(f"{len(results)} cases, {len(regressions)} with regressions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
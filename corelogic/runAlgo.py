@@ -1,5 +1,6 @@
 from NSGA2_vrp import *
 import argparse
+import logging
 
 def main():
 
@@ -15,22 +16,71 @@ def main():
                         help="Mutation Probabilty")
     parser.add_argument('--numGen', type=int, default=200, required=False,
                         help="Number of generations to run")
+    parser.add_argument('--splitMode', type=str, default="greedy", choices=["greedy", "optimal"], required=False,
+                        help="How a route is split into subroutes, optimal is slower per evaluation")
+    parser.add_argument('--workers', type=int, default=1, required=False,
+                        help="Number of processes evaluating the population")
+    parser.add_argument('--selectionMode', type=str, default="biobjective", choices=["biobjective", "deap"],
+                        required=False, help="NSGA-II selection, the array version for two objectives or DEAP's")
+    parser.add_argument('--stopWindow', type=int, default=0, required=False,
+                        help="Stop once the hypervolume stalls for this many generations, 0 runs all numGen")
+    parser.add_argument('--stopThreshold', type=float, default=1e-3, required=False,
+                        help="Relative hypervolume improvement below which a generation counts as stalled")
+    parser.add_argument('--timeLimit', type=float, default=None, required=False,
+                        help="Seconds after which the best solution found so far is returned")
+    parser.add_argument('--evalChunkSize', type=int, default=None, required=False,
+                        help="Evaluate the offspring in chunks of this size to check the time limit between them")
+    parser.add_argument('--checkpoint', type=str, default=None, required=False,
+                        help="Checkpoint file written every checkpointInterval generations")
+    parser.add_argument('--checkpointInterval', type=int, default=10, required=False,
+                        help="Generations between two checkpoints")
+    parser.add_argument('--statsInterval', type=int, default=1, required=False,
+                        help="Generations between two logged statistics records")
+    parser.add_argument('--keepBest', action='store_true',
+                        help="Log the whole best route, not only its digest")
+    parser.add_argument('--runLog', type=str, default=None, required=False,
+                        help="JSON lines file the statistics records are appended to during the run")
+    parser.add_argument('--historyNpz', type=str, default=None, required=False,
+                        help="Compressed .npz file the fitness history is exported to at the end")
+    parser.add_argument('--logbookLimit', type=int, default=None, required=False,
+                        help="Most statistics records kept in memory, the run log keeps them all")
+    parser.add_argument('--profile', type=str, default=None, choices=["cprofile", "tracemalloc"], required=False,
+                        help="Profile the run, where the time or where the memory goes")
+    parser.add_argument('--profileOutput', type=str, default=None, required=False,
+                        help="File the cProfile stats or the tracemalloc snapshot are dumped to")
+    parser.add_argument('--logLevel', type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING"],
+                        required=False, help="Level of the solver's log messages")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the run saved in the checkpoint file")
 
 
     args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs the --checkpoint file to continue from")
+    logging.basicConfig(level=args.logLevel, format="%(message)s")
+
+    # Stopping policy, if asked for
+    stopping = None
+    if args.stopWindow > 0:
+        stopping = HypervolumeStopping(threshold=args.stopThreshold, window=args.stopWindow)
 
     # Initializing instance
-    nsgaObj = nsgaAlgo()
+    nsgaObj = nsgaAlgo(load_instance(args.instance_name), split_mode=args.splitMode, workers=args.workers,
+                      selection_mode=args.selectionMode, stopping=stopping,
+                      eval_chunk_size=args.evalChunkSize, checkpoint_path=args.checkpoint,
+                      checkpoint_interval=args.checkpointInterval, stats_interval=args.statsInterval,
+                      keep_best=args.keepBest, run_log_path=args.runLog, history_path=args.historyNpz,
+                      logbook_limit=args.logbookLimit, profile=args.profile, profile_path=args.profileOutput)
 
     # Setting internal variables
-    nsgaObj.json_instance = load_instance(args.instance_name)
     nsgaObj.pop_size = args.popSize
     nsgaObj.cross_prob = args.crossProb
     nsgaObj.mut_prob = args.mutProb
     nsgaObj.num_gen = args.numGen
 
     # Running Algorithm
-    nsgaObj.runMain()
+    with nsgaObj:
+        nsgaObj.runMain(time_limit=args.timeLimit, resume=args.resume)
 
 
 if __name__ == '__main__':
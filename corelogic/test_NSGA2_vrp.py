@@ -0,0 +1,102 @@
+import time
+import numpy
+import pytest
+
+import NSGA2_vrp
+from deap import creator, tools
+from NSGA2_vrp import drone, compileInstance, syntheticInstance, evaluateRoute, subRouteCost, getRouteCost, \
+    getNumVehiclesRequired, eval_indvidual_fitness, eval_population_fitness, nsgaAlgo
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return compileInstance(syntheticInstance(40, seed=5, layout="xy", max_demand=8), drone())
+
+
+def randomRoutes(num_customers, num_routes, seed=0):
+    rng = numpy.random.default_rng(seed)
+    return numpy.array([rng.permutation(num_customers) + 1 for _ in range(num_routes)])
+
+
+# Capacity split walked the plain way, every subroute closed once the next customer does not fit
+def referenceSplit(route, instance):
+    demands = instance.demand.tolist()
+    sub_routes = [[]]
+    for customer_id in route:
+        if sum(demands[cust_id] for cust_id in sub_routes[-1]) + demands[customer_id] > instance.vehicle_capacity:
+            sub_routes.append([])
+        sub_routes[-1].append(customer_id)
+    return sub_routes
+
+
+def test_fused_evaluation_matches_the_split_then_the_cost(instance):
+    demands = instance.demand.tolist()
+    for route in randomRoutes(instance.num_customers, 20).tolist():
+        sub_routes = referenceSplit(route, instance)
+        cost = sum(subRouteCost(sub_route, demands, instance.distance_matrix.item, instance.drone)
+                   for sub_route in sub_routes)
+        vehicles, total_cost, split = evaluateRoute(route, instance, instance.drone, return_route=True)
+        assert split == sub_routes
+        assert vehicles == len(sub_routes)
+        assert total_cost == pytest.approx(cost, rel=1e-12)
+        assert getRouteCost(route, instance, instance.drone) == total_cost
+        assert getNumVehiclesRequired(route, instance, drone=instance.drone) == vehicles
+
+
+@pytest.mark.parametrize("split_mode", ["greedy", "optimal"])
+def test_batch_evaluation_matches_the_scalar_one(instance, split_mode):
+    routes = randomRoutes(instance.num_customers, 20, seed=1)
+    vehicles, total_cost = eval_population_fitness(routes, instance, instance.drone, 1, split_mode)
+    for row, route in enumerate(routes.tolist()):
+        expected_vehicles, expected_cost = eval_indvidual_fitness(route, instance, instance.drone, 1, split_mode)
+        assert vehicles[row] == expected_vehicles
+        assert total_cost[row] == pytest.approx(expected_cost, rel=1e-12)
+
+
+def newSolver(tmp_path, monkeypatch, **algo_kwargs):
+    monkeypatch.setattr(NSGA2_vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    algo = nsgaAlgo(syntheticInstance(15, seed=4, layout="xy"), rng=4, **algo_kwargs)
+    algo.pop_size = 8
+    return algo
+
+
+def test_time_limit_stops_the_run_early(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch)
+    algo.num_gen = 100000
+    solution = algo.runMain(time_limit=0.2)
+
+    assert solution['stop_reason'] == "time limit reached"
+    assert 0 < solution['generation'] < algo.num_gen
+
+
+def test_snapshot_holds_the_best_found_so_far(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch)
+    algo.num_gen = 6
+    assert algo.snapshot() is None
+
+    snapshots = []
+    publish = algo.publishSnapshot
+
+    def publishAndRead():
+        publish()
+        snapshots.append(algo.snapshot())
+
+    monkeypatch.setattr(algo, 'publishSnapshot', publishAndRead)
+    solution = algo.runMain()
+
+    assert [snapshot['generation'] for snapshot in snapshots] == list(range(7))
+    best = [snapshot['best_fitness'] for snapshot in snapshots]
+    assert best == sorted(best, reverse=True)
+    assert solution['best_fitness'] == tools.selBest(algo.pop, 1)[0].fitness.values
+    assert solution['best_individual'] == list(tools.selBest(algo.pop, 1)[0])
+
+
+def test_chunked_evaluation_stops_at_the_deadline(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch, eval_chunk_size=3)
+    rng = numpy.random.default_rng(0)
+    individuals = [creator.Individual((rng.permutation(15) + 1).tolist()) for _ in range(10)]
+
+    assert algo.evaluateInvalid(individuals, deadline=time.monotonic() - 1) == individuals[:3]
+    assert [ind.fitness.valid for ind in individuals] == [True] * 3 + [False] * 7
+    assert algo.evaluateInvalid(individuals) == individuals[3:]
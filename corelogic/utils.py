@@ -1,10 +1,23 @@
 import os
 import io
+import sys
+import logging
 import fnmatch
+import argparse
+import functools
+import multiprocessing
+import numpy
 from json import load, dump
 
 BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
+# Distance matrix builders and the binary instance format, shared with the Django app in vrpcore
+sys.path.append(os.path.join(BASE_DIR, 'dronehackon'))
+from vrpcore.distances import distanceMatrix, packedDistances
+from vrpcore.instancefile import saveInstanceFile, INSTANCE_EXTENSION
+
+logger = logging.getLogger(__name__)
+
 
 def calculate_distance(customer1, customer2):
     # Calculate distance between customer1 and customer 2 given their
@@ -17,96 +30,149 @@ def calculate_distance(customer1, customer2):
             (customer1['coordinates']['y'] - customer2['coordinates']['y']) ** 2) ** 0.5
 
 
-def converttext2json():
+def textToJson(text_file, dtype=numpy.float64, packed=False):
     """
-    Inputs : None
-    Outputs: Reads the *.txt file in text directory and converts in to
-             *.json file in json directory.
+    Inputs : path to a Solomon format *.txt file
+             dtype - float64 or float32 for the distances
+             packed - keep only the upper triangle of the symmetric distance matrix,
+                      as distance_matrix_packed, see distances.packedDistances
+    Outputs: instance as the json object converttext2json writes for it, the
+             distances as a numpy array
     """
-    print(f'base directory is {BASE_DIR}')
-    text_dir = os.path.join(BASE_DIR, 'data', 'text')
-    json_dir = os.path.join(BASE_DIR, 'data', 'json')
-    print(f'text_dir is {text_dir}')
-    print(f'json_dir is {json_dir}')
-
-    for text_file in map(lambda text_filename: os.path.join(text_dir, text_filename), \
-                         fnmatch.filter(os.listdir(text_dir), '*.txt')):
-        print(text_file)
-        json_data = {}
-        numCustomers = 0
-        with io.open(text_file, 'rt', newline='') as file_object:
-            for line_count, line in enumerate(file_object, start=1):
+    json_data = {}
+    numCustomers = 0
+    with io.open(text_file, 'rt', newline='') as file_object:
+        for line_count, line in enumerate(file_object, start=1):
+            # print(f'line_count is {line_count}')
+            # print(f'line is {line}')
+
+            if line_count in [2, 3, 4, 6, 7, 8, 9]:
+                pass
+
+            # Instance name details, input text file name
+            elif line_count == 1:
+                json_data['instance_name'] = line.strip()
+
+            # Vehicle capacity and max vehicles details
+            elif line_count == 5:
+                values = line.strip().split()
+                json_data['max_vehicle_number'] = int(values[0])
+                json_data['vehicle_capacity'] = float(values[1])
+
+            # Depot details
+            elif line_count == 10:
+                # This is depot
+                values = line.strip().split()
+                json_data['depart'] = {
+                    'coordinates': {
+                        'x': float(values[1]),
+                        'y': float(values[2]),
+                    },
+                    'demand': float(values[3]),
+                    'ready_time': float(values[4]),
+                    'due_time': float(values[5]),
+                    'service_time': float(values[6]),
+                }
+
+            # Customer details
+            else:
+                # Rest all are customers
                 # print(f'line_count is {line_count}')
                 # print(f'line is {line}')
+                # Adding customer to number of customers
+                numCustomers += 1
+                values = line.strip().split()
+                json_data[f'customer_{values[0]}'] = {
+                    'coordinates': {
+                        'x': float(values[1]),
+                        'y': float(values[2]),
+                    },
+                    'demand': float(values[3]),
+                    'ready_time': float(values[4]),
+                    'due_time': float(values[5]),
+                    'service_time': float(values[6]),
+                }
+
+    # print(f'Number of customers is {numCustomers}')
+    customers = ['depart'] + [f'customer_{x}' for x in range(1, numCustomers + 1)]
+    # print(customers)
+
+    # Writing the distance_matrix, computed block by block from the coordinate array
+    coordinates = numpy.array([[json_data[customer]['coordinates']['x'], json_data[customer]['coordinates']['y']]
+                               for customer in customers])
+    if packed:
+        json_data['distance_matrix_packed'] = packedDistances(coordinates, "euclidean", dtype)
+    else:
+        json_data['distance_matrix'] = distanceMatrix(coordinates, "euclidean", dtype)
+
+    # Writing the number of customers details
+    json_data['Number_of_customers'] = numCustomers
+    return json_data
+
+
+def convertTextFile(text_file, output_dir, dtype=numpy.float64, packed=False, binary=False):
+    """
+    Inputs : text_file - Solomon format *.txt file
+             output_dir - directory the instance is written to, named after the instance
+             dtype, packed - see textToJson
+             binary - write the memory-mapped binary instance file instead of json
+    Outputs: path of the written file
+    """
+    logger.info(f'Converting {text_file}')
+    json_data = textToJson(text_file, dtype, packed)
+    matrix_key = 'distance_matrix_packed' if packed else 'distance_matrix'
+
+    # Giving filename as instance name, which is input text file name
+    if binary:
+        output_file = os.path.join(output_dir, f"{json_data['instance_name']}{INSTANCE_EXTENSION}")
+        logger.info(f'Write to file: {output_file}')
+        saveInstanceFile(json_data, output_file, dtype)
+        return output_file
+
+    json_file = os.path.join(output_dir, f"{json_data['instance_name']}.json")
+    logger.info(f'Write to file: {json_file}')
+
+    # Writing the json file to disk and saving it under json_customize directory
+    json_data[matrix_key] = json_data[matrix_key].tolist()
+    with io.open(json_file, 'wt', newline='') as file_object:
+        dump(json_data, file_object, sort_keys=True, indent=4, separators=(',', ': '))
+    return json_file
+
+
+def converttext2json(text_dir=None, json_dir=None, processes=1, dtype=numpy.float64, packed=False, binary=False):
+    """
+    Inputs : text_dir, json_dir - directories of the text files and of the converted
+                                  instances, data/text and data/json if None
+             processes - files converted at once in worker processes
+             dtype, packed, binary - see convertTextFile
+    Outputs: Reads the *.txt file in text directory and converts in to
+             *.json file in json directory, returns the written files.
+    """
+    logger.debug(f'base directory is {BASE_DIR}')
+    text_dir = text_dir or os.path.join(BASE_DIR, 'data', 'text')
+    json_dir = json_dir or os.path.join(BASE_DIR, 'data', 'json')
+    logger.debug(f'text_dir is {text_dir}')
+    logger.debug(f'json_dir is {json_dir}')
 
-                if line_count in [2, 3, 4, 6, 7, 8, 9]:
-                    pass
-
-                # Instance name details, input text file name
-                elif line_count == 1:
-                    json_data['instance_name'] = line.strip()
-
-                # Vehicle capacity and max vehicles details
-                elif line_count == 5:
-                    values = line.strip().split()
-                    json_data['max_vehicle_number'] = int(values[0])
-                    json_data['vehicle_capacity'] = float(values[1])
-
-                # Depot details
-                elif line_count == 10:
-                    # This is depot
-                    values = line.strip().split()
-                    json_data['depart'] = {
-                        'coordinates': {
-                            'x': float(values[1]),
-                            'y': float(values[2]),
-                        },
-                        'demand': float(values[3]),
-                        'ready_time': float(values[4]),
-                        'due_time': float(values[5]),
-                        'service_time': float(values[6]),
-                    }
-
-                # Customer details
-                else:
-                    # Rest all are customers
-                    # print(f'line_count is {line_count}')
-                    # print(f'line is {line}')
-                    # Adding customer to number of customers
-                    numCustomers += 1
-                    values = line.strip().split()
-                    json_data[f'customer_{values[0]}'] = {
-                        'coordinates': {
-                            'x': float(values[1]),
-                            'y': float(values[2]),
-                        },
-                        'demand': float(values[3]),
-                        'ready_time': float(values[4]),
-                        'due_time': float(values[5]),
-                        'service_time': float(values[6]),
-                    }
-
-        # print(f'Number of customers is {numCustomers}')
-        customers = ['depart'] + [f'customer_{x}' for x in range(1, numCustomers + 1)]
-        # print(customers)
-
-        # Writing the distance_matrix
-        json_data['distance_matrix'] = [[calculate_distance(json_data[customer1], \
-                                                            json_data[customer2]) for customer1 in customers] for
-                                        customer2 in customers]
-
-        # Writing the number of customers details
-        json_data['Number_of_customers'] = numCustomers
-
-        # Giving filename as instance name, which is input text file name
-        json_file_name = f"{json_data['instance_name']}.json"
-        json_file = os.path.join(json_dir, json_file_name)
-        print(f'Write to file: {json_file}')
-
-        # Writing the json file to disk and saving it under json_customize directory
-        with io.open(json_file, 'wt', newline='') as file_object:
-            dump(json_data, file_object, sort_keys=True, indent=4, separators=(',', ': '))
+    text_files = [os.path.join(text_dir, text_filename)
+                  for text_filename in sorted(fnmatch.filter(os.listdir(text_dir), '*.txt'))]
+    convert = functools.partial(convertTextFile, output_dir=json_dir, dtype=dtype, packed=packed, binary=binary)
+    if processes > 1 and len(text_files) > 1:
+        with multiprocessing.Pool(min(processes, len(text_files))) as pool:
+            return pool.map(convert, text_files, chunksize=1)
+    return [convert(text_file) for text_file in text_files]
 
 
 if __name__ == "__main__":
-    converttext2json()
+    parser = argparse.ArgumentParser(description="Convert Solomon format text instances")
+    parser.add_argument('--textDir', type=str, default=None,
+                        help="Directory of the *.txt files, data/text if not given")
+    parser.add_argument('--jsonDir', type=str, default=None, help="Output directory, data/json if not given")
+    parser.add_argument('--processes', type=int, default=1, help="Files converted in parallel")
+    parser.add_argument('--float32', action='store_true', help="Store the distances in single precision")
+    parser.add_argument('--packed', action='store_true', help="Store only the upper triangle of the distances")
+    parser.add_argument('--binary', action='store_true', help="Write memory-mapped binary instance files")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    converttext2json(args.textDir, args.jsonDir, args.processes, numpy.float32 if args.float32 else numpy.float64,
+                     args.packed, args.binary)
@@ -1,3 +1,7 @@
-from .celery import app as celery_app
+# The celery app is optional, the solver modules and the benchmark import without it
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
 
-__all__ = ('celery_app',)
\ No newline at end of file
+__all__ = ('celery_app',)
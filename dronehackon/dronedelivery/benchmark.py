@@ -0,0 +1,159 @@
+import io
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tracemalloc
+import contextlib
+import numpy
+
+from deap import creator
+
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+from vrpcore.variation import varyBatch
+from vrpcore.selection import selNSGA2Biobjective, selTournamentDCDBiobjective
+from .vrp import drone, createTypes, routeToSubroute, getRouteCost, eval_indvidual_fitness, \
+    eval_population_fitness, cxOrderedVrp, mutationShuffle, nsgaAlgo
+
+# Micro-benchmarks of the solver's hot paths on seeded synthetic instances, from the dronehackon directory
+#   python -m dronedelivery.benchmark --sizes 25 100 1000 --output benchmark.json
+
+OPERATIONS = ("route_to_subroute", "get_route_cost", "eval_individual_fitness", "eval_population_fitness",
+              "cx_ordered_vrp", "mutation_shuffle", "vary_batch", "sel_nsga2", "sel_tournament_dcd", "generation")
+
+
+# Timing of repeated calls of func, each on fresh arguments from setup that are not timed
+def measure(func, setup=None, min_calls=5, max_calls=10000, min_seconds=0.2):
+    """
+    Inputs : func - function to time
+             setup - function returning the argument tuple of a call, None for no arguments
+             min_calls, max_calls - bounds of the number of timed calls
+             min_seconds - timed calls go on until they add up to this, within the bounds
+    Outputs : dict with the number of calls, their total, mean, min, percentiles and max in seconds,
+              the calls per second and the peak memory allocated by one call
+    """
+    setup = setup or tuple
+    func(*setup())
+
+    times = []
+    total = 0.0
+    while len(times) < max_calls and (len(times) < min_calls or total < min_seconds):
+        args = setup()
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        times.append(elapsed)
+        total += elapsed
+
+    # Peak memory of one more call, traced apart since tracing slows the calls down
+    args = setup()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    times = numpy.array(times)
+    p50, p90, p99 = numpy.percentile(times, [50, 90, 99]).tolist()
+    return {'calls': len(times), 'total_s': total, 'mean_s': float(times.mean()), 'min_s': float(times.min()),
+            'p50_s': p50, 'p90_s': p90, 'p99_s': p99, 'max_s': float(times.max()),
+            'ops_per_sec': len(times) / total if total > 0 else float('inf'), 'peak_memory_bytes': peak}
+
+
+# The benchmarked calls for one instance size, as name -> (function, setup, items handled per call)
+def benchmarkCases(num_customers, seed, pop_size, split_mode):
+    json_data = syntheticInstance(num_customers, seed)
+    route_drone = drone(SYNTHETIC_DRONE)
+    instance = compileInstance(json_data, route_drone)
+    rng = numpy.random.default_rng(seed)
+    random.seed(seed)
+    routes = numpy.array([rng.permutation(num_customers) + 1 for _ in range(pop_size)], dtype=numpy.int64)
+    route, other = routes[0].tolist(), routes[1].tolist()
+
+    # Individuals with random fitness for the selections, twice the population as before survivor selection
+    createTypes()
+    individuals = []
+    for row, values in enumerate(rng.random((2 * pop_size, 2)).tolist()):
+        ind = creator.Individual(routes[row % pop_size].tolist())
+        ind.fitness.values = (float(int(values[0] * 10)), values[1])
+        individuals.append(ind)
+    survivors = selNSGA2Biobjective(individuals, pop_size)
+
+    # A solver whose first population is ready, each call runs one more generation
+    with contextlib.redirect_stdout(io.StringIO()):
+        algo = nsgaAlgo(json_data, SYNTHETIC_DRONE, split_mode=split_mode, rng=seed)
+        algo.pop_size = pop_size
+        algo.num_gen = sys.maxsize
+        algo.generatingPopFitness()
+
+    return {
+        "route_to_subroute": (lambda: routeToSubroute(route, instance, route_drone, split_mode), None, 1),
+        "get_route_cost": (lambda: getRouteCost(route, instance, route_drone, 1, split_mode), None, 1),
+        "eval_individual_fitness": (lambda: eval_indvidual_fitness(route, instance, route_drone, 1, split_mode),
+                                    None, 1),
+        "eval_population_fitness": (lambda: eval_population_fitness(routes, instance, route_drone, 1, split_mode),
+                                    None, pop_size),
+        "cx_ordered_vrp": (cxOrderedVrp, lambda: (list(route), list(other)), 1),
+        "mutation_shuffle": (lambda ind: mutationShuffle(ind, 0.02), lambda: (list(route),), 1),
+        "vary_batch": (lambda: varyBatch(routes, 0.85, 0.02, rng), None, pop_size),
+        "sel_nsga2": (lambda: selNSGA2Biobjective(individuals, pop_size), None, 2 * pop_size),
+        "sel_tournament_dcd": (lambda: selTournamentDCDBiobjective(survivors, pop_size, rng), None, pop_size),
+        "generation": (lambda: algo.runGenerations(1), None, pop_size),
+    }
+
+
+def runBenchmarks(sizes, seed=0, pop_size=100, split_mode="greedy", operations=OPERATIONS, min_seconds=0.2):
+    """
+    Inputs : sizes - numbers of customers of the synthetic instances
+             seed - seed of the instances, routes and operators
+             pop_size - population of the batch operations and of the generation
+             split_mode - split the evaluations use
+             operations - names of the operations to run, see OPERATIONS
+             min_seconds - timed calls per operation add up to at least this
+    Outputs : dict with the metadata of the machine and a result record per size and operation
+    """
+    results = []
+    for num_customers in sizes:
+        cases = benchmarkCases(num_customers, seed, pop_size, split_mode)
+        for name in operations:
+            func, setup, items = cases[name]
+            record = {'operation': name, 'num_customers': num_customers, 'seed': seed, 'pop_size': pop_size,
+                      'split_mode': split_mode, 'items_per_call': items}
+            record.update(measure(func, setup, min_seconds=min_seconds))
+            results.append(record)
+    metadata = {'python': platform.python_version(), 'numpy': numpy.__version__, 'platform': platform.platform(),
+                'machine': platform.machine(), 'time': time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+    return {'metadata': metadata, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the VRP hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 100, 500, 1000, 5000],
+                        help="Numbers of customers of the synthetic instances")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the instances and routes")
+    parser.add_argument('--popSize', type=int, default=100, help="Population of the batch operations")
+    parser.add_argument('--splitMode', type=str, default="greedy", choices=["greedy", "optimal"],
+                        help="Split the evaluations use")
+    parser.add_argument('--operations', type=str, nargs='+', default=list(OPERATIONS), choices=OPERATIONS,
+                        help="Operations to benchmark")
+    parser.add_argument('--minSeconds', type=float, default=0.2,
+                        help="Least total time of the timed calls of an operation")
+    parser.add_argument('--output', type=str, default=None, help="JSON file for the results, stdout if not given")
+    args = parser.parse_args(argv)
+
+    report = runBenchmarks(args.sizes, args.seed, args.popSize, args.splitMode, args.operations, args.minSeconds)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
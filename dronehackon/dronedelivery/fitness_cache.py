@@ -0,0 +1,100 @@
+import sys
+import hashlib
+import functools
+import numpy
+
+from collections import OrderedDict
+
+
+# Rough footprint of one cached fitness, key bytes + value tuple + ordered dict node
+ENTRY_BYTES = sys.getsizeof(b'\0' * 16) + sys.getsizeof((0, 0.0)) + sys.getsizeof(0.0) + 100
+
+
+# Fitness values of already seen routes, evicting the least recently used ones
+class FitnessCache(object):
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.reported_hits = 0
+        self.reported_misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(route):
+        """
+        Inputs : route as a sequence or 1-D array of customer ids
+        Outputs : 16 byte digest of the permutation
+        """
+        return hashlib.blake2b(numpy.ascontiguousarray(route, dtype=numpy.int32).tobytes(),
+                               digest_size=16).digest()
+
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def decorator(self, evaluate):
+        # For toolbox.decorate, looking the route up before running evaluate
+        @functools.wraps(evaluate)
+        def cached_evaluate(individual, *args, **kwargs):
+            key = self.key(individual)
+            fitness = self.get(key)
+            if fitness is None:
+                fitness = evaluate(individual, *args, **kwargs)
+                self.put(key, fitness)
+            return fitness
+        return cached_evaluate
+
+    def evaluateBatch(self, routes, evaluate_batch):
+        """
+        Inputs : routes - 2-D integer array, one route per row
+                 evaluate_batch - function returning (vehicles, costs) arrays for routes
+        Outputs : (vehicles, costs) arrays, only the unseen routes are passed to evaluate_batch
+        """
+        routes = numpy.ascontiguousarray(routes, dtype=numpy.int32)
+        vehicles = numpy.zeros(len(routes), dtype=numpy.int64)
+        costs = numpy.zeros(len(routes))
+
+        # Routes repeated inside the batch are evaluated once
+        missing = OrderedDict()
+        for row, route in enumerate(routes):
+            key = self.key(route)
+            fitness = self.get(key) if key not in missing else None
+            if fitness is None:
+                missing.setdefault(key, []).append(row)
+            else:
+                vehicles[row], costs[row] = fitness
+
+        if missing:
+            first_rows = [rows[0] for rows in missing.values()]
+            new_vehicles, new_costs = evaluate_batch(routes[first_rows])
+            for (key, rows), num_vehicles, cost in zip(missing.items(), new_vehicles.tolist(), new_costs.tolist()):
+                self.put(key, (num_vehicles, cost))
+                vehicles[rows] = num_vehicles
+                costs[rows] = cost
+                self.hits += len(rows) - 1
+        return vehicles, costs
+
+    def popCounters(self):
+        """
+        Outputs : (hits, misses) since the previous call
+        """
+        counters = (self.hits - self.reported_hits, self.misses - self.reported_misses)
+        self.reported_hits, self.reported_misses = self.hits, self.misses
+        return counters
@@ -0,0 +1,235 @@
+import time
+import queue
+import random
+import multiprocessing
+
+from deap import creator, tools
+
+from .vrp import nsgaAlgo, exportCsv
+
+# Seconds between two checks that the other processes of the island model are still alive
+POLL_SECONDS = 1.0
+
+
+# Islands each island sends its migrants to
+def migrationTargets(num_islands, topology):
+    """
+    Inputs : num_islands - number of islands
+             topology - "ring", island i sends to i + 1, or "full", every island sends to all others
+    Outputs : list, for every island, of the islands it sends to
+    """
+    if topology == "ring":
+        return [[(island + 1) % num_islands] if num_islands > 1 else [] for island in range(num_islands)]
+    if topology == "full":
+        return [[other for other in range(num_islands) if other != island] for island in range(num_islands)]
+    raise ValueError(f"Unknown migration topology {topology}, expected ring or full")
+
+
+# Best non-dominated individuals of a population, as plain data that can be sent to another island
+def selectMigrants(pop, num_migrants):
+    """
+    Inputs : pop - evaluated population
+             num_migrants - most individuals to send
+    Outputs : list of (route, fitness values) taken from the first front
+    """
+    first_front = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
+    migrants = tools.selNSGA2(first_front, min(num_migrants, len(first_front)))
+    return [(list(ind), ind.fitness.values) for ind in migrants]
+
+
+def toIndividuals(migrants):
+    individuals = []
+    for route, values in migrants:
+        ind = creator.Individual(route)
+        ind.fitness.values = values
+        individuals.append(ind)
+    return individuals
+
+
+# Next message of an island's inbox, waiting for it as long as the parent process is alive
+def receiveMessage(inbox):
+    while True:
+        try:
+            return inbox.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            if not multiprocessing.parent_process().is_alive():
+                raise RuntimeError("The parent process of the islands is gone")
+
+
+# Body of an island process, an nsgaAlgo that exchanges migrants every migration_interval generations
+def runIsland(island, json_data, drone_params, algo_kwargs, settings, inboxes, targets, num_sources, results):
+    """
+    Inputs : island - island number
+             json_data, drone_params, algo_kwargs - arguments of the island's nsgaAlgo
+             settings - pop_size, cross_prob, mut_prob, num_gen, migration_interval, num_migrants, seed
+                        and deadline, the time.monotonic() after which no new generation is started or None
+             inboxes - one queue per island receiving (epoch, source, migrants), or (None, source, None)
+                       once the source is done
+             targets - islands this island sends to
+             num_sources - number of islands sending to this island
+             results - queue receiving (island, final population, logbook, generation, stop reason)
+    Outputs : None
+    """
+    seed = None if settings['seed'] is None else settings['seed'] + island
+    if seed is not None:
+        random.seed(seed)
+
+    algo = nsgaAlgo(json_data, drone_params, rng=seed, **algo_kwargs)
+    algo.pop_size = settings['pop_size']
+    algo.cross_prob = settings['cross_prob']
+    algo.mut_prob = settings['mut_prob']
+    algo.num_gen = settings['num_gen']
+    algo.deadline = settings['deadline']
+
+    with algo:
+        algo.generatingPopFitness()
+
+        # Migrants of later epochs can arrive before the ones still awaited, and the sources that are done
+        #   send nothing more
+        pending = {}
+        finished = set()
+        epoch = 0
+        while algo.generation < settings['num_gen']:
+            algo.runGenerations(min(settings['migration_interval'], settings['num_gen'] - algo.generation))
+            if algo.generation >= settings['num_gen'] or algo.stop_reason is not None:
+                break
+
+            migrants = selectMigrants(algo.pop, settings['num_migrants'])
+            for target in targets:
+                inboxes[target].put((epoch, island, migrants))
+
+            arrived = pending.pop(epoch, [])
+            while len({message[1] for message in arrived} | finished) < num_sources:
+                message = receiveMessage(inboxes[island])
+                if message[0] is None:
+                    finished.add(message[1])
+                elif message[0] == epoch:
+                    arrived.append(message)
+                else:
+                    pending.setdefault(message[0], []).append(message)
+
+            # Immigrants in source order so a seeded run does not depend on arrival order
+            immigrants = []
+            for _, _, source_migrants in sorted(arrived, key=lambda message: message[1]):
+                immigrants.extend(toIndividuals(source_migrants))
+            if immigrants:
+                algo.pop = algo.toolbox.select(algo.pop + immigrants, algo.pop_size)
+            epoch += 1
+
+    # An island stopped by the time limit can be done before the islands it receives from, it reads their
+    #   migrants until they are done too so that no queue is left with data nobody reads
+    for target in targets:
+        inboxes[target].put((None, island, None))
+    while len(finished) < num_sources:
+        message = receiveMessage(inboxes[island])
+        if message[0] is None:
+            finished.add(message[1])
+
+    results.put((island, [(list(ind), ind.fitness.values) for ind in algo.pop], algo.logbook, algo.generation,
+                 algo.stop_reason))
+
+
+# NSGA-II over several populations evolving in their own processes
+class islandAlgo(nsgaAlgo):
+
+    def __init__(self, json_data, drone_params, num_islands=4, migration_interval=10, num_migrants=5,
+                 topology="ring", seed=None, **algo_kwargs):
+        """
+        Inputs : json_data, drone_params - as for nsgaAlgo
+                 num_islands - number of populations, each in its own process
+                 migration_interval - generations between two migrations
+                 num_migrants - individuals each island sends at a migration
+                 topology - "ring" or "full", see migrationTargets
+                 seed - island i seeds its random generators with seed + i, unseeded if None
+                 algo_kwargs - further keyword arguments of every island's nsgaAlgo
+        """
+        # The islands evaluate their own populations, workers would multiply the processes
+        algo_kwargs['workers'] = 1
+
+        # Migrations wait for every island, so none of them may stop early, and the islands would all write
+        #   to the same checkpoint file, the island model does not checkpoint
+        algo_kwargs['stopping'] = None
+        algo_kwargs['checkpoint_path'] = None
+        super().__init__(json_data, drone_params, **algo_kwargs)
+        self.algo_kwargs = algo_kwargs
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.topology = topology
+        self.targets = migrationTargets(num_islands, topology)
+        self.seed = seed
+
+    def runIslands(self):
+        settings = {'pop_size': self.pop_size, 'cross_prob': self.cross_prob, 'mut_prob': self.mut_prob,
+                    'num_gen': self.num_gen, 'migration_interval': self.migration_interval,
+                    'num_migrants': self.num_migrants, 'seed': self.seed, 'deadline': self.deadline}
+        num_sources = [sum(island in targets for targets in self.targets) for island in range(self.num_islands)]
+
+        inboxes = [multiprocessing.Queue() for _ in range(self.num_islands)]
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=runIsland,
+                                             args=(island, self.json_instance, self.drone_params, self.algo_kwargs,
+                                                   settings, inboxes, self.targets[island], num_sources[island],
+                                                   results))
+                     for island in range(self.num_islands)]
+        for process in processes:
+            process.start()
+
+        # Draining the results before joining, a process does not exit while its queue holds data. An island
+        #   that dies would leave the others waiting for its migrants, they are all stopped then
+        island_results = {}
+        try:
+            while len(island_results) < len(processes):
+                try:
+                    result = results.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    for island, process in enumerate(processes):
+                        if island not in island_results and process.exitcode not in (None, 0):
+                            raise RuntimeError(f"Island {island} stopped with exit code {process.exitcode}")
+                    continue
+                island_results[result[0]] = result
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+        island_results = [island_results[island] for island in range(self.num_islands)]
+        self.island_pops = [toIndividuals(pop) for _, pop, _, _, _ in island_results]
+        self.island_logbooks = [logbook for _, _, logbook, _, _ in island_results]
+        self.generation = max(generation for _, _, _, generation, _ in island_results)
+        stop_reasons = [stop_reason for _, _, _, _, stop_reason in island_results]
+        self.stop_reason = "time limit reached" if "time limit reached" in stop_reasons else \
+            f"reached {self.num_gen} generations"
+
+        # Merging the islands into a single Pareto front, one individual per route
+        unique = {}
+        for pop in self.island_pops:
+            for ind in pop:
+                unique.setdefault(tuple(ind), ind)
+        merged = list(unique.values())
+        self.pop = tools.sortNondominated(merged, len(merged), first_front_only=True)[0]
+        self.publishSnapshot()
+
+    def doExport(self):
+        for island, logbook in enumerate(self.island_logbooks):
+            csv_file_name = f"{self.instance.instance_name}_" \
+                            f"pop{self.pop_size}_crossProb{self.cross_prob}" \
+                            f"_mutProb{self.mut_prob}_numGen{self.num_gen}_island{island}.csv"
+            exportCsv(csv_file_name, logbook)
+
+    def runMain(self, time_limit=None, resume=False):
+        """
+        Inputs : time_limit - seconds after which the islands start no new generation, None for no limit
+                 resume - not supported, the island model does not checkpoint
+        Outputs : snapshot of the merged front
+        """
+        if resume:
+            raise ValueError("islandAlgo does not write checkpoints, it cannot resume a run")
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.runIslands()
+        self.getBestInd()
+        self.doExport()
+        return self.snapshot()
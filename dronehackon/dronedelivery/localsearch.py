@@ -0,0 +1,330 @@
+import time
+
+
+# Smallest weighted distance decrease for a move to count as an improvement, rounding aside
+IMPROVEMENT = 1e-9
+
+
+# Running terms of a subroute that make the cost change of a move O(1). Its weighted distance is
+#   W = sum over legs t of d(node t, node t + 1) * load t, the drone carrying all it has still to deliver
+class SubrouteTerms(object):
+
+    def __init__(self, customers, demands, distance_between, drone_weight):
+        # Positions 0 and len(customers) + 1 are the depot
+        nodes = [0] + customers + [0]
+        size = len(nodes)
+        self.nodes = nodes
+        self.num_customers = len(customers)
+
+        # loads[t] - weight on the leg leaving position t
+        load = drone_weight
+        for customer_id in customers:
+            load += demands[customer_id]
+        self.total_load = load
+        self.loads = [0.0] * (size - 1)
+        for position in range(size - 1):
+            self.loads[position] = load
+            load -= demands[nodes[position + 1]]
+
+        # Sums over the legs before position k of the distances, of the weighted distances, of the
+        #   reversed leg distances and of those times the demand delivered when leaving the leg's start
+        self.path = [0.0] * size
+        self.weighted = [0.0] * size
+        self.reverse_path = [0.0] * size
+        self.reverse_delivered = [0.0] * size
+        for position in range(size - 1):
+            leg = distance_between(nodes[position], nodes[position + 1])
+            reverse_leg = distance_between(nodes[position + 1], nodes[position])
+            delivered = self.total_load - self.loads[position]
+            self.path[position + 1] = self.path[position] + leg
+            self.weighted[position + 1] = self.weighted[position] + leg * self.loads[position]
+            self.reverse_path[position + 1] = self.reverse_path[position] + reverse_leg
+            self.reverse_delivered[position + 1] = self.reverse_delivered[position] + reverse_leg * delivered
+        self.distance = self.weighted[-1]
+
+    def leg(self, position):
+        # Distance of the leg leaving position, from the path sums
+        return self.path[position + 1] - self.path[position]
+
+
+# Local search on the subroutes of a route, 2-opt and or-opt inside a subroute, relocate and swap
+#   between two of them. Moves are evaluated in O(1) on the running terms and only tried between
+#   a customer and its nearest neighbors. Every applied move lowers the cost and keeps the subroutes
+#   within capacity and battery, a subroute emptied by a relocation saves its vehicle
+class LocalSearch(object):
+
+    MOVES = ("two_opt", "or_opt", "relocate", "swap")
+
+    def __init__(self, instance, drone, battery_threshold, num_neighbors=10, max_moves=2000, segment_length=3):
+        """
+        Inputs : instance - compiled instance
+                 drone - drone parameters of the cost
+                 battery_threshold - most battery a subroute may use
+                 num_neighbors - candidate list size per customer
+                 max_moves - most moves evaluated per call of improve
+                 segment_length - longest segment moved by or-opt
+        """
+        self.instance = instance
+        self.drone = drone
+        self.battery_threshold = battery_threshold
+        self.max_moves = max_moves
+        self.segment_length = segment_length
+        self.demands = instance.demand.tolist()
+        self.distance_between = instance.distance_matrix.item
+        self.neighbors = instance.neighborIndex(num_neighbors).neighbors[:, :num_neighbors].tolist()
+        self.evaluated = dict.fromkeys(self.MOVES, 0)
+        self.applied = dict.fromkeys(self.MOVES, 0)
+        self.seconds = 0.0
+
+    def counters(self):
+        return {'evaluated': dict(self.evaluated), 'applied': dict(self.applied), 'seconds': self.seconds}
+
+    def cost(self, distance, num_customers):
+        # Battery used by a subroute of the given weighted distance, as subRouteCost
+        return self.drone.battery_consumption_perKM_perHr * distance + \
+            (num_customers + 1) * self.drone.battery_consumption_takeoff_landing
+
+    def feasible(self, distance, num_customers, load):
+        return load <= self.instance.vehicle_capacity and \
+            self.cost(distance, num_customers) <= self.battery_threshold
+
+    def improve(self, sub_routes, deadline=None):
+        """
+        Inputs : sub_routes - list of subroutes, lists of customer ids, not modified
+                 deadline - time.monotonic() after which no further move is evaluated
+        Outputs : (improved subroutes, number of moves applied)
+        """
+        started = time.monotonic()
+        self.sub_routes = [list(sub_route) for sub_route in sub_routes if sub_route]
+        self.terms = [self.termsOf(sub_route) for sub_route in self.sub_routes]
+        self.where = {}
+        for route_index, sub_route in enumerate(self.sub_routes):
+            self.locate(route_index)
+        self.budget = self.max_moves
+
+        applied = 0
+        improved = True
+        while improved:
+            improved = False
+            for customer_id in [customer_id for sub_route in self.sub_routes for customer_id in sub_route]:
+                if self.budget <= 0 or (deadline is not None and time.monotonic() >= deadline):
+                    improved = False
+                    break
+                if self.tryTwoOpt(customer_id) or self.tryOrOpt(customer_id) or \
+                        self.tryRelocate(customer_id) or self.trySwap(customer_id):
+                    applied += 1
+                    improved = True
+
+        self.seconds += time.monotonic() - started
+        return [sub_route for sub_route in self.sub_routes if sub_route], applied
+
+    def termsOf(self, sub_route):
+        return SubrouteTerms(sub_route, self.demands, self.distance_between, self.drone.weight)
+
+    def locate(self, route_index):
+        # Subroute and position, 1 for the first customer, of the customers of a subroute
+        for position, customer_id in enumerate(self.sub_routes[route_index], start=1):
+            self.where[customer_id] = (route_index, position)
+
+    def update(self, route_index, sub_route):
+        self.sub_routes[route_index] = sub_route
+        self.terms[route_index] = self.termsOf(sub_route)
+        self.locate(route_index)
+
+    def spend(self, move):
+        self.budget -= 1
+        self.evaluated[move] += 1
+        return self.budget >= 0
+
+    # Reversing the customers from the one after customer_id to a neighbor of it further on,
+    #   which becomes its successor
+    def tryTwoOpt(self, customer_id):
+        route_index, before = self.where[customer_id]
+        terms = self.terms[route_index]
+        first = before + 1
+        for neighbor in self.neighbors[customer_id]:
+            neighbor_route, last = self.where[neighbor]
+            if neighbor_route != route_index or last <= first:
+                continue
+            if not self.spend("two_opt"):
+                return False
+            change = self.twoOptChange(terms, first, last)
+            if change < -IMPROVEMENT and \
+                    self.feasible(terms.distance + change, terms.num_customers, terms.total_load):
+                sub_route = self.sub_routes[route_index]
+                sub_route[first - 1:last] = sub_route[first - 1:last][::-1]
+                self.update(route_index, sub_route)
+                self.applied["two_opt"] += 1
+                return True
+        return False
+
+    def twoOptChange(self, terms, first, last):
+        # Weighted distance change of reversing the customers at positions first to last
+        nodes, loads = terms.nodes, terms.loads
+        before = first - 1
+
+        # The reversed legs are flown backwards, each carrying the rest of the segment and all after it
+        delivered = terms.total_load - loads[before]
+        reversed_inside = (loads[last] - delivered) * (terms.reverse_path[last] - terms.reverse_path[first]) + \
+            terms.reverse_delivered[last] - terms.reverse_delivered[first]
+        return reversed_inside - (terms.weighted[last] - terms.weighted[first]) + \
+            self.distance_between(nodes[before], nodes[last]) * loads[before] + \
+            self.distance_between(nodes[first], nodes[last + 1]) * loads[last] - \
+            terms.leg(before) * loads[before] - terms.leg(last) * loads[last]
+
+    # Moving the segment of up to segment_length customers starting at customer_id elsewhere in its
+    #   subroute, right after or right before a neighbor of it
+    def tryOrOpt(self, customer_id):
+        route_index, first = self.where[customer_id]
+        terms = self.terms[route_index]
+        for length in range(1, self.segment_length + 1):
+            last = first + length - 1
+            if last > terms.num_customers:
+                break
+            for neighbor in self.neighbors[customer_id]:
+                neighbor_route, neighbor_position = self.where[neighbor]
+                if neighbor_route != route_index:
+                    continue
+                for after in (neighbor_position, neighbor_position - 1):
+                    if first - 1 <= after <= last:
+                        continue
+                    if not self.spend("or_opt"):
+                        return False
+                    change = self.orOptChange(terms, first, last, after)
+                    if change < -IMPROVEMENT and \
+                            self.feasible(terms.distance + change, terms.num_customers, terms.total_load):
+                        sub_route = self.sub_routes[route_index]
+                        segment = sub_route[first - 1:last]
+                        if after > last:
+                            sub_route = sub_route[:first - 1] + sub_route[last:after] + segment + sub_route[after:]
+                        else:
+                            sub_route = sub_route[:after] + segment + sub_route[after:first - 1] + sub_route[last:]
+                        self.update(route_index, sub_route)
+                        self.applied["or_opt"] += 1
+                        return True
+        return False
+
+    def orOptChange(self, terms, first, last, after):
+        # Weighted distance change of moving the customers at positions first to last after position after
+        nodes, loads, path, distance_between = terms.nodes, terms.loads, terms.path, self.distance_between
+        segment_demand = loads[first - 1] - loads[last]
+        inside = path[last] - path[first]
+
+        # Legs between the old and the new place gain or lose the segment's demand, the segment's
+        #   own legs the difference of the load left after it
+        if after > last:
+            change = distance_between(nodes[first - 1], nodes[last + 1]) * loads[first - 1] + \
+                segment_demand * (path[after] - path[last + 1]) + \
+                distance_between(nodes[after], nodes[first]) * (loads[after] + segment_demand) + \
+                (loads[after] - loads[last]) * inside + \
+                distance_between(nodes[last], nodes[after + 1]) * loads[after]
+        else:
+            change = distance_between(nodes[after], nodes[first]) * loads[after] + \
+                (loads[after] - segment_demand - loads[last]) * inside + \
+                distance_between(nodes[last], nodes[after + 1]) * (loads[after] - segment_demand) - \
+                segment_demand * (path[first - 1] - path[after + 1]) + \
+                distance_between(nodes[first - 1], nodes[last + 1]) * loads[last]
+        return change - terms.leg(first - 1) * loads[first - 1] - terms.leg(last) * loads[last] - \
+            terms.leg(after) * loads[after]
+
+    def removalChange(self, terms, position):
+        # Weighted distance change of taking the customer at position out of its subroute
+        nodes, loads = terms.nodes, terms.loads
+        demand = loads[position - 1] - loads[position]
+        return -demand * terms.path[position - 1] - terms.leg(position - 1) * loads[position - 1] - \
+            terms.leg(position) * loads[position] + \
+            self.distance_between(nodes[position - 1], nodes[position + 1]) * loads[position]
+
+    def insertionChange(self, terms, after, customer_id, demand):
+        # Weighted distance change of inserting the customer after the given position
+        nodes, loads = terms.nodes, terms.loads
+        return demand * terms.path[after] + \
+            self.distance_between(nodes[after], customer_id) * (loads[after] + demand) + \
+            self.distance_between(customer_id, nodes[after + 1]) * loads[after] - terms.leg(after) * loads[after]
+
+    def replacementChange(self, terms, position, customer_id, demand):
+        # Weighted distance change of putting the customer in place of the one at position
+        nodes, loads = terms.nodes, terms.loads
+        difference = demand - (loads[position - 1] - loads[position])
+        return difference * terms.path[position - 1] + \
+            self.distance_between(nodes[position - 1], customer_id) * (loads[position - 1] + difference) + \
+            self.distance_between(customer_id, nodes[position + 1]) * loads[position] - \
+            terms.leg(position - 1) * loads[position - 1] - terms.leg(position) * loads[position]
+
+    # Moving customer_id into another subroute, right after or right before a neighbor of it
+    def tryRelocate(self, customer_id):
+        route_index, position = self.where[customer_id]
+        terms = self.terms[route_index]
+        demand = self.demands[customer_id]
+        per_km = self.drone.battery_consumption_perKM_perHr
+        takeoff_landing = self.drone.battery_consumption_takeoff_landing
+
+        # An emptied subroute is not flown at all
+        if terms.num_customers == 1:
+            removal = -self.cost(terms.distance, 1)
+            removal_feasible = True
+        else:
+            removal_distance = self.removalChange(terms, position)
+            removal = per_km * removal_distance - takeoff_landing
+            removal_feasible = self.feasible(terms.distance + removal_distance, terms.num_customers - 1,
+                                             terms.total_load - demand)
+
+        for neighbor in self.neighbors[customer_id]:
+            neighbor_route, neighbor_position = self.where[neighbor]
+            if neighbor_route == route_index:
+                continue
+            target = self.terms[neighbor_route]
+            if target.total_load + demand > self.instance.vehicle_capacity:
+                continue
+            for after in (neighbor_position, neighbor_position - 1):
+                if not self.spend("relocate"):
+                    return False
+                insertion_distance = self.insertionChange(target, after, customer_id, demand)
+                change = removal + per_km * insertion_distance + takeoff_landing
+                if change < -per_km * IMPROVEMENT and removal_feasible and \
+                        self.feasible(target.distance + insertion_distance, target.num_customers + 1,
+                                      target.total_load + demand):
+                    sub_route = self.sub_routes[route_index]
+                    del sub_route[position - 1]
+                    target_route = self.sub_routes[neighbor_route]
+                    target_route.insert(after, customer_id)
+                    self.update(route_index, sub_route)
+                    self.update(neighbor_route, target_route)
+                    self.applied["relocate"] += 1
+                    return True
+        return False
+
+    # Exchanging customer_id with the predecessor or successor of a neighbor in another subroute,
+    #   so that it ends up next to the neighbor
+    def trySwap(self, customer_id):
+        route_index, position = self.where[customer_id]
+        terms = self.terms[route_index]
+        demand = self.demands[customer_id]
+        for neighbor in self.neighbors[customer_id]:
+            neighbor_route, neighbor_position = self.where[neighbor]
+            if neighbor_route == route_index:
+                continue
+            target = self.terms[neighbor_route]
+            for other_position in (neighbor_position - 1, neighbor_position + 1):
+                if not 1 <= other_position <= target.num_customers:
+                    continue
+                if not self.spend("swap"):
+                    return False
+                other_id = target.nodes[other_position]
+                other_demand = self.demands[other_id]
+                change = self.replacementChange(terms, position, other_id, other_demand)
+                target_change = self.replacementChange(target, other_position, customer_id, demand)
+                if change + target_change < -IMPROVEMENT and \
+                        self.feasible(terms.distance + change, terms.num_customers,
+                                      terms.total_load - demand + other_demand) and \
+                        self.feasible(target.distance + target_change, target.num_customers,
+                                      target.total_load - other_demand + demand):
+                    sub_route = self.sub_routes[route_index]
+                    target_route = self.sub_routes[neighbor_route]
+                    sub_route[position - 1] = other_id
+                    target_route[other_position - 1] = customer_id
+                    self.update(route_index, sub_route)
+                    self.update(neighbor_route, target_route)
+                    self.applied["swap"] += 1
+                    return True
+        return False
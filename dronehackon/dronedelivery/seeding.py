@@ -0,0 +1,179 @@
+import numpy
+
+
+# Constructive heuristics for the initial population, each returning a giant tour, a permutation of the
+#   customer ids that the split cuts into subroutes like any other individual
+
+
+# Nearest unvisited customer first, starting from the depot or from the given customer. With a candidate
+#   list the next customer is looked for among the candidates first, O(n k) unless they run out
+def nearestNeighborTour(distance_matrix, first=None, neighbors=None):
+    """
+    Inputs : distance_matrix - distances with the depot at index 0
+             first - customer the tour starts with, None for the one nearest to the depot
+             neighbors - (n + 1 x k) array of candidate customers per point, see NeighborIndex, or None
+    Outputs : list of customer ids
+    """
+    num_customers = len(distance_matrix) - 1
+    visited = numpy.zeros(num_customers + 1, dtype=bool)
+    visited[0] = True
+    tour = []
+    current = 0
+    if first is not None:
+        visited[first] = True
+        tour.append(int(first))
+        current = first
+    while len(tour) < num_customers:
+        if neighbors is not None:
+            candidates = neighbors[current]
+            candidates = candidates[~visited[candidates]]
+            if len(candidates):
+                current = int(candidates[numpy.argmin(distance_matrix[current, candidates])])
+                visited[current] = True
+                tour.append(current)
+                continue
+        distances = numpy.where(visited, numpy.inf, distance_matrix[current])
+        current = int(numpy.argmin(distances))
+        visited[current] = True
+        tour.append(current)
+    return tour
+
+
+# Customers by their angle around the depot, in O(n log n)
+def sweepTour(coordinates, coordinate_keys=('x', 'y'), start_angle=0.0, clockwise=False):
+    """
+    Inputs : coordinates - (n + 1 x 2) array with the depot at index 0, lat/long or x/y
+             coordinate_keys - names of the two coordinates, ('lat', 'long') or ('x', 'y')
+             start_angle - angle in radians the sweep starts from
+             clockwise - direction of the sweep
+    Outputs : list of customer ids
+    """
+    coordinates = numpy.asarray(coordinates, dtype=numpy.float64)
+    offsets = coordinates[1:] - coordinates[0]
+    if tuple(coordinate_keys) == ('lat', 'long'):
+        # East and north offsets, a degree of longitude shrinking with the latitude
+        east = offsets[:, 1] * numpy.cos(numpy.radians(coordinates[0, 0]))
+        north = offsets[:, 0]
+    else:
+        east, north = offsets[:, 0], offsets[:, 1]
+
+    angles = numpy.mod(numpy.arctan2(north, east) - start_angle, 2 * numpy.pi)
+    if clockwise:
+        angles = numpy.mod(-angles, 2 * numpy.pi)
+    return (numpy.argsort(angles, kind='stable') + 1).tolist()
+
+
+# Clarke-Wright savings under the payload-weighted energy of a subroute, which is
+#   per_km * sum over legs of distance * load + (customers + 1) * takeoff_landing
+def savingsTour(instance, drone, battery_threshold, num_neighbors=30, noise=0.0, rng=None):
+    """
+    Inputs : instance - compiled instance
+             drone - drone parameters of the cost
+             battery_threshold - most battery a subroute may use
+             num_neighbors - customers j tried after each customer i, the nearest ones
+             noise - relative random perturbation of the savings, 0 for the deterministic order
+             rng - numpy random Generator, needed if noise is given
+    Outputs : list of customer ids, the merged subroutes one after the other
+    """
+    distance_matrix = instance.distance_matrix
+    demands = instance.demand
+    num_customers = instance.num_customers
+    weight = drone.weight
+    per_km = drone.battery_consumption_perKM_perHr
+    takeoff_landing = drone.battery_consumption_takeoff_landing
+    distance_between = distance_matrix.item
+
+    # Saving of serving j right after i instead of on its own, for single customer subroutes,
+    #   for i and its nearest customers j, in O(n k log(n k))
+    neighbors = instance.neighborIndex(num_neighbors).neighbors[1:, :num_neighbors].astype(numpy.int64)
+    first = numpy.repeat(numpy.arange(1, num_customers + 1), neighbors.shape[1])
+    second = neighbors.ravel()
+    to_depot = distance_matrix[first, 0]
+    from_depot = distance_matrix[0, second]
+    savings = to_depot * weight + from_depot * (weight + demands[second]) - \
+        distance_matrix[0, first] * demands[second] - distance_matrix[first, second] * (weight + demands[second])
+    if noise:
+        savings = savings * rng.uniform(1 - noise, 1 + noise, len(savings))
+    order = numpy.argsort(-savings, kind='stable')
+
+    # Every customer starts on its own subroute, kept by its first customer: the next customer of each
+    #   customer, and per subroute its last customer, load, depot to last customer path, weighted distance
+    #   and number of customers. start_of gives the first customer of the subroute a last customer ends
+    following = [0] * (num_customers + 1)
+    start_of = list(range(num_customers + 1))
+    last_of = list(range(num_customers + 1))
+    load = [weight + demand for demand in demands.tolist()]
+    path = [distance_between(0, customer_id) for customer_id in range(num_customers + 1)]
+    weighted = [distance_between(0, customer_id) * load[customer_id] + distance_between(customer_id, 0) * weight
+                for customer_id in range(num_customers + 1)]
+    size = [1] * (num_customers + 1)
+    is_start = [True] * (num_customers + 1)
+
+    for i, j in zip(first[order].tolist(), second[order].tolist()):
+        # i has to end a subroute and j to start another one
+        start = start_of[i]
+        if last_of[start] != i or not is_start[j] or start == j:
+            continue
+        merged_load = load[start] + load[j] - weight
+        if merged_load > instance.vehicle_capacity:
+            continue
+
+        # The legs up to i carry the demand of j's subroute too, i to j replaces both depot legs
+        carried = load[j] - weight
+        merged = weighted[start] - distance_between(i, 0) * weight + carried * path[start] + \
+            distance_between(i, j) * load[j] + weighted[j] - distance_between(0, j) * load[j]
+        merged_size = size[start] + size[j]
+        merged_cost = per_km * merged + (merged_size + 1) * takeoff_landing
+        if merged_cost > battery_threshold or \
+                per_km * (weighted[start] + weighted[j] - merged) + takeoff_landing <= 0:
+            continue
+
+        following[i] = j
+        last = last_of[j]
+        start_of[last] = start
+        last_of[start] = last
+        load[start] = merged_load
+        path[start] = path[start] + distance_between(i, j) + path[j] - distance_between(0, j)
+        weighted[start] = merged
+        size[start] = merged_size
+        is_start[j] = False
+
+    tour = []
+    for start in range(1, num_customers + 1):
+        if is_start[start]:
+            customer_id = start
+            while customer_id:
+                tour.append(customer_id)
+                customer_id = following[customer_id]
+    return tour
+
+
+# Share of the initial population built by the constructive heuristics
+def heuristicPopulation(count, instance, drone, battery_threshold, rng, num_neighbors=30, noise=0.1):
+    """
+    Inputs : count - number of routes to build
+             instance - compiled instance, drone - drone parameters of the cost
+             battery_threshold - most battery a subroute may use
+             rng - numpy random Generator
+             num_neighbors - candidate list size of the savings and the nearest neighbor tours
+             noise - savings perturbation of every savings route but the first
+    Outputs : (count x num_customers) int32 array, savings, sweep and nearest neighbor tours in turn,
+              the later ones of each kind varied by random perturbation, start angle or first customer
+    """
+    num_customers = instance.num_customers
+    routes = numpy.zeros((count, num_customers), dtype=numpy.int32)
+    for row in range(count):
+        kind, variant = row % 3, row // 3
+        if kind == 0:
+            route = savingsTour(instance, drone, battery_threshold, num_neighbors,
+                                noise=noise if variant else 0.0, rng=rng)
+        elif kind == 1:
+            start_angle = 0.0 if variant == 0 else rng.uniform(0, 2 * numpy.pi)
+            route = sweepTour(instance.coordinates, instance.coordinate_keys, start_angle,
+                              clockwise=bool(variant % 2))
+        else:
+            first = None if variant == 0 else int(rng.integers(1, num_customers + 1))
+            route = nearestNeighborTour(instance.distance_matrix, first,
+                                        instance.neighborIndex(num_neighbors).neighbors)
+        routes[row] = route
+    return routes
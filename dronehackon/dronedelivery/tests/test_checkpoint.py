@@ -0,0 +1,60 @@
+import random
+
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+# Logbook fields that depend on the clock or on the fitness cache, which a checkpoint does not keep
+UNSAVED_FIELDS = ('time_', 'cache_', 'evals_per_second')
+
+
+class Interrupted(Exception):
+    pass
+
+
+def newSolver(tmp_path, monkeypatch, **algo_kwargs):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    random.seed(3)
+    algo = vrp.nsgaAlgo(syntheticInstance(12, seed=1), SYNTHETIC_DRONE, rng=1, **algo_kwargs)
+    algo.pop_size = 8
+    algo.num_gen = 6
+    return algo
+
+
+def savedFields(logbook):
+    return [{key: value.tolist() if isinstance(value, numpy.ndarray) else value for key, value in record.items()
+             if not key.startswith(UNSAVED_FIELDS)} for record in logbook]
+
+
+def population(algo):
+    return [(list(ind), ind.fitness.values) for ind in algo.pop]
+
+
+def test_resumed_run_matches_an_uninterrupted_one(tmp_path, monkeypatch):
+    uninterrupted = newSolver(tmp_path, monkeypatch)
+    uninterrupted.runMain()
+
+    # Stopping the run right after the checkpoint of generation 3
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    interrupted = newSolver(tmp_path, monkeypatch, checkpoint_path=checkpoint_path, checkpoint_interval=3)
+    write_checkpoint = interrupted.writeCheckpoint
+
+    def writeThenStop(path=None):
+        write_checkpoint(path)
+        raise Interrupted()
+
+    monkeypatch.setattr(interrupted, 'writeCheckpoint', writeThenStop)
+    with pytest.raises(Interrupted):
+        interrupted.runMain()
+    assert interrupted.generation == 3
+
+    resumed = newSolver(tmp_path, monkeypatch, checkpoint_path=checkpoint_path)
+    random.seed(4)
+    resumed.runMain(resume=True)
+
+    assert resumed.generation == uninterrupted.generation == 6
+    assert population(resumed) == population(uninterrupted)
+    assert savedFields(resumed.logbook) == savedFields(uninterrupted.logbook)
@@ -0,0 +1,70 @@
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from vrpcore.distances import packMatrix
+from vrpcore.instance import compileInstance
+from vrpcore.instancefile import saveInstanceFile
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+def randomRoutes(num_customers, num_routes, seed=0):
+    rng = numpy.random.default_rng(seed)
+    return numpy.array([rng.permutation(num_customers) + 1 for _ in range(num_routes)])
+
+
+# Same instance with the dense matrix and with the distances computed on demand
+@pytest.fixture(scope="module", params=[True, False], ids=["dense", "oracle"])
+def instance(request):
+    json_data = syntheticInstance(30, seed=4, with_distances=request.param)
+    return compileInstance(json_data, vrp.drone(SYNTHETIC_DRONE))
+
+
+@pytest.mark.parametrize("split_mode", ["greedy", "optimal"])
+def test_batch_evaluation_matches_the_scalar_one(instance, split_mode):
+    routes = randomRoutes(instance.num_customers, 25)
+    vehicles, total_cost = vrp.eval_population_fitness(routes, instance, instance.drone, 1, split_mode)
+
+    for row, route in enumerate(routes.tolist()):
+        expected_vehicles, expected_cost = vrp.eval_indvidual_fitness(route, instance, instance.drone, 1, split_mode)
+        assert vehicles[row] == expected_vehicles
+        assert total_cost[row] == pytest.approx(expected_cost, rel=1e-12)
+
+
+@pytest.mark.parametrize("split_mode", ["greedy", "optimal"])
+def test_fused_evaluation_matches_its_partition(instance, split_mode):
+    demands = instance.demand.tolist()
+    for route in randomRoutes(instance.num_customers, 25, seed=1).tolist():
+        vehicles, total_cost, sub_routes = vrp.evaluateRoute(route, instance, instance.drone, return_route=True,
+                                                             split_mode=split_mode)
+        assert [customer_id for sub_route in sub_routes for customer_id in sub_route] == route
+        assert vrp.routeToSubroute(route, instance, instance.drone, split_mode) == sub_routes
+        assert vehicles == len(sub_routes)
+        assert total_cost == pytest.approx(sum(vrp.subRouteCost(sub_route, demands, instance.distance_matrix.item,
+                                                                instance.drone) for sub_route in sub_routes),
+                                           rel=1e-12)
+
+
+# Binary instance files, the dense matrix mapped and the packed one unpacked, in single or double precision
+@pytest.mark.parametrize("packed", [False, True], ids=["dense", "packed"])
+@pytest.mark.parametrize("dtype", [numpy.float64, numpy.float32], ids=["float64", "float32"])
+def test_binary_instance_file_evaluates_like_the_json(tmp_path, packed, dtype):
+    json_data = syntheticInstance(30, seed=4)
+    reference = compileInstance(json_data, vrp.drone(SYNTHETIC_DRONE))
+    if packed:
+        json_data['distance_matrix_packed'] = packMatrix(json_data.pop('distance_matrix'))
+    saveInstanceFile(json_data, str(tmp_path / "instance.vrpi"), dtype)
+
+    loaded = vrp.load_instance(str(tmp_path / "instance.vrpi"))
+    assert isinstance(loaded['distance_matrix'], numpy.memmap) != packed
+    assert loaded['distance_matrix'].dtype == dtype
+    instance = compileInstance(loaded, vrp.drone(SYNTHETIC_DRONE))
+    assert instance.distance_matrix.dtype == dtype
+    numpy.testing.assert_array_equal(instance.distance_matrix, reference.distance_matrix.astype(dtype))
+
+    routes = randomRoutes(instance.num_customers, 25, seed=3)
+    vehicles, total_cost = vrp.eval_population_fitness(routes, instance, instance.drone, 1)
+    expected_vehicles, expected_cost = vrp.eval_population_fitness(routes, reference, reference.drone, 1)
+    numpy.testing.assert_allclose(total_cost, expected_cost, rtol=1e-12 if dtype == numpy.float64 else 1e-5)
+    if dtype == numpy.float64:
+        numpy.testing.assert_array_equal(vehicles, expected_vehicles)
@@ -0,0 +1,62 @@
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from dronedelivery.fitness_cache import FitnessCache, ENTRY_BYTES
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return compileInstance(syntheticInstance(15, seed=2), vrp.drone(SYNTHETIC_DRONE))
+
+
+def test_equal_routes_hit(instance):
+    cache = FitnessCache()
+    evaluate = cache.decorator(vrp.eval_indvidual_fitness)
+    route = list(range(1, 16))
+    first = evaluate(route, instance, instance.drone, 1)
+    again = evaluate(numpy.array(route), instance, instance.drone, 1)
+    evaluate(route[::-1], instance, instance.drone, 1)
+
+    assert first == again == vrp.eval_indvidual_fitness(route, instance, instance.drone, 1)
+    assert cache.popCounters() == (1, 2)
+    assert cache.popCounters() == (0, 0)
+    assert len(cache) == 2
+
+
+def test_least_recently_used_route_is_evicted():
+    cache = FitnessCache(3 * ENTRY_BYTES)
+    assert cache.max_entries == 3
+    keys = [FitnessCache.key([customer_id, 1]) for customer_id in range(2, 6)]
+    for key in keys[:3]:
+        cache.put(key, (1, 1.0))
+    cache.get(keys[0])
+    cache.put(keys[3], (1, 1.0))
+
+    assert len(cache) == 3
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(key) is not None for key in (keys[0], keys[2], keys[3]))
+
+
+def test_batch_matches_fresh_evaluation(instance):
+    rng = numpy.random.default_rng(3)
+    routes = numpy.array([rng.permutation(15) + 1 for _ in range(10)])
+    routes = numpy.concatenate([routes, routes[:4], routes[2:3]])
+    cache = FitnessCache()
+    evaluated = []
+
+    def evaluateBatch(batch):
+        evaluated.append(len(batch))
+        return vrp.eval_population_fitness(batch, instance, instance.drone, 1)
+
+    for _ in range(2):
+        vehicles, costs = cache.evaluateBatch(routes, evaluateBatch)
+        expected = vrp.eval_population_fitness(routes, instance, instance.drone, 1)
+        assert vehicles.tolist() == expected[0].tolist()
+        assert costs.tolist() == expected[1].tolist()
+
+    # Repeats inside the batch and the whole second batch come from the cache
+    assert evaluated == [10]
+    assert cache.popCounters() == (5 + 15, 10)
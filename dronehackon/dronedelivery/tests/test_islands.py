@@ -0,0 +1,60 @@
+import os
+import multiprocessing
+
+import pytest
+
+from dronedelivery import islands, vrp
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+def islandSolver(tmp_path, monkeypatch, num_islands=2, num_gen=4, **kwargs):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    algo = islands.islandAlgo(syntheticInstance(12, seed=2), SYNTHETIC_DRONE, num_islands=num_islands,
+                              migration_interval=2, num_migrants=2, seed=3, **kwargs)
+    algo.pop_size = 8
+    algo.num_gen = num_gen
+    return algo
+
+
+def test_migration_targets():
+    assert islands.migrationTargets(3, "ring") == [[1], [2], [0]]
+    assert islands.migrationTargets(3, "full") == [[1, 2], [0, 2], [0, 1]]
+    assert islands.migrationTargets(1, "ring") == [[]]
+
+
+def test_islands_run_and_merge_their_fronts(tmp_path, monkeypatch):
+    algo = islandSolver(tmp_path, monkeypatch, topology="full")
+    solution = algo.runMain()
+
+    assert solution['generation'] == 4
+    assert solution['stop_reason'] == "reached 4 generations"
+    assert len(algo.island_logbooks) == 2
+    assert sorted(solution['best_individual']) == list(range(1, 13))
+
+
+def test_islands_stop_at_the_time_limit(tmp_path, monkeypatch):
+    algo = islandSolver(tmp_path, monkeypatch, num_islands=3, num_gen=1000)
+    solution = algo.runMain(time_limit=0.0)
+
+    assert solution['stop_reason'] == "time limit reached"
+    assert solution['generation'] < 1000
+
+
+def test_islands_do_not_resume(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        islandSolver(tmp_path, monkeypatch).runMain(resume=True)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="the patched island needs fork")
+def test_a_dead_island_stops_the_others(tmp_path, monkeypatch):
+    run_island = islands.runIsland
+
+    def crashingIsland(island, *args):
+        if island == 0:
+            os._exit(3)
+        run_island(island, *args)
+
+    monkeypatch.setattr(islands, 'runIsland', crashingIsland)
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        islandSolver(tmp_path, monkeypatch).runMain()
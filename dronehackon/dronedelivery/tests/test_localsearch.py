@@ -0,0 +1,102 @@
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from dronedelivery.localsearch import LocalSearch
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+# Distances made asymmetric, so that the reversed legs of 2-opt are checked as well
+@pytest.fixture(scope="module")
+def search():
+    instance = compileInstance(syntheticInstance(20, seed=8), vrp.drone(SYNTHETIC_DRONE))
+    rng = numpy.random.default_rng(8)
+    distance_matrix = instance.distance_matrix * rng.uniform(0.8, 1.2, instance.distance_matrix.shape)
+    numpy.fill_diagonal(distance_matrix, 0.0)
+    instance.distance_matrix = distance_matrix
+    return LocalSearch(instance, instance.drone, vrp.BATTERY_THRESHOLD)
+
+
+# Weighted distance of a subroute walked leg by leg
+def weightedDistance(search, sub_route):
+    load = search.drone.weight + sum(search.demands[customer_id] for customer_id in sub_route)
+    distance = 0.0
+    for start, end in zip([0] + sub_route, sub_route + [0]):
+        distance += search.distance_between(start, end) * load
+        load -= search.demands[end]
+    return distance
+
+
+def checkChange(search, sub_route, moved, change):
+    expected = weightedDistance(search, moved) - weightedDistance(search, sub_route)
+    assert change == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+SUB_ROUTE = [4, 9, 1, 16, 12, 7]
+OTHER_CUSTOMERS = [2, 18, 5]
+
+
+def test_subroute_terms_match_the_cost(search):
+    terms = search.termsOf(SUB_ROUTE)
+    assert terms.distance == pytest.approx(weightedDistance(search, SUB_ROUTE), rel=1e-12)
+    assert search.cost(terms.distance, len(SUB_ROUTE)) == \
+        pytest.approx(vrp.subRouteCost(SUB_ROUTE, search.demands, search.distance_between, search.drone), rel=1e-12)
+
+
+def test_two_opt_change(search):
+    terms = search.termsOf(SUB_ROUTE)
+    for first in range(1, len(SUB_ROUTE) + 1):
+        for last in range(first + 1, len(SUB_ROUTE) + 1):
+            moved = SUB_ROUTE[:first - 1] + SUB_ROUTE[first - 1:last][::-1] + SUB_ROUTE[last:]
+            checkChange(search, SUB_ROUTE, moved, search.twoOptChange(terms, first, last))
+
+
+def test_or_opt_change(search):
+    terms = search.termsOf(SUB_ROUTE)
+    size = len(SUB_ROUTE)
+    for first in range(1, size + 1):
+        for last in range(first, min(first + search.segment_length, size + 1)):
+            segment = SUB_ROUTE[first - 1:last]
+            for after in range(size + 1):
+                if first - 1 <= after <= last:
+                    continue
+                if after > last:
+                    moved = SUB_ROUTE[:first - 1] + SUB_ROUTE[last:after] + segment + SUB_ROUTE[after:]
+                else:
+                    moved = SUB_ROUTE[:after] + segment + SUB_ROUTE[after:first - 1] + SUB_ROUTE[last:]
+                checkChange(search, SUB_ROUTE, moved, search.orOptChange(terms, first, last, after))
+
+
+def test_removal_insertion_and_replacement_changes(search):
+    terms = search.termsOf(SUB_ROUTE)
+    for position in range(1, len(SUB_ROUTE) + 1):
+        moved = SUB_ROUTE[:position - 1] + SUB_ROUTE[position:]
+        checkChange(search, SUB_ROUTE, moved, search.removalChange(terms, position))
+        for customer_id in OTHER_CUSTOMERS:
+            moved = SUB_ROUTE[:position - 1] + [customer_id] + SUB_ROUTE[position:]
+            checkChange(search, SUB_ROUTE, moved,
+                        search.replacementChange(terms, position, customer_id, search.demands[customer_id]))
+
+    for after in range(len(SUB_ROUTE) + 1):
+        for customer_id in OTHER_CUSTOMERS:
+            moved = SUB_ROUTE[:after] + [customer_id] + SUB_ROUTE[after:]
+            checkChange(search, SUB_ROUTE, moved,
+                        search.insertionChange(terms, after, customer_id, search.demands[customer_id]))
+
+
+def test_improve_keeps_the_customers_and_lowers_the_cost(search):
+    route = (numpy.random.default_rng(9).permutation(search.instance.num_customers) + 1).tolist()
+    sub_routes = vrp.routeToSubroute(route, search.instance, search.drone)
+    improved, applied = search.improve(sub_routes)
+
+    def totalCost(sub_routes):
+        return sum(vrp.subRouteCost(sub_route, search.demands, search.distance_between, search.drone)
+                   for sub_route in sub_routes)
+
+    assert applied > 0
+    assert sorted(customer_id for sub_route in improved for customer_id in sub_route) == sorted(route)
+    assert totalCost(improved) < totalCost(sub_routes)
+    for sub_route in improved:
+        terms = search.termsOf(sub_route)
+        assert search.feasible(terms.distance, terms.num_customers, terms.total_load)
@@ -0,0 +1,63 @@
+import random
+from multiprocessing import shared_memory
+
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from vrpcore.instance import compileInstance
+from vrpcore.instancefile import saveInstanceFile
+from vrpcore.parallel import ParallelEvaluator, shareArray
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+# Instance with its matrix in memory, copied into shared memory, or mapped from a binary instance file,
+#   which the workers map as well
+@pytest.fixture(params=["shared_memory", "memmap"])
+def instance(request, tmp_path):
+    json_data = syntheticInstance(40, seed=9)
+    if request.param == "memmap":
+        path = str(tmp_path / 'instance.vrpi')
+        saveInstanceFile(json_data, path)
+        json_data = vrp.load_instance(path)
+    return request.param, compileInstance(json_data, vrp.drone(SYNTHETIC_DRONE))
+
+
+def test_workers_match_serial_evaluation(instance):
+    attach, instance = instance
+    rng = numpy.random.default_rng(0)
+    routes = numpy.array([rng.permutation(instance.num_customers) + 1 for _ in range(50)])
+    expected = vrp.eval_population_fitness(routes, instance, instance.drone, 1)
+
+    evaluator = ParallelEvaluator(vrp.eval_population_fitness, instance.sharedArrays(), vrp.sharedEvaluationArguments,
+                                  instance.sharedFields(), processes=2, unit_cost=1, split_mode="greedy")
+    with evaluator:
+        vehicles, costs = evaluator.evaluate(routes)
+        names = [block.name for block in evaluator.blocks]
+        mapped = shareArray(instance.distance_matrix)[0] is None
+    assert vehicles.tolist() == expected[0].tolist()
+    assert costs.tolist() == expected[1].tolist()
+
+    # Demand and coordinates always go to shared memory, the matrix only when it is not mapped from a file
+    assert mapped == (attach == "memmap")
+    assert len(names) == (2 if mapped else 3)
+
+    # Closing unlinks every block
+    assert evaluator.blocks == []
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_workers_give_the_same_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir()
+    populations = []
+    for workers in (1, 2):
+        random.seed(5)
+        with vrp.nsgaAlgo(syntheticInstance(20, seed=5), SYNTHETIC_DRONE, workers=workers, rng=5) as algo:
+            algo.pop_size = 16
+            algo.num_gen = 4
+            algo.runMain()
+        populations.append([(list(ind), ind.fitness.values) for ind in algo.pop])
+    assert populations[0] == populations[1]
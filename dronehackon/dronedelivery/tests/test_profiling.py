@@ -0,0 +1,62 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from dronedelivery import vrp
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+GENERATION_PHASES = {'select_parents', 'vary', 'clone', 'evaluate', 'select'}
+# Timed after the record of a generation is taken, so they are logged with the next one
+LATE_PHASES = {'statistics', 'snapshot'}
+
+
+def runSolver(tmp_path, monkeypatch, **algo_kwargs):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    algo = vrp.nsgaAlgo(syntheticInstance(15, seed=4), SYNTHETIC_DRONE, rng=4, **algo_kwargs)
+    algo.pop_size = 8
+    algo.num_gen = 4
+
+    # Hooks installed while the generations run, as seen once per generation
+    hooks = []
+    publish = algo.publishSnapshot
+
+    def publishAndCheck():
+        publish()
+        hooks.append((sys.getprofile(), tracemalloc.is_tracing()))
+
+    monkeypatch.setattr(algo, 'publishSnapshot', publishAndCheck)
+    algo.runMain()
+    return algo, hooks
+
+
+def test_every_generation_logs_its_phase_times(tmp_path, monkeypatch):
+    algo, _ = runSolver(tmp_path, monkeypatch)
+    for gen, record in enumerate(algo.logbook[1:], start=1):
+        phases = {key[len('time_'):] for key in record if key.startswith('time_')}
+        assert phases == (GENERATION_PHASES if gen == 1 else GENERATION_PHASES | LATE_PHASES)
+        assert all(record[f"time_{phase}"] >= 0 for phase in phases)
+        assert record['evals_per_second'] > 0
+        assert 'memory_current' not in record
+
+
+def test_no_profile_installs_no_hooks(tmp_path, monkeypatch):
+    def unexpectedProfiler(*args):
+        raise AssertionError("profiler created without a profile mode")
+
+    monkeypatch.setattr(vrp, 'RunProfiler', unexpectedProfiler)
+    _, hooks = runSolver(tmp_path, monkeypatch, profile=None)
+    assert hooks == [(None, False)] * 5
+
+
+@pytest.mark.parametrize("profile", ["cprofile", "tracemalloc"])
+def test_profile_hooks_are_removed_after_the_run(tmp_path, monkeypatch, profile):
+    algo, hooks = runSolver(tmp_path, monkeypatch, profile=profile, profile_path=str(tmp_path / "run.profile"))
+    if profile == "cprofile":
+        assert all(hook is not None and not tracing for hook, tracing in hooks)
+    else:
+        assert all(hook is None and tracing for hook, tracing in hooks)
+        assert 'memory_peak' in algo.logbook[-1]
+    assert (sys.getprofile(), tracemalloc.is_tracing()) == (None, False)
+    assert (tmp_path / "run.profile").exists()
@@ -0,0 +1,55 @@
+import numpy
+
+from dronedelivery import vrp
+from vrpcore.runlog import RunLog, runHistory
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+# Small seeded solve writing its run log, history and csv under tmp_path
+def runSolver(tmp_path, monkeypatch, num_gen, resume=False, **algo_kwargs):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    algo = vrp.nsgaAlgo(syntheticInstance(12, seed=1), SYNTHETIC_DRONE, rng=1,
+                        run_log_path=str(tmp_path / 'run.jsonl'), history_path=str(tmp_path / 'history.npz'),
+                        **algo_kwargs)
+    algo.pop_size = 8
+    algo.num_gen = num_gen
+    with algo:
+        algo.runMain(resume=resume)
+    return algo
+
+
+def test_run_history_keeps_one_run_and_cuts_back(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    with RunLog(path, run_id='a') as run_log:
+        for gen in range(3):
+            run_log.write({'Generation': gen, 'evals': 1})
+    with RunLog(path, run_id='b') as run_log:
+        run_log.write({'Generation': 0, 'evals': 2})
+    with RunLog(path, run_id='a') as run_log:
+        for gen in range(2, 4):
+            run_log.write({'Generation': gen, 'evals': 3})
+
+    history = runHistory(path, 'a')
+    assert [record['Generation'] for record in history] == [0, 1, 2, 3]
+    assert [record['evals'] for record in history] == [1, 1, 3, 3]
+    assert [record['Generation'] for record in runHistory(path, 'b')] == [0]
+
+
+def test_history_holds_only_the_last_run(tmp_path, monkeypatch):
+    runSolver(tmp_path, monkeypatch, num_gen=3)
+    algo = runSolver(tmp_path, monkeypatch, num_gen=3)
+
+    with numpy.load(tmp_path / 'history.npz') as history:
+        assert history['Generation'].tolist() == [0, 1, 2, 3]
+        assert set(history['run_id'].tolist()) == {algo.run_id}
+
+
+def test_resumed_history_has_no_duplicate_generations(tmp_path, monkeypatch):
+    checkpoint_path = str(tmp_path / 'checkpoint.npz')
+    first = runSolver(tmp_path, monkeypatch, num_gen=5, checkpoint_path=checkpoint_path, checkpoint_interval=2)
+    resumed = runSolver(tmp_path, monkeypatch, num_gen=5, resume=True, checkpoint_path=checkpoint_path)
+
+    assert resumed.run_id == first.run_id
+    with numpy.load(tmp_path / 'history.npz') as history:
+        assert history['Generation'].tolist() == [0, 1, 2, 3, 4, 5]
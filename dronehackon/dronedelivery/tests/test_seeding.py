@@ -0,0 +1,69 @@
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from dronedelivery.seeding import nearestNeighborTour, sweepTour, savingsTour, heuristicPopulation
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+NUM_CUSTOMERS = 40
+
+
+@pytest.fixture(scope="module", params=["latlong", "xy"])
+def instance(request):
+    return compileInstance(syntheticInstance(NUM_CUSTOMERS, seed=7, layout=request.param), vrp.drone(SYNTHETIC_DRONE))
+
+
+def isPermutation(route):
+    return sorted(route) == list(range(1, NUM_CUSTOMERS + 1))
+
+
+def test_savings_tour_is_a_permutation(instance):
+    assert isPermutation(savingsTour(instance, instance.drone, vrp.BATTERY_THRESHOLD))
+    assert isPermutation(savingsTour(instance, instance.drone, vrp.BATTERY_THRESHOLD, num_neighbors=5, noise=0.2,
+                                     rng=numpy.random.default_rng(0)))
+
+
+def test_sweep_tour_is_a_permutation(instance):
+    for start_angle, clockwise in [(0.0, False), (1.0, False), (2.5, True)]:
+        assert isPermutation(sweepTour(instance.coordinates, instance.coordinate_keys, start_angle, clockwise))
+
+
+def test_nearest_neighbor_tour_is_a_permutation(instance):
+    neighbors = instance.neighborIndex(5).neighbors
+    for first in [None, 1, NUM_CUSTOMERS]:
+        tour = nearestNeighborTour(instance.distance_matrix, first)
+        assert isPermutation(tour)
+        assert tour[0] == (first or int(numpy.argmin(instance.distance_matrix[0, 1:])) + 1)
+        # Short candidate lists run out and fall back to the full row, the tour stays the same
+        assert nearestNeighborTour(instance.distance_matrix, first, neighbors) == tour
+
+
+def test_heuristic_population_cycles_through_the_heuristics(instance):
+    routes = heuristicPopulation(7, instance, instance.drone, vrp.BATTERY_THRESHOLD, numpy.random.default_rng(1))
+    assert routes.shape == (7, NUM_CUSTOMERS)
+    assert all(isPermutation(route) for route in routes.tolist())
+    assert routes[0].tolist() == savingsTour(instance, instance.drone, vrp.BATTERY_THRESHOLD)
+    assert routes[1].tolist() == sweepTour(instance.coordinates, instance.coordinate_keys)
+
+
+@pytest.mark.parametrize("heuristic_fraction, num_seeded", [(0.0, 0), (0.25, 4), (0.5, 8), (1.0, 16)])
+def test_heuristic_fraction_sets_the_seeded_individuals(monkeypatch, heuristic_fraction, num_seeded):
+    seeded = []
+
+    def recordedPopulation(*args, **kwargs):
+        seeded.append(heuristicPopulation(*args, **kwargs))
+        return seeded[-1]
+
+    monkeypatch.setattr(vrp, 'heuristicPopulation', recordedPopulation)
+    algo = vrp.nsgaAlgo(syntheticInstance(NUM_CUSTOMERS, seed=7), SYNTHETIC_DRONE, rng=2,
+                        heuristic_fraction=heuristic_fraction)
+    algo.pop_size = 16
+    algo.generatingPopFitness()
+
+    assert len(seeded) == 1 and len(seeded[0]) == num_seeded
+    # The first selection reorders the population, the seeded routes are the ones the heuristics built
+    seeded_routes = set(map(tuple, seeded[0].tolist()))
+    assert sum(tuple(ind) in seeded_routes for ind in algo.pop) == num_seeded
+    assert len(algo.pop) == 16
+    assert all(isPermutation(list(ind)) for ind in algo.pop)
@@ -0,0 +1,70 @@
+import numpy
+import pytest
+
+from dronedelivery import vrp
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return compileInstance(syntheticInstance(30, seed=6), vrp.drone(SYNTHETIC_DRONE))
+
+
+def randomRoutes(num_customers, num_routes, length=None, seed=0):
+    rng = numpy.random.default_rng(seed)
+    length = num_customers if length is None else length
+    return [(rng.permutation(num_customers)[:length] + 1).tolist() for _ in range(num_routes)]
+
+
+# Greedy split walked the plain way, every extended subroute costed from scratch
+def referenceSplit(route, instance, drone):
+    demands = instance.demand.tolist()
+    sub_routes = [[]]
+    for customer_id in route:
+        load = drone.weight + sum(demands[cust_id] for cust_id in sub_routes[-1]) + demands[customer_id]
+        cost = vrp.subRouteTransportCost(sub_routes[-1], customer_id, demands, instance.distance_matrix.item, drone)
+        if load > instance.vehicle_capacity or cost > vrp.BATTERY_THRESHOLD:
+            sub_routes.append([])
+        sub_routes[-1].append(customer_id)
+    return sub_routes
+
+
+def test_greedy_split_matches_the_reference_split(instance):
+    demands = instance.demand.tolist()
+    for route in randomRoutes(instance.num_customers, 30):
+        sub_routes = referenceSplit(route, instance, instance.drone)
+        vehicles, total_cost, split = vrp.evaluateRoute(route, instance, instance.drone, return_route=True)
+        assert split == sub_routes
+        assert vehicles == len(sub_routes)
+        assert total_cost == pytest.approx(sum(vrp.subRouteCost(sub_route, demands, instance.distance_matrix.item,
+                                                                instance.drone) for sub_route in sub_routes),
+                                           rel=1e-12)
+
+
+# Fewest vehicles, then lowest cost, over every way of cutting the route into subroutes
+def bruteForceSplit(route, instance, drone):
+    demands = instance.demand.tolist()
+    best = None
+    for cuts in range(2 ** (len(route) - 1)):
+        sub_routes = [[route[0]]]
+        for position in range(1, len(route)):
+            if cuts >> (position - 1) & 1:
+                sub_routes.append([])
+            sub_routes[-1].append(route[position])
+        costs = [vrp.subRouteCost(sub_route, demands, instance.distance_matrix.item, drone) for sub_route in sub_routes]
+        if all(len(sub_route) == 1 or (drone.weight + sum(demands[cust_id] for cust_id in sub_route) <=
+                                       instance.vehicle_capacity and cost <= vrp.BATTERY_THRESHOLD)
+               for sub_route, cost in zip(sub_routes, costs)):
+            if best is None or (len(sub_routes), sum(costs)) < best:
+                best = (len(sub_routes), sum(costs))
+    return best
+
+
+def test_optimal_split_matches_brute_force(instance):
+    for route in randomRoutes(instance.num_customers, 40, length=7, seed=2):
+        vehicles, total_cost = bruteForceSplit(route, instance, instance.drone)
+        assert vrp.evaluateRoute(route, instance, instance.drone, split_mode="optimal") == \
+            (vehicles, pytest.approx(total_cost, rel=1e-12))
+        assert vrp.getNumVehiclesRequired(route, instance, instance.drone, "optimal") <= \
+            vrp.getNumVehiclesRequired(route, instance, instance.drone)
@@ -0,0 +1,72 @@
+import time
+
+import numpy
+from deap import tools
+
+from dronedelivery import vrp
+from vrpcore.selection import fitnessArray, sortFronts
+from vrpcore.synthetic import syntheticInstance, SYNTHETIC_DRONE
+
+
+def newSolver(tmp_path, monkeypatch, **algo_kwargs):
+    monkeypatch.setattr(vrp, 'BASE_DIR', str(tmp_path))
+    (tmp_path / 'results').mkdir(exist_ok=True)
+    algo = vrp.nsgaAlgo(syntheticInstance(15, seed=4), SYNTHETIC_DRONE, rng=4, **algo_kwargs)
+    algo.pop_size = 8
+    return algo
+
+
+def test_time_limit_stops_the_run_early(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch)
+    algo.num_gen = 100000
+    started = time.monotonic()
+    solution = algo.runMain(time_limit=0.2)
+
+    assert time.monotonic() - started < 30
+    assert solution['stop_reason'] == "time limit reached"
+    assert 0 < solution['generation'] < algo.num_gen
+    assert algo.logbook[-1]['stop_reason'] == "time limit reached"
+
+
+def test_snapshot_holds_the_best_found_so_far(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch)
+    algo.num_gen = 6
+    assert algo.snapshot() is None
+
+    # Snapshot taken every time the solver publishes one, as another thread would see it
+    snapshots = []
+    publish = algo.publishSnapshot
+
+    def publishAndRead():
+        publish()
+        snapshots.append(algo.snapshot())
+
+    monkeypatch.setattr(algo, 'publishSnapshot', publishAndRead)
+    solution = algo.runMain()
+
+    assert [snapshot['generation'] for snapshot in snapshots] == list(range(7))
+    best = [snapshot['best_fitness'] for snapshot in snapshots]
+    assert best == sorted(best, reverse=True)
+    assert solution['best_fitness'] == tools.selBest(algo.pop, 1)[0].fitness.values
+
+    first_front = numpy.flatnonzero(sortFronts(fitnessArray(algo.pop))[0] == 0)
+    assert sorted(values for _, values in solution['pareto_front']) == \
+        sorted(algo.pop[index].fitness.values for index in first_front)
+
+    # A snapshot is a copy, the running population does not change it
+    algo.pop[0][:] = algo.pop[0][::-1]
+    assert algo.snapshot()['pareto_front'] == solution['pareto_front']
+
+
+def test_chunked_evaluation_stops_at_the_deadline(tmp_path, monkeypatch):
+    algo = newSolver(tmp_path, monkeypatch, eval_chunk_size=3)
+    rng = numpy.random.default_rng(0)
+    individuals = [vrp.creator.Individual((rng.permutation(15) + 1).tolist()) for _ in range(10)]
+
+    evaluated = algo.evaluateInvalid(individuals, deadline=time.monotonic() - 1)
+    assert evaluated == individuals[:3]
+    assert [ind.fitness.valid for ind in individuals] == [True] * 3 + [False] * 7
+
+    # Without a deadline every individual is evaluated at once
+    assert algo.evaluateInvalid(individuals) == individuals[3:]
+    assert all(ind.fitness.valid for ind in individuals)
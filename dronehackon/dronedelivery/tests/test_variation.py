@@ -0,0 +1,34 @@
+import random
+
+import numpy
+
+from dronedelivery import vrp
+from vrpcore.variation import cxOrderedBatch
+
+
+# Generator handing cxOrderedBatch the draws that give the chosen cut points
+class FixedCuts(object):
+
+    def __init__(self, cuts):
+        first, second = numpy.array(cuts).T
+        self.draws = [first, second - 1]
+
+    def integers(self, low, high, size):
+        return self.draws.pop(0).copy()
+
+
+def test_batch_crossover_matches_cx_ordered_vrp(monkeypatch):
+    rng = numpy.random.default_rng(7)
+    size = 9
+    parents1 = numpy.array([rng.permutation(size) + 1 for _ in range(12)])
+    parents2 = numpy.array([rng.permutation(size) + 1 for _ in range(12)])
+    cuts = [sorted(rng.choice(size, 2, replace=False).tolist()) for _ in range(12)]
+    cuts[0], cuts[1] = [0, size - 1], [3, 4]
+
+    children1, children2 = cxOrderedBatch(parents1, parents2, FixedCuts(cuts))
+    for row, cut in enumerate(cuts):
+        monkeypatch.setattr(random, 'sample', lambda population, k: list(cut))
+        child1, child2 = vrp.cxOrderedVrp(parents1[row].tolist(), parents2[row].tolist())
+        assert children1[row].tolist() == child1
+        assert children2[row].tolist() == child2
+        assert sorted(child1) == sorted(child2) == list(range(1, size + 1))
@@ -0,0 +1,59 @@
+import numpy
+import pytest
+
+from vrpcore.distances import distanceMatrix
+from dronedelivery.warmstart import remapSeeds, cheapestInsertion, warmStartPopulation
+
+
+@pytest.fixture(scope="module")
+def distance_matrix():
+    return distanceMatrix(numpy.random.default_rng(12).uniform(0, 10, (11, 2)))
+
+
+def tourLength(route, distance_matrix):
+    tour = [0] + route + [0]
+    return sum(distance_matrix[start, end] for start, end in zip(tour, tour[1:]))
+
+
+def test_remap_drops_the_removed_order():
+    # Seeds stored as order ids, order 11 deleted since, the rest numbered again from 1
+    seeds = [[12, 10, 13, 11], [11, 13, 12, 10]]
+    order_ids = [10, 12, 13]
+    id_map = {order_id: position for position, order_id in enumerate(order_ids, start=1)}
+    assert remapSeeds(seeds, len(order_ids), id_map) == [[2, 1, 3], [3, 2, 1]]
+
+
+def test_remap_without_map_drops_unknown_and_repeated_ids():
+    assert remapSeeds([[3, 7, 1, 3, 0, 2]], 4) == [[3, 1, 2]]
+
+
+def test_cheapest_insertion_matches_trying_every_position(distance_matrix):
+    route = [4, 9, 1, 7]
+    expected = list(route)
+    for customer_id in (2, 3, 5, 6, 8, 10):
+        candidates = [expected[:position] + [customer_id] + expected[position:]
+                      for position in range(len(expected) + 1)]
+        expected = min(candidates, key=lambda candidate: tourLength(candidate, distance_matrix))
+
+    inserted = cheapestInsertion(route, 10, distance_matrix)
+    assert inserted == expected
+    assert sorted(inserted) == list(range(1, 11))
+
+
+def test_warm_start_population_is_made_of_permutations(distance_matrix):
+    seeds = [[3, 1, 2], [12, 2, 1]]
+    routes = warmStartPopulation(seeds, 8, 10, distance_matrix, numpy.random.default_rng(0))
+
+    assert routes.shape == (8, 10)
+    assert (numpy.sort(routes, axis=1) == numpy.arange(1, 11)).all()
+    assert routes[0].tolist() == cheapestInsertion([3, 1, 2], 10, distance_matrix)
+    assert routes[1].tolist() == cheapestInsertion([2, 1], 10, distance_matrix)
+
+
+def test_warm_start_population_keeps_at_most_pop_size_seeds(distance_matrix):
+    seeds = [numpy.random.default_rng(seed).permutation(10).tolist() for seed in range(5)]
+    routes = warmStartPopulation([[customer_id + 1 for customer_id in seed] for seed in seeds], 3, 10,
+                                 distance_matrix, numpy.random.default_rng(0))
+    assert routes.shape == (3, 10)
+    with pytest.raises(ValueError):
+        warmStartPopulation([], 3, 10, distance_matrix, numpy.random.default_rng(0))
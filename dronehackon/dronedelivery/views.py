@@ -1,5 +1,7 @@
+import logging
 from django.shortcuts import render
 from django.http import HttpResponse
+from django.conf import settings
 from .models import Customer,Drone,Order, Depot
 import pandas as pd
 import numpy as np
@@ -7,6 +9,9 @@ from scipy.spatial.distance import squareform, pdist
 from haversine import haversine
 
 from .vrp import *
+from .islands import islandAlgo
+
+logger = logging.getLogger(__name__)
 # Create your views here.
 
 def maps(request):
@@ -30,19 +35,25 @@ def maps(request):
     all_points = np.array([[coords["lat"],coords["long"]]])
     # print(input_data)
     customers = []
-    for order in Order.objects.all():
+    # Customers are numbered 1 to n in order, order_ids[position - 1] is the order a solver id stands for
+    order_ids = []
+    for position, order in enumerate(Order.objects.all(), start=1):
         coords["lat"]=order.customer.lat
         coords["long"] = order.customer.long
         customers.append([order.customer.lat,order.customer.long])
         loc["coordinates"] = coords.copy()
         loc["demand"]=order.weight
-        input_data['customer_{}'.format(order.order_id)]=loc.copy()
+        input_data['customer_{}'.format(position)]=loc.copy()
+        order_ids.append(order.order_id)
         all_points = np.append(all_points,[[coords["lat"], coords["long"]]],axis=0)
-    print(input_data)
+    logger.debug("Input data: %s", input_data)
 
-    # Calculating distance matrix
-    dist_matrix = squareform(pdist(all_points, metric=haversine))
-    input_data["distance_matrix"] = dist_matrix
+    # Calculating distance matrix, unless there are more than VRP_DENSE_LIMIT customers, the solver
+    #   then computes the distances on demand from the coordinates
+    dense_limit = getattr(settings, 'VRP_DENSE_LIMIT', None)
+    if dense_limit is None or n <= dense_limit:
+        dist_matrix = squareform(pdist(all_points, metric=haversine))
+        input_data["distance_matrix"] = dist_matrix
     # print(dist_matrix)
     drone_params = {
         'weight': drone.weight,
@@ -51,18 +62,51 @@ def maps(request):
         'bat_consum_perkm_perkg': drone.battery_consumption_perKM_perKg,
         'takeoff_landing': drone.takeoff_landing_consumption,
     }
-    nsgaObj = nsgaAlgo(input_data,drone_params)
-
-    # Setting internal variables
-    print(nsgaObj.json_instance)
+    # Stopping once the front stalls for VRP_STOP_WINDOW generations, if set
+    stopping = None
+    if getattr(settings, 'VRP_STOP_WINDOW', None):
+        stopping = HypervolumeStopping(threshold=getattr(settings, 'VRP_STOP_THRESHOLD', 1e-3),
+                                       window=settings.VRP_STOP_WINDOW)
+    # Starting from the routes of the previous solve, if VRP_WARM_START is set. They are kept as order ids,
+    #   mapped to the current numbering so that orders added or deleted since then do not shift them
+    seeds = request.session.get('seeds') if getattr(settings, 'VRP_WARM_START', False) else None
+    seed_id_map = {order_id: position for position, order_id in enumerate(order_ids, start=1)}
+    # Local search on a VRP_LOCAL_SEARCH share of the offspring, for at most VRP_LOCAL_SEARCH_BUDGET
+    #   seconds per generation, and VRP_HEURISTIC_SEEDS of the first population from constructive heuristics, if set
+    #   The logbook records every VRP_STATS_INTERVAL generations, streamed to the VRP_RUN_LOG file if set
+    algo_kwargs = dict(workers=getattr(settings, 'VRP_WORKERS', 1),stopping=stopping,seeds=seeds,
+                       seed_id_map=seed_id_map,
+                       local_search_fraction=getattr(settings, 'VRP_LOCAL_SEARCH', 0.0),
+                       local_search_budget=getattr(settings, 'VRP_LOCAL_SEARCH_BUDGET', None),
+                       heuristic_fraction=getattr(settings, 'VRP_HEURISTIC_SEEDS', 0.0),
+                       stats_interval=getattr(settings, 'VRP_STATS_INTERVAL', 1),
+                       run_log_path=getattr(settings, 'VRP_RUN_LOG', None))
+    # VRP_ISLANDS populations in their own processes exchanging VRP_MIGRANTS individuals every
+    #   VRP_MIGRATION_INTERVAL generations along the VRP_ISLAND_TOPOLOGY, if set to more than one
+    if getattr(settings, 'VRP_ISLANDS', 1) > 1:
+        nsgaObj = islandAlgo(input_data,drone_params,num_islands=settings.VRP_ISLANDS,
+                             migration_interval=getattr(settings, 'VRP_MIGRATION_INTERVAL', 10),
+                             num_migrants=getattr(settings, 'VRP_MIGRANTS', 5),
+                             topology=getattr(settings, 'VRP_ISLAND_TOPOLOGY', "ring"),**algo_kwargs)
+    else:
+        nsgaObj = nsgaAlgo(input_data,drone_params,**algo_kwargs)
 
     # Running Algorithm
     route=[]
     if request.method == "POST":
         if "calculation" in request.POST:
-            nsgaObj.runMain()
+            # Worker processes, if any, are shut down as soon as the solve is over
+            #   VRP_TIME_LIMIT bounds the solve in seconds, if set
+            with nsgaObj:
+                nsgaObj.runMain(time_limit=getattr(settings, 'VRP_TIME_LIMIT', None))
             route = nsgaObj.get_solution()
             request.session['route'] = route
+
+            # Best route first, then the rest of the front, as order ids for the next warm start
+            solution = nsgaObj.snapshot()
+            seeds = [solution['best_individual']] + \
+                [seed for seed, _ in solution['pareto_front'] if seed != solution['best_individual']]
+            request.session['seeds'] = [[order_ids[customer_id - 1] for customer_id in seed] for seed in seeds]
             request.session.modified = True
         elif "animation" in request.POST:
             route = request.session['route']
@@ -83,7 +127,7 @@ def index(request):
     depot = Depot.objects.get(name="Test Depot")
     payload_capacity = drone.capacity - drone.weight
     if request.method == "POST":
-        print(request.POST)
+        logger.debug("Index POST: %s", request.POST)
         if "update_drone" in request.POST:
             drone.battery = request.POST.get("battery")
             drone.weight = request.POST.get("weight")
@@ -0,0 +1,68 @@
+import numpy
+
+from vrpcore.variation import mutationShuffleBatch
+
+
+# Bring the routes of a previous solve to the current customers
+def remapSeeds(seeds, num_customers, id_map=None):
+    """
+    Inputs : seeds - routes of a previous solve, lists of customer ids
+             num_customers - customers of the current instance, ids 1 to num_customers
+             id_map - previous id -> current id, for customers whose id changed, None if ids are kept
+    Outputs : list of routes with the customers that are gone deleted, each id kept once
+    """
+    remapped = []
+    for seed in seeds:
+        route, seen = [], set()
+        for customer_id in seed:
+            customer_id = id_map.get(customer_id) if id_map is not None else customer_id
+            if customer_id is None or not 1 <= customer_id <= num_customers or customer_id in seen:
+                continue
+            seen.add(customer_id)
+            route.append(customer_id)
+        remapped.append(route)
+    return remapped
+
+
+# Insert every missing customer where it lengthens the giant tour depot - route - depot the least
+def cheapestInsertion(route, num_customers, distance_matrix):
+    """
+    Inputs : route - partial route, list of distinct customer ids
+             num_customers - customers of the instance, ids 1 to num_customers
+             distance_matrix - distances with the depot at index 0
+    Outputs : route with all the customers, the new ones by increasing id
+    """
+    present = numpy.zeros(num_customers + 1, dtype=bool)
+    present[route] = True
+    tour = numpy.array([0] + list(route) + [0], dtype=numpy.int64)
+    for customer_id in numpy.flatnonzero(~present[1:]) + 1:
+        # Extra distance of going through the customer between each two consecutive stops
+        before, after = tour[:-1], tour[1:]
+        extra = distance_matrix[before, customer_id] + distance_matrix[customer_id, after] - \
+            distance_matrix[before, after]
+        position = int(numpy.argmin(extra)) + 1
+        tour = numpy.insert(tour, position, customer_id)
+    return tour[1:-1].tolist()
+
+
+# Initial population built around the routes of a previous solve
+def warmStartPopulation(seeds, pop_size, num_customers, distance_matrix, rng, perturbation=0.05, id_map=None):
+    """
+    Inputs : seeds - routes of a previous solve, best first, see remapSeeds
+             pop_size - number of routes to return
+             num_customers, distance_matrix - current instance
+             rng - numpy random Generator
+             perturbation - swap probability of each position in the copies filling the population
+             id_map - see remapSeeds
+    Outputs : (pop_size x num_customers) int32 array, the repaired seeds then their perturbed copies
+    """
+    routes = [cheapestInsertion(route, num_customers, distance_matrix)
+              for route in remapSeeds(seeds, num_customers, id_map)[:pop_size]]
+    routes = numpy.array(routes, dtype=numpy.int32).reshape(-1, num_customers)
+    if len(routes) == 0:
+        raise ValueError("warmStartPopulation needs at least one seed route")
+
+    # Copies of the seeds in turn, each with a few random swaps
+    copies = routes[numpy.arange(pop_size - len(routes)) % len(routes)]
+    copies, _ = mutationShuffleBatch(copies, perturbation, rng)
+    return numpy.concatenate([routes, copies])
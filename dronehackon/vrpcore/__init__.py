@@ -0,0 +1 @@
+# Solver pieces shared by the Django app and corelogic, they only need numpy and the standard library
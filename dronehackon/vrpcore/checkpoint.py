@@ -0,0 +1,42 @@
+import os
+import io
+import pickle
+import tempfile
+import numpy
+
+
+# Write the arrays and the pickled state to path in one .npz file, replacing any previous checkpoint
+#   only once the new one is completely on disk
+def saveCheckpoint(path, arrays, state):
+    """
+    Inputs : path - checkpoint file
+             arrays - name -> numpy array, stored as they are
+             state - any other picklable values, stored as one byte array
+    Outputs : None
+    """
+    buffer = io.BytesIO()
+    state_bytes = numpy.frombuffer(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), dtype=numpy.uint8)
+    numpy.savez(buffer, state=state_bytes, **arrays)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix=".checkpoint_", dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as temp_file:
+            temp_file.write(buffer.getbuffer())
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def loadCheckpoint(path):
+    """
+    Inputs : path - file written by saveCheckpoint
+    Outputs : (name -> array dict, state)
+    """
+    with numpy.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files if key != 'state'}
+        state = pickle.loads(data['state'].tobytes())
+    return arrays, state
@@ -0,0 +1,283 @@
+import math
+import collections
+import numpy
+
+# Mean earth radius in km, the one the haversine package uses
+EARTH_RADIUS = 6371.0088
+
+
+# Distances from the points of a block of rows to every point, in float64
+def blockDistances(coordinates, rows, metric="euclidean", columns=slice(None)):
+    """
+    Inputs : coordinates - (n x 2) float64 array, x/y or lat/long in degrees
+             rows, columns - slices of the points the distances are from and to
+             metric - "euclidean" or "haversine" for lat/long in km
+    Outputs : (rows x columns) array of distances
+    """
+    if metric == "euclidean":
+        difference_x = coordinates[rows, 0, None] - coordinates[None, columns, 0]
+        difference_y = coordinates[rows, 1, None] - coordinates[None, columns, 1]
+        return numpy.sqrt(difference_x * difference_x + difference_y * difference_y)
+    if metric == "haversine":
+        radians = numpy.radians(coordinates)
+        latitude, longitude = radians[rows, 0, None], radians[rows, 1, None]
+        half_chord = numpy.sin((radians[None, columns, 0] - latitude) / 2) ** 2 + numpy.cos(latitude) * \
+            numpy.cos(radians[None, columns, 0]) * numpy.sin((radians[None, columns, 1] - longitude) / 2) ** 2
+        return 2 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(numpy.minimum(half_chord, 1.0)))
+    raise ValueError(f"Unknown metric {metric}, expected euclidean or haversine")
+
+
+# Full distance matrix computed block_rows rows at a time, so that the temporaries stay a few
+#   block_rows x n arrays whatever the number of points
+def distanceMatrix(coordinates, metric="euclidean", dtype=numpy.float64, block_rows=512):
+    """
+    Inputs : coordinates - (n x 2) array, the depot first
+             metric - "euclidean" or "haversine", see blockDistances
+             dtype - float64 or float32 for the matrix
+             block_rows - rows computed at once
+    Outputs : (n x n) array
+    """
+    coordinates = numpy.ascontiguousarray(coordinates, dtype=numpy.float64)
+    num_points = len(coordinates)
+    matrix = numpy.empty((num_points, num_points), dtype=dtype)
+    for start in range(0, num_points, block_rows):
+        rows = slice(start, min(start + block_rows, num_points))
+        matrix[rows] = blockDistances(coordinates, rows, metric)
+    return matrix
+
+
+# Upper triangle of a symmetric matrix without its zero diagonal, row after row, n (n - 1) / 2 values.
+#   Row i holds the distances from i to the points after it and starts at packedOffset(i, n)
+def packedOffset(i, num_points):
+    return i * num_points - i * (i + 1) // 2
+
+
+def packedIndex(i, j, num_points):
+    """
+    Inputs : i, j - point indices or integer arrays of them, i != j
+             num_points - number of points of the matrix
+    Outputs : index or array of indices of the distance between i and j in the packed triangle
+    """
+    low, high = numpy.minimum(i, j), numpy.maximum(i, j)
+    return packedOffset(low, num_points) + high - low - 1
+
+
+def packedDistances(coordinates, metric="euclidean", dtype=numpy.float64, block_rows=512):
+    """
+    Inputs : see distanceMatrix
+    Outputs : 1-D array of the packed upper triangle, half the size of the full matrix
+    """
+    coordinates = numpy.ascontiguousarray(coordinates, dtype=numpy.float64)
+    num_points = len(coordinates)
+    packed = numpy.empty(num_points * (num_points - 1) // 2, dtype=dtype)
+    for start in range(0, num_points, block_rows):
+        stop = min(start + block_rows, num_points)
+        block = blockDistances(coordinates, slice(start, stop), metric, slice(start, None))
+        for i in range(start, stop):
+            offset = packedOffset(i, num_points)
+            packed[offset:offset + num_points - i - 1] = block[i - start, i - start + 1:]
+    return packed
+
+
+def packMatrix(matrix, dtype=None):
+    """
+    Inputs : matrix - symmetric (n x n) array
+             dtype - dtype of the packed triangle, the matrix's if None
+    Outputs : 1-D array of its packed upper triangle
+    """
+    matrix = numpy.asarray(matrix)
+    num_points = len(matrix)
+    packed = numpy.empty(num_points * (num_points - 1) // 2, dtype=dtype or matrix.dtype)
+    for i in range(num_points - 1):
+        offset = packedOffset(i, num_points)
+        packed[offset:offset + num_points - i - 1] = matrix[i, i + 1:]
+    return packed
+
+
+def packedRow(packed, i, num_points):
+    """
+    Inputs : packed - packed upper triangle
+             i - point index
+             num_points - number of points of the matrix
+    Outputs : row i of the full matrix as a new array
+    """
+    row = numpy.zeros(num_points, dtype=packed.dtype)
+    before = numpy.arange(i)
+    row[:i] = packed[packedOffset(before, num_points) + i - before - 1]
+    offset = packedOffset(i, num_points)
+    row[i + 1:] = packed[offset:offset + num_points - i - 1]
+    return row
+
+
+def unpackDistances(packed, num_points, dtype=None):
+    """
+    Inputs : packed - packed upper triangle
+             num_points - number of points of the matrix
+             dtype - dtype of the matrix, the packed one's if None
+    Outputs : full symmetric (n x n) array
+    """
+    matrix = numpy.zeros((num_points, num_points), dtype=dtype or packed.dtype)
+    for i in range(num_points - 1):
+        offset = packedOffset(i, num_points)
+        matrix[i, i + 1:] = packed[offset:offset + num_points - i - 1]
+    # Lower triangle from the upper one, a block of columns at a time to keep the temporaries small
+    for start in range(0, num_points, 512):
+        stop = min(start + 512, num_points)
+        matrix[start:stop, :start] = matrix[:start, start:stop].T
+        block = matrix[start:stop, start:stop]
+        lower = numpy.tril_indices(stop - start, -1)
+        block[lower] = block.T[lower]
+    return matrix
+
+
+# Coordinates of a json instance as an array with the depot first, and the metric they go with
+def instanceCoordinates(json_data):
+    """
+    Inputs : json_data - instance dict, the maps view payload or the converttext2json output
+    Outputs : ((n + 1 x 2) float64 array, coordinate keys, "haversine" for lat/long or "euclidean" for x/y)
+    """
+    depot = json_data['depot'] if 'depot' in json_data else json_data['depart']
+    coordinate_keys = ('lat', 'long') if 'lat' in depot['coordinates'] else ('x', 'y')
+    points = [depot] + [json_data[f"customer_{customer_id}"]
+                        for customer_id in range(1, json_data['Number_of_customers'] + 1)]
+    coordinates = numpy.array([[point['coordinates'][key] for key in coordinate_keys] for point in points],
+                              dtype=numpy.float64)
+    return coordinates, coordinate_keys, "haversine" if coordinate_keys == ('lat', 'long') else "euclidean"
+
+
+# Distances computed on demand from the coordinates, for instances whose dense matrix does not fit in
+#   memory, with memory in O(n + cache_rows n). It is indexed like the dense matrix: item(i, j), [i, j] with
+#   integers, integer arrays or slices, len and shape, and [i] for a whole row, the last cache_rows rows
+#   asked for are kept. Turning it into an array raises, a dense copy would defeat its purpose
+class DistanceOracle(object):
+
+    def __init__(self, coordinates, metric="euclidean", cache_rows=256, dtype=numpy.float64):
+        """
+        Inputs : coordinates - (n x 2) array, the depot first, x/y or lat/long in degrees
+                 metric - "euclidean" or "haversine" for lat/long in km
+                 cache_rows - most rows kept
+                 dtype - dtype of the returned arrays
+        """
+        if metric not in ("euclidean", "haversine"):
+            raise ValueError(f"Unknown metric {metric}, expected euclidean or haversine")
+        self.coordinates = numpy.ascontiguousarray(coordinates, dtype=numpy.float64)
+        self.metric = metric
+        self.cache_rows = cache_rows
+        self.dtype = numpy.dtype(dtype)
+        self.positions = numpy.arange(len(self.coordinates))
+        self.setUp()
+
+    def setUp(self):
+        # Per point terms of the formulas, as arrays for pairs and as lists for item
+        if self.metric == "haversine":
+            self.points = numpy.radians(self.coordinates)
+            self.cos_latitude = numpy.cos(self.points[:, 0])
+            self.cos_latitude_list = self.cos_latitude.tolist()
+        else:
+            self.points = self.coordinates
+        self.first_list, self.second_list = self.points[:, 0].tolist(), self.points[:, 1].tolist()
+        self.rows = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Only the coordinates and settings go to worker processes, the rest is rebuilt there
+        return {'coordinates': self.coordinates, 'metric': self.metric, 'cache_rows': self.cache_rows,
+                'dtype': self.dtype.str}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def settings(self):
+        return {'metric': self.metric, 'cache_rows': self.cache_rows, 'dtype': self.dtype.str}
+
+    @property
+    def shape(self):
+        return len(self.coordinates), len(self.coordinates)
+
+    @property
+    def ndim(self):
+        return 2
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __array__(self, dtype=None, copy=None):
+        raise TypeError("DistanceOracle computes distances on demand, use distanceMatrix for a dense matrix")
+
+    def item(self, i, j):
+        """
+        Inputs : i, j - point indices
+        Outputs : distance between them as a float
+        """
+        if self.metric == "euclidean":
+            difference_x = self.first_list[i] - self.first_list[j]
+            difference_y = self.second_list[i] - self.second_list[j]
+            return math.sqrt(difference_x * difference_x + difference_y * difference_y)
+        half_latitude = math.sin((self.first_list[j] - self.first_list[i]) / 2)
+        half_longitude = math.sin((self.second_list[j] - self.second_list[i]) / 2)
+        half_chord = half_latitude * half_latitude + \
+            self.cos_latitude_list[i] * self.cos_latitude_list[j] * half_longitude * half_longitude
+        return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(half_chord, 1.0)))
+
+    def pairs(self, i, j):
+        """
+        Inputs : i, j - integer arrays of point indices, broadcast against each other
+        Outputs : array of the distances between i and j, of their broadcast shape
+        """
+        i, j = numpy.asarray(i), numpy.asarray(j)
+        if self.metric == "euclidean":
+            difference_x = self.points[j, 0] - self.points[i, 0]
+            difference_y = self.points[j, 1] - self.points[i, 1]
+            distances = numpy.sqrt(difference_x * difference_x + difference_y * difference_y)
+        else:
+            half_latitude = numpy.sin((self.points[j, 0] - self.points[i, 0]) / 2)
+            half_longitude = numpy.sin((self.points[j, 1] - self.points[i, 1]) / 2)
+            half_chord = half_latitude * half_latitude + \
+                self.cos_latitude[i] * self.cos_latitude[j] * half_longitude * half_longitude
+            distances = 2 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(numpy.minimum(half_chord, 1.0)))
+        return distances.astype(self.dtype, copy=False)
+
+    def row(self, i):
+        """
+        Inputs : i - point index
+        Outputs : read-only array of the distances from i to every point, from the cache if it holds it
+        """
+        row = self.rows.get(i)
+        if row is not None:
+            self.hits += 1
+            self.rows.move_to_end(i)
+            return row
+        self.misses += 1
+        row = self.pairs(i, self.positions)
+        row.flags.writeable = False
+        self.rows[i] = row
+        if len(self.rows) > self.cache_rows:
+            self.rows.popitem(last=False)
+        return row
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            if isinstance(key, (int, numpy.integer)):
+                return self.row(int(key) % len(self))
+            return self.pairs(self.positions[key][:, None], self.positions)
+
+        first, second = key
+        if isinstance(first, (int, numpy.integer)) and isinstance(second, (int, numpy.integer)):
+            return self.item(int(first), int(second))
+
+        # Integer arrays pair up element by element, a slice spans its own axis like numpy does
+        i, j = self.positions[first], self.positions[second]
+        if isinstance(first, slice) and isinstance(second, slice):
+            i = i[:, None]
+        elif isinstance(first, slice):
+            i = i.reshape((-1,) + (1,) * j.ndim)
+        elif isinstance(second, slice):
+            i = i[..., None]
+        return self.pairs(i, j)
+
+    def counters(self):
+        # Row cache hits and misses since the last call
+        counters = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return counters
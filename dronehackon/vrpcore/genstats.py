@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import numpy
+
+logger = logging.getLogger(__name__)
+
+
+# Aggregates of the population's fitness, from one (N x 2) array instead of a reduction per statistic
+#   over a list of tuples
+def fitnessSummary(values):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+    Outputs : dict with the avg, std, min and max arrays per objective and the index of the best point,
+              lexicographically smallest and first of equals, the one tools.selBest picks
+    """
+    values = numpy.asarray(values, dtype=numpy.float64).reshape(-1, 2)
+    average = values.mean(axis=0)
+    return {'avg': average,
+            'std': numpy.sqrt(numpy.square(values - average).mean(axis=0)),
+            'min': values.min(axis=0),
+            'max': values.max(axis=0),
+            'best': int(numpy.lexsort((values[:, 1], values[:, 0]))[0])}
+
+
+def routeDigest(route):
+    """
+    Inputs : route as a sequence or 1-D array of customer ids
+    Outputs : 16 hex digit digest standing for the route in the logs
+    """
+    return hashlib.blake2b(numpy.ascontiguousarray(route, dtype=numpy.int32).tobytes(), digest_size=8).hexdigest()
+
+
+# Logbook records every interval generations, with the best route kept as a digest unless keep_best
+class GenerationStats(object):
+
+    def __init__(self, interval=1, keep_best=False, sink=None, run_log=None, logbook_limit=None):
+        """
+        Inputs : interval - generations between two records, the first and forced ones always recorded
+                 keep_best - also record the whole best route
+                 sink - logging.Logger the records are streamed to, this module's logger if None
+                 run_log - RunLog every record is also appended to, if any
+                 logbook_limit - most records kept in the logbook, the older ones only in the run log
+        """
+        self.interval = max(1, interval)
+        self.keep_best = keep_best
+        self.sink = sink if sink is not None else logger
+        self.run_log = run_log
+        self.logbook_limit = logbook_limit
+        self.evals = 0
+
+    def header(self):
+        columns = ["Generation", "evals", "avg", "std", "min", "max", "best_hash", "fitness_best_one"]
+        return columns + ["best_one"] if self.keep_best else columns
+
+    def record(self, logbook, gen, pop, evals, cache=None, force=False, timer=None, **fields):
+        """
+        Inputs : logbook - Logbook the record goes to
+                 gen - generation of pop
+                 pop - population
+                 evals - fitness evaluations of this generation, summed up to the next record
+                 cache - fitness cache whose hits, misses and hit rate are logged, if any
+                 force - record even between two intervals, like for the last generation
+                 timer - PhaseTimer whose phase times, summed since the last record, are logged, if any
+                 fields - further values to log for this generation
+        Outputs : the record, None if this generation is not recorded
+        """
+        self.evals += evals
+        if not force and gen % self.interval != 0:
+            return None
+
+        values = numpy.array([ind.fitness.values for ind in pop], dtype=numpy.float64)
+        summary = fitnessSummary(values)
+        best = summary.pop('best')
+        record = dict(Generation=gen, evals=self.evals, **summary)
+        record['best_hash'] = routeDigest(pop[best])
+        record['fitness_best_one'] = tuple(values[best].tolist())
+        if self.keep_best:
+            record['best_one'] = list(pop[best])
+        if cache is not None:
+            record["cache_hits"], record["cache_misses"] = cache.popCounters()
+            lookups = record["cache_hits"] + record["cache_misses"]
+            record["cache_hit_rate"] = record["cache_hits"] / lookups if lookups else 0.0
+        if timer is not None:
+            record.update(timer.popTimes())
+            if record.get('time_evaluate'):
+                record['evals_per_second'] = self.evals / record['time_evaluate']
+        record.update(fields)
+
+        logbook.record(**record)
+        self.sink.info(logbook.stream)
+        if self.run_log is not None:
+            self.run_log.write(record)
+        while self.logbook_limit and len(logbook) > self.logbook_limit:
+            logbook.pop(0)
+        self.evals = 0
+        return record
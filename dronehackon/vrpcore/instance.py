@@ -0,0 +1,104 @@
+import numpy
+
+from .neighbors import NeighborIndex
+from .distances import DistanceOracle
+
+
+# Compiled form of a problem instance, everything the solver reads in its loops
+class CompiledInstance(object):
+
+    def __init__(self, instance_name, vehicle_capacity, max_vehicle_number, demand, distance_matrix,
+                 coordinates, coordinate_keys, drone=None):
+        self.instance_name = instance_name
+        self.vehicle_capacity = vehicle_capacity
+        self.max_vehicle_number = max_vehicle_number
+
+        # Index 0 is the depot, customer ids index the rest
+        self.demand = numpy.ascontiguousarray(demand, dtype=numpy.float64)
+        self.distance_matrix = distance_matrix
+        self.coordinates = numpy.ascontiguousarray(coordinates, dtype=numpy.float64)
+        self.coordinate_keys = coordinate_keys
+
+        # Drone parameters used by the split and the cost
+        self.drone = drone
+
+        # Nearest customers of every customer, built on first use
+        self.neighbor_index = None
+
+    @property
+    def num_customers(self):
+        return len(self.demand) - 1
+
+    def sharedArrays(self):
+        # Arrays a worker process maps instead of receiving a copy, a distance oracle is rebuilt
+        #   in the worker from the coordinates
+        arrays = {'demand': self.demand, 'coordinates': self.coordinates}
+        if not isinstance(self.distance_matrix, DistanceOracle):
+            arrays['distance_matrix'] = self.distance_matrix
+        return arrays
+
+    def sharedFields(self):
+        # Everything else, small enough to be pickled once per worker
+        oracle = self.distance_matrix.settings() if isinstance(self.distance_matrix, DistanceOracle) else None
+        return {'instance_name': self.instance_name, 'vehicle_capacity': self.vehicle_capacity,
+                'max_vehicle_number': self.max_vehicle_number, 'coordinate_keys': self.coordinate_keys,
+                'drone': self.drone, 'distance_oracle': oracle}
+
+    def neighborIndex(self, num_neighbors=10):
+        """
+        Inputs : num_neighbors - neighbors needed per customer
+        Outputs : NeighborIndex over the coordinates, built once and only rebuilt for more neighbors
+        """
+        if self.neighbor_index is None or \
+                self.neighbor_index.num_neighbors < min(num_neighbors, self.num_customers - 1):
+            self.neighbor_index = NeighborIndex(self.coordinates, self.coordinate_keys, num_neighbors)
+        return self.neighbor_index
+
+    def customerCoordinates(self, customer_id):
+        """
+        Inputs : customer id, 0 for the depot
+        Outputs : [first, second] coordinate as in the json, lat/long or x/y
+        """
+        return self.coordinates[customer_id].tolist()
+
+
+# Turn the loaded json, the maps view payload or the converttext2json output into a compiled instance
+def compileInstance(json_data, drone=None, dtype=None, cache_rows=256):
+    """
+    Inputs : json_data - instance dict with customer_{id} entries and a distance_matrix,
+                         or a DistanceOracle or no distance_matrix at all for large instances
+             drone - drone object whose parameters go with the instance
+             dtype - float64 or float32 for the distance matrix, None to keep the dtype of a float
+                     distance_matrix array and float64 for anything else
+             cache_rows - rows kept by the DistanceOracle built when there is no distance_matrix
+    Outputs : CompiledInstance with contiguous demand, distance and coordinate arrays, the distances
+              computed on demand from the coordinates, haversine km for lat/long, without a matrix
+    """
+    num_customers = json_data['Number_of_customers']
+
+    # Django payload names the depot 'depot' with lat/long, text instances 'depart' with x/y
+    depot = json_data['depot'] if 'depot' in json_data else json_data['depart']
+    coordinate_keys = ('lat', 'long') if 'lat' in depot['coordinates'] else ('x', 'y')
+
+    demand = numpy.zeros(num_customers + 1, dtype=numpy.float64)
+    coordinates = numpy.zeros((num_customers + 1, 2), dtype=numpy.float64)
+    coordinates[0] = [depot['coordinates'][key] for key in coordinate_keys]
+    for customer_id in range(1, num_customers + 1):
+        customer = json_data[f"customer_{customer_id}"]
+        demand[customer_id] = customer['demand']
+        coordinates[customer_id] = [customer['coordinates'][key] for key in coordinate_keys]
+
+    # A float32 matrix mapped from a binary instance file stays mapped instead of being copied to float64
+    distance_matrix = json_data.get('distance_matrix')
+    if dtype is None:
+        is_float = isinstance(distance_matrix, numpy.ndarray) and distance_matrix.dtype.kind == 'f'
+        dtype = distance_matrix.dtype if is_float else numpy.float64
+    if distance_matrix is None:
+        metric = "haversine" if coordinate_keys == ('lat', 'long') else "euclidean"
+        distance_matrix = DistanceOracle(coordinates, metric, cache_rows, dtype)
+    elif not isinstance(distance_matrix, DistanceOracle):
+        distance_matrix = numpy.ascontiguousarray(distance_matrix, dtype=dtype)
+
+    return CompiledInstance(json_data.get('instance_name'), json_data['vehicle_capacity'],
+                            json_data.get('max_vehicle_number'), demand, distance_matrix,
+                            coordinates, coordinate_keys, drone)
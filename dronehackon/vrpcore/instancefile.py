@@ -0,0 +1,156 @@
+import io
+import os
+import json
+import struct
+import argparse
+import numpy
+
+# Binary instance file: the magic, the byte length of a JSON header, the header, then every array as raw
+#   bytes at an aligned offset. The header holds the scalar fields of the instance and the dtype, shape
+#   and offset of the arrays, so the distance matrix is memory-mapped on load instead of parsed
+INSTANCE_MAGIC = b"VRPINST1"
+INSTANCE_EXTENSION = ".vrpi"
+ALIGNMENT = 64
+
+
+def isInstanceFile(path):
+    """
+    Inputs : path to an instance file
+    Outputs : True if it is a binary instance file, False for json or anything else
+    """
+    with io.open(path, 'rb') as file_object:
+        return file_object.read(len(INSTANCE_MAGIC)) == INSTANCE_MAGIC
+
+
+def alignedOffset(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def saveInstanceFile(instance, path, dtype=numpy.float64):
+    """
+    Inputs : instance - json instance, the maps view payload or the converttext2json output
+             path - binary instance file to write
+             dtype - float64 or float32 for the distance matrix
+    Outputs : None
+    """
+    num_customers = instance['Number_of_customers']
+    depot_key = 'depot' if 'depot' in instance else 'depart'
+    point_keys = [depot_key] + [f"customer_{customer_id}" for customer_id in range(1, num_customers + 1)]
+    points = [instance[key] for key in point_keys]
+    coordinate_keys = list(points[0]['coordinates'])
+
+    # Fields that every point has as a number become arrays, the rest stay in the header
+    point_fields = [key for key in points[0] if key != 'coordinates' and
+                    all(isinstance(point.get(key), (int, float)) and not isinstance(point.get(key), bool)
+                        for point in points)]
+    point_extras = {}
+    for key, point in zip(point_keys, points):
+        extras = {field: value for field, value in point.items()
+                  if field != 'coordinates' and field not in point_fields}
+        if extras:
+            point_extras[key] = extras
+
+    coordinates = [[point['coordinates'][key] for key in coordinate_keys] for point in points]
+    arrays = {'coordinates': numpy.array(coordinates, dtype=numpy.float64)}
+    for field in point_fields:
+        arrays[f"point_{field}"] = numpy.array([point[field] for point in points], dtype=numpy.float64)
+    # The full matrix or its packed upper triangle, see distances.packedDistances, or none at all
+    #   for the distances to be computed on demand
+    for matrix_key in ('distance_matrix', 'distance_matrix_packed'):
+        if instance.get(matrix_key) is not None:
+            arrays[matrix_key] = numpy.ascontiguousarray(instance[matrix_key], dtype=dtype)
+            break
+
+    point_names = set(point_keys) | {'distance_matrix', 'distance_matrix_packed'}
+    header = {'fields': {key: value for key, value in instance.items() if key not in point_names},
+              'depot_key': depot_key, 'coordinate_keys': coordinate_keys, 'point_fields': point_fields,
+              'point_extras': point_extras, 'arrays': {}}
+
+    # Array offsets are from the start of the data, which is the first aligned offset after the header
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = alignedOffset(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = alignedOffset(len(INSTANCE_MAGIC) + 8 + len(header_bytes))
+
+    with io.open(path, 'wb') as file_object:
+        file_object.write(INSTANCE_MAGIC)
+        file_object.write(struct.pack('<Q', len(header_bytes)))
+        file_object.write(header_bytes)
+        for name, array in arrays.items():
+            file_object.seek(data_start + header['arrays'][name]['offset'])
+            file_object.write(memoryview(array).cast('B'))
+
+
+def readInstanceHeader(path):
+    """
+    Inputs : path to a binary instance file
+    Outputs : (header dict, see saveInstanceFile, file offset the array offsets start from)
+    """
+    with io.open(path, 'rb') as file_object:
+        if file_object.read(len(INSTANCE_MAGIC)) != INSTANCE_MAGIC:
+            raise ValueError(f"{path} is not a binary instance file")
+        header_size, = struct.unpack('<Q', file_object.read(8))
+        header = json.loads(file_object.read(header_size).decode('utf-8'))
+    return header, alignedOffset(len(INSTANCE_MAGIC) + 8 + header_size)
+
+
+def readInstanceFile(path, mmap=True):
+    """
+    Inputs : path to a binary instance file
+             mmap - map the distance matrix read-only instead of reading it into memory
+    Outputs : json instance like load_instance returns for the json file, its distance_matrix an array,
+              or its distance_matrix_packed if the file holds the packed triangle
+    """
+    header, data_start = readInstanceHeader(path)
+
+    def readArray(name, mapped=False):
+        spec = header['arrays'][name]
+        shape = tuple(spec['shape'])
+        if mapped:
+            return numpy.memmap(path, dtype=spec['dtype'], mode='r', offset=data_start + spec['offset'],
+                                shape=shape)
+        return numpy.fromfile(path, dtype=spec['dtype'], count=int(numpy.prod(shape)),
+                              offset=data_start + spec['offset']).reshape(shape)
+
+    instance = dict(header['fields'])
+    coordinates = readArray('coordinates').tolist()
+    fields = {field: readArray(f"point_{field}").tolist() for field in header['point_fields']}
+    point_keys = [header['depot_key']] + [f"customer_{customer_id}"
+                                          for customer_id in range(1, len(coordinates))]
+    for index, key in enumerate(point_keys):
+        point = {'coordinates': dict(zip(header['coordinate_keys'], coordinates[index]))}
+        for field, values in fields.items():
+            point[field] = values[index]
+        point.update(header['point_extras'].get(key, {}))
+        instance[key] = point
+    for matrix_key in ('distance_matrix', 'distance_matrix_packed'):
+        if matrix_key in header['arrays']:
+            instance[matrix_key] = readArray(matrix_key, mapped=mmap)
+    return instance
+
+
+def convertJsonInstance(json_file, output_file=None, dtype=numpy.float64):
+    """
+    Inputs : json_file - instance written by converttext2json or saved from the maps view
+             output_file - binary instance file, json_file with the .vrpi extension if None
+             dtype - float64 or float32 for the distance matrix
+    Outputs : path of the binary instance file
+    """
+    if output_file is None:
+        output_file = os.path.splitext(json_file)[0] + INSTANCE_EXTENSION
+    with io.open(json_file, 'rt', newline='') as file_object:
+        instance = json.load(file_object)
+    saveInstanceFile(instance, output_file, dtype)
+    return output_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert json instances to the memory-mapped binary format")
+    parser.add_argument('json_files', type=str, nargs='+', help="Json instance files")
+    parser.add_argument('--float32', action='store_true', help="Store the distance matrix in single precision")
+    args = parser.parse_args()
+    dtype = numpy.float32 if args.float32 else numpy.float64
+    for json_file in args.json_files:
+        print(f"Write to file: {convertJsonInstance(json_file, dtype=dtype)}")
@@ -0,0 +1,80 @@
+import io
+import time
+import pstats
+import logging
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+# Wall time spent in each phase of the generations, summed until it is popped into a record
+class PhaseTimer(object):
+
+    def __init__(self):
+        self.times = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - started
+
+    def popTimes(self):
+        """
+        Inputs : None
+        Outputs : dict time_<phase> -> seconds since the last call, and the traced memory if tracemalloc is on
+        """
+        times = {f"time_{name}": seconds for name, seconds in self.times.items()}
+        self.times = {}
+        if tracemalloc.is_tracing():
+            times['memory_current'], times['memory_peak'] = tracemalloc.get_traced_memory()
+        return times
+
+
+# Profiling a whole run, with cProfile for where the time goes or tracemalloc for where the memory goes
+class RunProfiler(object):
+
+    MODES = ("cprofile", "tracemalloc")
+
+    def __init__(self, mode, path=None, top=20):
+        """
+        Inputs : mode - cprofile or tracemalloc
+                 path - file the cProfile stats or the final tracemalloc snapshot are dumped to, if given
+                 top - number of functions or lines logged at the end
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profile mode {mode}, expected one of {', '.join(self.MODES)}")
+        self.mode = mode
+        self.path = path
+        self.top = top
+        self.profile = None
+        self.start_snapshot = None
+
+    def __enter__(self):
+        if self.mode == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            tracemalloc.start()
+            self.start_snapshot = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == "cprofile":
+            self.profile.disable()
+            if self.path:
+                self.profile.dump_stats(self.path)
+            summary = io.StringIO()
+            pstats.Stats(self.profile, stream=summary).sort_stats("cumulative").print_stats(self.top)
+            logger.info(summary.getvalue())
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            if self.path:
+                snapshot.dump(self.path)
+            differences = snapshot.compare_to(self.start_snapshot, "lineno")[:self.top]
+            logger.info("\n".join(str(difference) for difference in differences))
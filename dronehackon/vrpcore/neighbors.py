@@ -0,0 +1,144 @@
+import numpy
+
+from .distances import EARTH_RADIUS
+
+
+# Points the neighbors are searched among, lat/long go on the unit sphere where the straight line
+#   distance grows with the great circle one, so both give the same nearest points
+def toCartesian(coordinates, coordinate_keys=('x', 'y')):
+    """
+    Inputs : coordinates - (N x 2) array, lat/long in degrees or x/y
+             coordinate_keys - names of the two coordinates, ('lat', 'long') or ('x', 'y')
+    Outputs : (N x 3) unit vectors for lat/long, the (N x 2) coordinates otherwise
+    """
+    coordinates = numpy.asarray(coordinates, dtype=numpy.float64)
+    if tuple(coordinate_keys) != ('lat', 'long'):
+        return coordinates.copy()
+    latitude, longitude = numpy.radians(coordinates[:, 0]), numpy.radians(coordinates[:, 1])
+    return numpy.stack([numpy.cos(latitude) * numpy.cos(longitude), numpy.cos(latitude) * numpy.sin(longitude),
+                        numpy.sin(latitude)], axis=1)
+
+
+# Nearest customers of the depot and of every customer, found on a uniform grid of cells holding about
+#   leaf_size customers each, so a query only looks at the cells around its point
+class NeighborIndex(object):
+
+    def __init__(self, coordinates, coordinate_keys=('x', 'y'), num_neighbors=10, leaf_size=4):
+        """
+        Inputs : coordinates - (n + 1 x 2) array with the depot at index 0, lat/long or x/y
+                 coordinate_keys - names of the two coordinates, ('lat', 'long') or ('x', 'y')
+                 num_neighbors - neighbors kept per point, at most n - 1
+                 leaf_size - customers per grid cell aimed at
+        """
+        self.spherical = tuple(coordinate_keys) == ('lat', 'long')
+        self.points = toCartesian(coordinates, coordinate_keys)
+        self.num_customers = len(self.points) - 1
+        self.num_neighbors = max(0, min(num_neighbors, self.num_customers - 1))
+        self.buildGrid(leaf_size)
+
+        # neighbors[i] - the num_neighbors customers nearest to point i, nearest first, row 0 for the depot
+        self.neighbors, self.neighbor_distances = self.query(numpy.arange(self.num_customers + 1),
+                                                             self.num_neighbors)
+        self.depot_distance = self.toDistance(numpy.linalg.norm(self.points - self.points[0], axis=1))
+
+    def toDistance(self, lengths):
+        # Straight line lengths between points to distances, in km along the earth for lat/long
+        if self.spherical:
+            return 2 * EARTH_RADIUS * numpy.arcsin(numpy.minimum(lengths / 2, 1.0))
+        return lengths
+
+    def buildGrid(self, leaf_size):
+        customers = self.points[1:]
+        if len(customers) == 0:
+            self.low, self.cell, self.shape = numpy.zeros(self.points.shape[1]), 1.0, (1,) * self.points.shape[1]
+            self.order, self.starts = numpy.zeros(0, dtype=numpy.int64), numpy.zeros(2, dtype=numpy.int64)
+            return
+        self.low = customers.min(axis=0)
+        extent = customers.max(axis=0) - self.low
+
+        # Cell side giving about leaf_size customers per cell over the axes the customers spread along,
+        #   an axis thinner than one cell, like the depth of a patch of the sphere, gets a single cell
+        spread = extent > 0
+        cell = 1.0
+        while spread.any():
+            cell = (numpy.prod(extent[spread]) * leaf_size / len(customers)) ** (1.0 / spread.sum())
+            thin = spread & (extent < cell)
+            if not thin.any():
+                break
+            spread &= ~thin
+        self.cell = cell if cell > 0 else 1.0
+        self.shape = tuple((numpy.floor(extent / self.cell).astype(numpy.int64) + 1).tolist())
+
+        # Customers sorted by cell, those of a cell between starts[cell] and starts[cell + 1]
+        cells = numpy.ravel_multi_index(self.cellOf(customers).T, self.shape)
+        self.order = numpy.argsort(cells, kind='stable') + 1
+        self.starts = numpy.searchsorted(cells[self.order - 1], numpy.arange(numpy.prod(self.shape) + 1))
+
+    def cellOf(self, points):
+        cells = numpy.floor((points - self.low) / self.cell).astype(numpy.int64)
+        return numpy.clip(cells, 0, numpy.array(self.shape) - 1)
+
+    def query(self, point_ids, k):
+        """
+        Inputs : point_ids - ids of the points to query, 0 for the depot
+                 k - customers to return per point, the point itself left out
+        Outputs : ((len(point_ids) x k) int32 customer ids, nearest first, (len(point_ids) x k) distances)
+        """
+        point_ids = numpy.asarray(point_ids, dtype=numpy.int64)
+        neighbors = numpy.zeros((len(point_ids), k), dtype=numpy.int32)
+        distances = numpy.zeros((len(point_ids), k))
+        if k == 0 or len(point_ids) == 0:
+            return neighbors, distances
+
+        # Points of one cell are queried together, on a box of cells grown ring by ring until the k-th
+        #   nearest customer found is closer than anything outside the box can be
+        shape = numpy.array(self.shape)
+        cells = self.cellOf(self.points[point_ids])
+        flat = numpy.ravel_multi_index(cells.T, self.shape)
+        by_cell = numpy.argsort(flat, kind='stable')
+        bounds = numpy.flatnonzero(numpy.diff(flat[by_cell])) + 1
+        for rows in numpy.split(by_cell, bounds):
+            ids, cell = point_ids[rows], cells[rows[0]]
+            points = self.points[ids]
+            radius = 1
+            while True:
+                first, last = numpy.maximum(cell - radius, 0), numpy.minimum(cell + radius, shape - 1)
+                candidates = self.cellRange(first, last)
+                if len(candidates) > k:
+                    lengths = numpy.linalg.norm(points[:, None, :] - self.points[candidates][None, :, :], axis=2)
+                    lengths[candidates[None, :] == ids[:, None]] = numpy.inf
+                    nearest = numpy.argpartition(lengths, k - 1, axis=1)[:, :k]
+                    kth = numpy.take_along_axis(lengths, nearest, axis=1).max(axis=1)
+
+                    # Nearest distance from a point to the cells outside the box, none past the grid edges
+                    below = numpy.where(first > 0, points - (self.low + first * self.cell), numpy.inf)
+                    above = numpy.where(last < shape - 1, self.low + (last + 1) * self.cell - points, numpy.inf)
+                    outside = numpy.minimum(below, above).min(axis=1)
+                    if (kth <= outside).all():
+                        break
+                radius *= 2
+
+            # Nearest first, ties by customer id
+            lengths = numpy.take_along_axis(lengths, nearest, axis=1)
+            nearest = candidates[nearest]
+            order = numpy.lexsort((nearest, lengths), axis=1)
+            neighbors[rows] = numpy.take_along_axis(nearest, order, axis=1)
+            distances[rows] = self.toDistance(numpy.take_along_axis(lengths, order, axis=1))
+        return neighbors, distances
+
+    def cellRange(self, first, last):
+        # Customers of the cells of the box from cell first to cell last, both included
+        axes = numpy.meshgrid(*[numpy.arange(low, high + 1) for low, high in zip(first, last)], indexing='ij')
+        cells = numpy.ravel_multi_index([axis.ravel() for axis in axes], self.shape)
+        starts, counts = self.starts[cells], self.starts[cells + 1] - self.starts[cells]
+        total = counts.sum()
+        offsets = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts) + numpy.arange(total)
+        return self.order[offsets]
+
+    def nearest(self, point_id, k=None):
+        """
+        Inputs : point_id - customer id, 0 for the depot
+                 k - number of neighbors, all the index holds if None
+        Outputs : array of the k nearest customer ids, nearest first
+        """
+        return self.neighbors[point_id, :k]
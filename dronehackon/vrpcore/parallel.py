@@ -0,0 +1,153 @@
+import math
+import functools
+import multiprocessing
+import numpy
+
+from multiprocessing import shared_memory, resource_tracker
+
+
+# File and offset of an array that is a whole read-only memory map, like the distance matrix of a
+#   binary instance file, None for any other array
+def mappedFile(array):
+    base = array
+    while base is not None and not isinstance(base, numpy.memmap):
+        base = base.base
+    if base is None or base.filename is None or base.flags.writeable or not array.flags.c_contiguous:
+        return None
+    if array.__array_interface__['data'][0] != base.__array_interface__['data'][0] or array.nbytes != base.nbytes:
+        return None
+    return base.filename, base.offset
+
+
+# Copy an array into a new shared memory block, or only describe it if it is mapped from a file that
+#   the workers can map as well, the operating system then shares its pages between the processes
+def shareArray(array):
+    """
+    Inputs : numpy array
+    Outputs : (shared memory block or None, (block name or file, offset, shape, dtype)) descriptor to attach to it
+    """
+    array = numpy.ascontiguousarray(array)
+    mapped = mappedFile(array)
+    if mapped is not None:
+        return None, (mapped[0], mapped[1], array.shape, array.dtype.str)
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    shared = numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    return block, (block.name, None, array.shape, array.dtype.str)
+
+
+# Map an array shared by the parent process, without copying it
+def attachArray(descriptor):
+    """
+    Inputs : (block name or file, offset, shape, dtype) descriptor from shareArray
+    Outputs : (shared memory block or None, numpy array backed by the block or the file)
+    """
+    name, offset, shape, dtype = descriptor
+    if offset is not None:
+        return None, numpy.memmap(name, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    # The parent owns and unlinks the block, but before python 3.13 attaching also registers
+    #   it with the resource tracker as if this worker owned it
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+    return block, numpy.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# State of a pool worker, set once by initWorker
+worker_state = {}
+
+
+def initWorker(descriptors, build_arguments, build_data, evaluate_batch, evaluate_kwargs):
+    """
+    Inputs : descriptors - name -> descriptor of the shared arrays
+             build_arguments - function(arrays, build_data) returning the keyword arguments
+                               of evaluate_batch built on the shared arrays
+             evaluate_batch - function(routes, **kwargs) returning (vehicles, costs)
+    Outputs : None, attaches the arrays and keeps the evaluate function for the worker
+    """
+    blocks, arrays = {}, {}
+    for key, descriptor in descriptors.items():
+        blocks[key], arrays[key] = attachArray(descriptor)
+    worker_state['blocks'] = blocks
+    worker_state['evaluate'] = functools.partial(evaluate_batch, **build_arguments(arrays, build_data),
+                                                 **evaluate_kwargs)
+
+
+def evaluateChunk(routes):
+    return worker_state['evaluate'](routes)
+
+
+# Evaluating populations in a process pool, the instance arrays live in shared memory or mapped files
+class ParallelEvaluator(object):
+
+    def __init__(self, evaluate_batch, arrays, build_arguments, build_data=None, processes=None,
+                 chunks_per_process=4, **evaluate_kwargs):
+        """
+        Inputs : evaluate_batch - function(routes, **kwargs) returning (vehicles, costs) arrays
+                 arrays - name -> numpy array to place in shared memory
+                 build_arguments, build_data - see initWorker
+                 processes - number of worker processes, all cores if None
+                 chunks_per_process - chunks each worker gets per population
+                 evaluate_kwargs - further fixed keyword arguments of evaluate_batch
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunks_per_process = chunks_per_process
+        self.evaluate_batch = evaluate_batch
+        self.arrays = arrays
+        self.build_arguments = build_arguments
+        self.build_data = build_data
+        self.evaluate_kwargs = evaluate_kwargs
+        self.blocks = []
+        self.pool = None
+
+    def start(self):
+        # The pool is started on the first evaluation, so an unused evaluator costs nothing
+        descriptors = {}
+        for key, array in self.arrays.items():
+            block, descriptors[key] = shareArray(array)
+            if block is not None:
+                self.blocks.append(block)
+        self.pool = multiprocessing.Pool(self.processes, initializer=initWorker,
+                                         initargs=(descriptors, self.build_arguments, self.build_data,
+                                                   self.evaluate_batch, self.evaluate_kwargs))
+
+    def evaluate(self, routes):
+        """
+        Inputs : routes - 2-D integer array, one route per row
+        Outputs : (vehicles, costs) arrays in the order of the routes
+        """
+        routes = numpy.ascontiguousarray(routes, dtype=numpy.int32)
+        if len(routes) == 0:
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0)
+        if self.pool is None:
+            self.start()
+
+        # Chunks sized to the population, a few per worker to even out the load
+        num_chunks = min(len(routes), self.processes * self.chunks_per_process)
+        chunk_size = math.ceil(len(routes) / num_chunks)
+        chunks = [routes[start:start + chunk_size] for start in range(0, len(routes), chunk_size)]
+        results = self.pool.map(evaluateChunk, chunks, chunksize=1)
+        vehicles = numpy.concatenate([result[0] for result in results])
+        costs = numpy.concatenate([result[1] for result in results])
+        return vehicles, costs
+
+    def close(self):
+        # Stopping the workers before releasing the memory they map
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,126 @@
+import io
+import json
+import time
+import numpy
+
+
+def jsonValue(value):
+    # json.dumps default for the numpy values of a record
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Appends the records of a run to a JSON lines file as they come, one line per record, flushed every
+#   flush_records records or flush_seconds seconds so that the file can be followed during the run.
+#   Several runs can share the file, every line is stamped with the run_id of its run
+class RunLog(object):
+
+    def __init__(self, path, flush_records=10, flush_seconds=5.0, run_id=None):
+        """
+        Inputs : path - JSON lines file, appended to if it exists
+                 flush_records - most records held before they are written out
+                 flush_seconds - most seconds a record is held before it is written out
+                 run_id - id written with every record, see runHistory, none if None
+        """
+        self.path = path
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self.run_id = run_id
+        self.file = io.open(path, 'a', encoding='utf-8')
+        self.pending = []
+        self.flushed_at = time.monotonic()
+
+    def write(self, record):
+        if self.run_id is not None:
+            record = dict(record, run_id=self.run_id)
+        self.pending.append(json.dumps(record, default=jsonValue))
+        if len(self.pending) >= self.flush_records or time.monotonic() - self.flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write("\n".join(self.pending) + "\n")
+            self.pending = []
+        self.file.flush()
+        self.flushed_at = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def readRunLog(path):
+    """
+    Inputs : path - file written by RunLog
+    Outputs : generator of the records, a last line cut short by a crash is skipped
+    """
+    with io.open(path, 'r', encoding='utf-8') as log_file:
+        for line in log_file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+# Records of one run of a shared run log. A run resumed from a checkpoint logs the generations after the
+#   checkpoint again, so a record that does not come after the last one kept cuts the history back to it
+def runHistory(path, run_id):
+    """
+    Inputs : path - file written by RunLog
+             run_id - id of the run
+    Outputs : list of the run's records, one per recorded generation in generation order
+    """
+    records = []
+    for record in readRunLog(path):
+        if record.get('run_id') != run_id:
+            continue
+        while records and records[-1]['Generation'] >= record['Generation']:
+            records.pop()
+        records.append(record)
+    return records
+
+
+# Columns of the records, one array per key, for the fitness history of a run
+def historyArrays(records):
+    """
+    Inputs : records - iterable of logbook records or run log lines
+    Outputs : dict key -> array with a row per record, numeric values as float arrays with nan for
+              records without the key, anything else as strings with '' for them
+    """
+    records = list(records)
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    arrays = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        present = [value for value in values if value is not None]
+        try:
+            if not present or any(isinstance(value, str) for value in present):
+                raise ValueError(key)
+            shape = numpy.shape(numpy.asarray(present[0], dtype=numpy.float64))
+            column = numpy.full((len(values),) + shape, numpy.nan)
+            for row, value in enumerate(values):
+                if value is not None:
+                    column[row] = numpy.asarray(value, dtype=numpy.float64)
+        except (TypeError, ValueError):
+            column = numpy.array(['' if value is None else str(value) for value in values])
+        arrays[key] = column
+    return arrays
+
+
+def exportHistory(path, records):
+    """
+    Inputs : path - .npz file to write
+             records - iterable of logbook records or run log lines
+    Outputs : None, the columns of historyArrays saved compressed
+    """
+    numpy.savez_compressed(path, **historyArrays(records))
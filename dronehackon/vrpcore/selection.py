@@ -0,0 +1,154 @@
+import bisect
+import numpy
+
+
+# NSGA-II selection specialised to two minimised objectives, working on arrays of fitness values
+#   instead of comparing individuals pair by pair, see tools.selNSGA2 and tools.selTournamentDCD
+
+
+def fitnessArray(individuals):
+    return numpy.array([ind.fitness.values for ind in individuals], dtype=numpy.float64).reshape(-1, 2)
+
+
+# Front of every point, in O(N log N) by sweeping the points in lexicographic order
+def sortFronts(values):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+    Outputs : (front number of every point, 0 for the non-dominated ones,
+               lexicographic order of the points the fronts were built in)
+    """
+    order = numpy.lexsort((values[:, 1], values[:, 0]))
+    fronts = numpy.zeros(len(values), dtype=numpy.int64)
+
+    # In lexicographic order the last point of a front has its smallest second objective, a point
+    #   joins the first front whose last point does not dominate it, found by bisection
+    last_first, last_second = [], []
+    for index, first, second in zip(order.tolist(), values[order, 0].tolist(), values[order, 1].tolist()):
+        front = bisect.bisect_right(last_second, second)
+        if front > 0 and last_second[front - 1] == second and last_first[front - 1] == first:
+            # Same values as that last point, which does not dominate it
+            front -= 1
+        if front == len(last_second):
+            last_first.append(first)
+            last_second.append(second)
+        else:
+            last_first[front] = first
+            last_second[front] = second
+        fronts[index] = front
+    return fronts, order
+
+
+# Crowding distance of the points of the given fronts, as tools.assignCrowdingDist on each front
+def crowdingDistance(values, fronts, order):
+    """
+    Inputs : values - (N x 2) array of objective values
+             fronts - front number of every point, -1 for points left out
+             order - lexicographic order of the points, from sortFronts
+    Outputs : crowding distance of every point, 0 for the points left out
+    """
+    distances = numpy.zeros(len(values))
+    order = order[fronts[order] >= 0]
+    if len(order) == 0:
+        return distances
+
+    # Points of a front by their first objective, then by their second keeping the previous order
+    #   for ties, which is how assignCrowdingDist sorts its crowd in place
+    for objective in range(values.shape[1]):
+        order = order[numpy.lexsort((values[order, objective], fronts[order]))]
+        front, value = fronts[order], values[order, objective]
+        first = numpy.ones(len(order), dtype=bool)
+        first[1:] = front[1:] != front[:-1]
+        last = numpy.ones(len(order), dtype=bool)
+        last[:-1] = front[1:] != front[:-1]
+
+        segment = numpy.cumsum(first) - 1
+        low = value[first][segment]
+        high = value[last][segment]
+        interior = numpy.flatnonzero(~first & ~last & (high != low))
+        norm = values.shape[1] * (high[interior] - low[interior])
+        distances[order[interior]] += (value[interior + 1] - value[interior - 1]) / norm
+
+        distances[order[first]] = numpy.inf
+        distances[order[last]] = numpy.inf
+    return distances
+
+
+# NSGA-II survivor selection, the same choice as tools.selNSGA2
+def selNSGA2Arrays(values, k):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+             k - number of points to select
+    Outputs : (indices of the selected points, crowding distance of every point)
+    """
+    fronts, order = sortFronts(values)
+
+    # Whole fronts until k points are covered, the last one cut by crowding distance
+    counts = numpy.cumsum(numpy.bincount(fronts))
+    last_front = min(int(numpy.searchsorted(counts, k)), len(counts) - 1)
+    fronts[fronts > last_front] = -1
+    distances = crowdingDistance(values, fronts, order)
+
+    order = order[fronts[order] >= 0]
+    chosen = order[fronts[order] < last_front]
+    last = order[fronts[order] == last_front]
+    last = last[numpy.argsort(-distances[last], kind='stable')]
+    return numpy.concatenate([chosen, last[:k - len(chosen)]]), distances
+
+
+# Binary tournaments on dominance then crowding distance, as tools.selTournamentDCD
+def selTournamentDCDArrays(values, distances, k, rng):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+             distances - crowding distance of every point
+             k - number of points to select, at most N and a multiple of 4 if equal to N
+             rng - numpy random Generator
+    Outputs : indices of the selected points
+    """
+    size = len(values)
+    if k > size:
+        raise ValueError("selTournamentDCDArrays: k must be less than or equal to individuals length")
+    if k == size and k % 4 != 0:
+        raise ValueError("selTournamentDCDArrays: k must be divisible by four if k == len(individuals)")
+
+    # Each group of four picks two tournaments from each of two shuffles of the points
+    shuffle1, shuffle2 = rng.permutation(size), rng.permutation(size)
+    starts = numpy.arange(0, k, 4)
+    contestants1 = numpy.stack([shuffle1[starts], shuffle1[starts + 2],
+                                shuffle2[starts], shuffle2[starts + 2]], axis=1).ravel()
+    contestants2 = numpy.stack([shuffle1[starts + 1], shuffle1[starts + 3],
+                                shuffle2[starts + 1], shuffle2[starts + 3]], axis=1).ravel()
+
+    values1, values2 = values[contestants1], values[contestants2]
+    first_dominates = (values1 <= values2).all(axis=1) & (values1 < values2).any(axis=1)
+    second_dominates = (values2 <= values1).all(axis=1) & (values2 < values1).any(axis=1)
+    distances1, distances2 = distances[contestants1], distances[contestants2]
+
+    first_wins = numpy.where(first_dominates | second_dominates, first_dominates,
+                             numpy.where(distances1 != distances2, distances1 > distances2,
+                                         rng.random(len(contestants1)) <= 0.5))
+    return numpy.where(first_wins, contestants1, contestants2)
+
+
+# Toolbox versions taking and returning individuals
+
+def selNSGA2Biobjective(individuals, k):
+    """
+    Inputs : individuals with two objective fitness, k - number of individuals to select
+    Outputs : list of selected individuals, their crowding_dist set as by tools.selNSGA2
+    """
+    chosen, distances = selNSGA2Arrays(fitnessArray(individuals), k)
+    chosen = chosen.tolist()
+    for index, distance in zip(chosen, distances[chosen].tolist()):
+        individuals[index].fitness.crowding_dist = distance
+    return [individuals[index] for index in chosen]
+
+
+def selTournamentDCDBiobjective(individuals, k, rng):
+    """
+    Inputs : individuals with two objective fitness and crowding_dist, k - number of individuals to select
+             rng - numpy random Generator
+    Outputs : list of selected individuals
+    """
+    distances = numpy.array([ind.fitness.crowding_dist for ind in individuals], dtype=numpy.float64)
+    chosen = selTournamentDCDArrays(fitnessArray(individuals), distances, k, rng)
+    return [individuals[index] for index in chosen.tolist()]
@@ -0,0 +1,82 @@
+import numpy
+
+
+# Non-dominated points of a set of two minimised objectives
+def paretoFront2d(values):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+    Outputs : (M x 2) array of the distinct non-dominated points, by increasing first objective
+    """
+    values = numpy.asarray(values, dtype=numpy.float64).reshape(-1, 2)
+    if len(values) == 0:
+        return values
+    values = values[numpy.lexsort((values[:, 1], values[:, 0]))]
+
+    # A point is kept if its second objective beats every point before it
+    best_before = numpy.minimum.accumulate(values[:, 1])
+    keep = numpy.ones(len(values), dtype=bool)
+    keep[1:] = values[1:, 1] < best_before[:-1]
+    return values[keep]
+
+
+# Area dominated by the points and bounded by the reference point
+def hypervolume2d(values, reference):
+    """
+    Inputs : values - (N x 2) array of objective values, both minimised
+             reference - (2,) point worse than every point of interest, the others are ignored
+    Outputs : hypervolume of the front, 0 if no point is better than the reference
+    """
+    front = paretoFront2d(values)
+    front = front[(front[:, 0] < reference[0]) & (front[:, 1] < reference[1])]
+    if len(front) == 0:
+        return 0.0
+
+    # Slabs between consecutive points of the front along the first objective
+    widths = numpy.diff(numpy.append(front[:, 0], reference[0]))
+    return float(numpy.sum(widths * (reference[1] - front[:, 1])))
+
+
+# Stopping once the hypervolume of the population stops growing
+class HypervolumeStopping(object):
+
+    def __init__(self, threshold=1e-3, window=10, min_generations=0, reference=None, reference_margin=0.1):
+        """
+        Inputs : threshold - relative hypervolume improvement of a generation counted as stalled
+                 window - number of stalled generations in a row after which the run stops
+                 min_generations - generations always run before stopping
+                 reference - (2,) reference point, if None the worst values of the first population
+                             widened by reference_margin times their magnitude
+        """
+        self.threshold = threshold
+        self.window = window
+        self.min_generations = min_generations
+        self.fixed_reference = reference
+        self.reference_margin = reference_margin
+        self.reset()
+
+    def reset(self):
+        self.reference = None if self.fixed_reference is None else numpy.asarray(self.fixed_reference, dtype=float)
+        self.history = []
+        self.stalled = 0
+
+    def update(self, values, gen):
+        """
+        Inputs : values - (N x 2) array of the objective values of the population
+                 gen - generation the population belongs to
+        Outputs : (hypervolume, stop reason or None to carry on)
+        """
+        values = numpy.asarray(values, dtype=numpy.float64).reshape(-1, 2)
+        if self.reference is None:
+            worst = values.max(axis=0)
+            self.reference = worst + self.reference_margin * numpy.abs(worst)
+
+        volume = hypervolume2d(values, self.reference)
+        if self.history:
+            previous = self.history[-1]
+            improvement = (volume - previous) / previous if previous > 0 else numpy.inf
+            self.stalled = self.stalled + 1 if improvement < self.threshold else 0
+        self.history.append(volume)
+
+        if gen >= self.min_generations and self.stalled >= self.window:
+            return volume, f"hypervolume improved less than {self.threshold} for {self.window} generations"
+        return volume, None
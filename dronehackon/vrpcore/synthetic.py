@@ -0,0 +1,51 @@
+import numpy
+
+from .distances import distanceMatrix
+
+# Drone parameters that go with the synthetic instances, in the form the maps view passes them
+SYNTHETIC_DRONE = {'weight': 2.0, 'capacity': 12.0, 'number': 10, 'bat_consum_perkm_perkg': 0.004,
+                   'takeoff_landing': 0.05}
+
+
+# Random instance in the json form the solver loads, the same for the same seed
+def syntheticInstance(num_customers, seed=0, layout="latlong", spread=0.05, max_demand=5, vehicle_capacity=12.0,
+                      chunk_rows=512, with_distances=True):
+    """
+    Inputs : num_customers - number of customers
+             seed - seed of the coordinates and demands
+             layout - "latlong" for the maps view payload, a 'depot' with lat/long and haversine km,
+                      "xy" for the converttext2json output, a 'depart' with x/y and euclidean distances
+             spread - half width of the square the customers are drawn in, degrees or units
+             max_demand - demands are drawn from 1 to max_demand
+             vehicle_capacity - capacity of a vehicle, drone weight included
+             chunk_rows - rows of the distance matrix computed at once
+             with_distances - False leaves the distance matrix out, for the solvers to compute the
+                              distances on demand
+    Outputs : instance dict, its distance_matrix a float64 array
+    """
+    if layout not in ("latlong", "xy"):
+        raise ValueError(f"Unknown layout {layout}, expected latlong or xy")
+    rng = numpy.random.default_rng(seed)
+    if layout == "latlong":
+        center, keys, depot_name = numpy.array([28.6, 77.2]), ('lat', 'long'), 'depot'
+    else:
+        center, keys, depot_name = numpy.array([50.0, 50.0]), ('x', 'y'), 'depart'
+    points = center + rng.uniform(-spread, spread, (num_customers + 1, 2))
+    points[0] = center
+    demands = rng.integers(1, max_demand + 1, num_customers)
+
+    instance = {'instance_name': f"synthetic_{layout}_{num_customers}_seed{seed}",
+                'Number_of_customers': num_customers, 'max_vehicle_number': num_customers,
+                'vehicle_capacity': vehicle_capacity,
+                depot_name: {'coordinates': dict(zip(keys, points[0].tolist())), 'demand': 0}}
+    for customer_id in range(1, num_customers + 1):
+        instance[f"customer_{customer_id}"] = {'coordinates': dict(zip(keys, points[customer_id].tolist())),
+                                               'demand': float(demands[customer_id - 1])}
+
+    if not with_distances:
+        return instance
+
+    # Distances row chunk by row chunk, to keep the temporaries small for thousands of customers
+    metric = "haversine" if layout == "latlong" else "euclidean"
+    instance['distance_matrix'] = distanceMatrix(points, metric, block_rows=chunk_rows)
+    return instance
@@ -0,0 +1,119 @@
+import pickle
+
+import numpy
+import pytest
+
+from vrpcore.distances import DistanceOracle, distanceMatrix, packedDistances, packMatrix, packedOffset, \
+    packedIndex, packedRow, unpackDistances
+from vrpcore.instance import compileInstance
+from vrpcore.synthetic import syntheticInstance
+
+
+@pytest.fixture(params=["euclidean", "haversine"])
+def points(request):
+    rng = numpy.random.default_rng(11)
+    coordinates = numpy.array([28.6, 77.2]) + rng.uniform(-0.05, 0.05, (15, 2))
+    return coordinates, request.param
+
+
+def test_oracle_indexing_matches_the_matrix(points):
+    coordinates, metric = points
+    oracle = DistanceOracle(coordinates, metric, cache_rows=4)
+    matrix = distanceMatrix(coordinates, metric, block_rows=4)
+    rows = numpy.array([0, 3, 14, 3])
+    columns = numpy.array([5, 0, 2, 14])
+
+    assert oracle.shape == matrix.shape and len(oracle) == len(matrix)
+    for i in range(len(matrix)):
+        numpy.testing.assert_allclose(oracle[i], matrix[i], rtol=1e-12)
+        for j in range(len(matrix)):
+            assert oracle[i, j] == pytest.approx(matrix[i, j], rel=1e-12, abs=1e-12)
+            assert oracle.item(i, j) == pytest.approx(matrix[i, j], rel=1e-12, abs=1e-12)
+    numpy.testing.assert_allclose(oracle[-1], matrix[-1], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[2:9], matrix[2:9], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[rows], matrix[rows], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[rows, columns], matrix[rows, columns], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[rows, 1:4], matrix[rows, 1:4], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[1:4, columns], matrix[1:4, columns], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[::3, 2:7], matrix[::3, 2:7], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle[rows[:, None], columns], matrix[rows[:, None], columns], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle.pairs(rows, columns), matrix[rows, columns], rtol=1e-12)
+    numpy.testing.assert_allclose(oracle.pairs(rows[:, None], columns), matrix[rows[:, None], columns],
+                                  rtol=1e-12)
+
+
+def test_oracle_row_cache_and_pickling(points):
+    coordinates, metric = points
+    oracle = DistanceOracle(coordinates, metric, cache_rows=2)
+    for i in (0, 1, 0, 2, 1):
+        oracle[i]
+    assert oracle.counters() == (1, 4)
+    with pytest.raises(ValueError):
+        oracle[0][0] = 1.0
+
+    copy = pickle.loads(pickle.dumps(oracle))
+    assert copy.settings() == oracle.settings()
+    numpy.testing.assert_array_equal(copy[3], oracle[3])
+    with pytest.raises(TypeError):
+        numpy.asarray(oracle)
+
+
+def test_compiled_instance_without_matrix_uses_the_oracle():
+    json_data = syntheticInstance(10, seed=3)
+    dense = compileInstance(json_data)
+    del json_data['distance_matrix']
+    oracle = compileInstance(json_data).distance_matrix
+    assert isinstance(oracle, DistanceOracle)
+    numpy.testing.assert_allclose(oracle[:, :], dense.distance_matrix, rtol=1e-12)
+
+
+# Packed triangle index of (i, j) found by walking the upper triangle row by row
+def walkedIndices(num_points):
+    indices = {}
+    for i in range(num_points):
+        for j in range(i + 1, num_points):
+            indices[i, j] = len(indices)
+    return indices
+
+
+@pytest.mark.parametrize("num_points", [1, 2, 3, 7, 20])
+def test_packed_index_arithmetic(num_points):
+    indices = walkedIndices(num_points)
+    for i in range(num_points):
+        assert packedOffset(i, num_points) == indices.get((i, i + 1), len(indices))
+        for j in range(num_points):
+            if i != j:
+                assert packedIndex(i, j, num_points) == indices[min(i, j), max(i, j)]
+
+    if num_points > 1:
+        rows, columns = numpy.triu_indices(num_points, 1)
+        numpy.testing.assert_array_equal(packedIndex(rows, columns, num_points), numpy.arange(len(indices)))
+        numpy.testing.assert_array_equal(packedIndex(columns, rows, num_points), numpy.arange(len(indices)))
+
+
+# Block sizes that divide the number of points and ones that leave a short last block
+@pytest.mark.parametrize("num_points, block_rows", [(15, 4), (15, 5), (15, 1), (15, 15), (15, 64), (2, 3)])
+def test_packed_distances_unpack_to_the_matrix(points, num_points, block_rows):
+    coordinates, metric = points
+    coordinates = numpy.concatenate([coordinates, coordinates + 0.01])[:num_points]
+    matrix = distanceMatrix(coordinates, metric)
+    packed = packedDistances(coordinates, metric, block_rows=block_rows)
+
+    assert packed.shape == (num_points * (num_points - 1) // 2,)
+    numpy.testing.assert_allclose(unpackDistances(packed, num_points), matrix, rtol=1e-12)
+    numpy.testing.assert_allclose(distanceMatrix(coordinates, metric, block_rows=block_rows), matrix, rtol=1e-12)
+    numpy.testing.assert_array_equal(packMatrix(matrix), packed)
+    for i in range(num_points):
+        numpy.testing.assert_array_equal(packedRow(packed, i, num_points), unpackDistances(packed, num_points)[i])
+
+
+def test_packed_dtypes(points):
+    coordinates, metric = points
+    matrix = distanceMatrix(coordinates, metric)
+    packed = packedDistances(coordinates, metric, dtype=numpy.float32, block_rows=4)
+
+    assert packed.dtype == numpy.float32 and packMatrix(matrix).dtype == numpy.float64
+    numpy.testing.assert_array_equal(packMatrix(matrix, numpy.float32), packed)
+    assert unpackDistances(packed, len(matrix)).dtype == numpy.float32
+    assert packedRow(packed, 3, len(matrix)).dtype == numpy.float32
+    numpy.testing.assert_allclose(unpackDistances(packed, len(matrix), numpy.float64), matrix, rtol=1e-6)
@@ -0,0 +1,89 @@
+import numpy
+import pytest
+
+from vrpcore.distances import packMatrix
+from vrpcore.instance import compileInstance
+from vrpcore.instancefile import saveInstanceFile, readInstanceFile, isInstanceFile, convertJsonInstance
+from vrpcore.synthetic import syntheticInstance
+
+MATRIX_KEYS = {"dense": 'distance_matrix', "packed": 'distance_matrix_packed'}
+
+
+@pytest.fixture(params=["dense", "packed"])
+def layout(request):
+    return request.param
+
+
+@pytest.fixture(params=[numpy.float64, numpy.float32], ids=["float64", "float32"])
+def dtype(request):
+    return request.param
+
+
+# Instance with its full matrix or its packed triangle, and the file it is saved to with the given dtype
+def savedInstance(tmp_path, layout, dtype):
+    instance = syntheticInstance(25, seed=9)
+    instance['instance_name'] = "synthetic"
+    instance['customer_3']['address'] = "Connaught Place"
+    if layout == "packed":
+        instance['distance_matrix_packed'] = packMatrix(instance.pop('distance_matrix'))
+    path = str(tmp_path / "instance.vrpi")
+    saveInstanceFile(instance, path, dtype)
+    return instance, path
+
+
+def test_round_trip_keeps_every_field(tmp_path, layout, dtype):
+    instance, path = savedInstance(tmp_path, layout, dtype)
+    assert isInstanceFile(path)
+    loaded = readInstanceFile(path)
+
+    matrix_key = MATRIX_KEYS[layout]
+    assert set(loaded) == set(instance)
+    for key, value in instance.items():
+        if key != matrix_key:
+            assert loaded[key] == value
+    assert loaded['customer_3']['address'] == "Connaught Place"
+
+    matrix = loaded[matrix_key]
+    assert isinstance(matrix, numpy.memmap) and not matrix.flags.writeable
+    assert matrix.dtype == dtype
+    numpy.testing.assert_array_equal(matrix, numpy.asarray(instance[matrix_key], dtype=dtype))
+
+    in_memory = readInstanceFile(path, mmap=False)[matrix_key]
+    assert not isinstance(in_memory, numpy.memmap)
+    numpy.testing.assert_array_equal(in_memory, matrix)
+
+
+def test_compiled_instance_keeps_the_mapped_matrix(tmp_path, dtype):
+    _, path = savedInstance(tmp_path, "dense", dtype)
+    loaded = readInstanceFile(path)
+
+    # The file's dtype is kept, so the compiled matrix is the map itself and not a copy
+    compiled = compileInstance(loaded)
+    assert compiled.distance_matrix.dtype == dtype
+    assert numpy.shares_memory(compiled.distance_matrix, loaded['distance_matrix'])
+
+    # An explicit dtype still converts it
+    converted = compileInstance(loaded, dtype=numpy.float64 if dtype == numpy.float32 else numpy.float32)
+    assert converted.distance_matrix.dtype != dtype
+    assert not numpy.shares_memory(converted.distance_matrix, loaded['distance_matrix'])
+
+
+def test_json_matrix_compiles_to_float64():
+    instance = syntheticInstance(5, seed=1)
+    instance['distance_matrix'] = instance['distance_matrix'].tolist()
+    assert compileInstance(instance).distance_matrix.dtype == numpy.float64
+    del instance['distance_matrix']
+    assert compileInstance(instance).distance_matrix.dtype == numpy.float64
+
+
+def test_json_instance_converts_to_the_binary_file(tmp_path):
+    json_file = tmp_path / "instance.json"
+    json_file.write_text('{"instance_name": "tiny", "Number_of_customers": 1, "vehicle_capacity": 10, '
+                         '"depart": {"coordinates": {"x": 0, "y": 0}, "demand": 0}, '
+                         '"customer_1": {"coordinates": {"x": 3, "y": 4}, "demand": 2}, '
+                         '"distance_matrix": [[0, 5], [5, 0]]}')
+    path = convertJsonInstance(str(json_file), dtype=numpy.float32)
+    assert path == str(tmp_path / "instance.vrpi")
+    loaded = readInstanceFile(path)
+    assert loaded['customer_1'] == {'coordinates': {'x': 3.0, 'y': 4.0}, 'demand': 2.0}
+    numpy.testing.assert_array_equal(loaded['distance_matrix'], numpy.array([[0, 5], [5, 0]], dtype=numpy.float32))
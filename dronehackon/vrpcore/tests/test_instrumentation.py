@@ -0,0 +1,70 @@
+import pstats
+import tracemalloc
+
+import pytest
+
+from vrpcore import instrumentation
+from vrpcore.instrumentation import PhaseTimer, RunProfiler
+
+
+# Clock that moves on by the given steps, one per perf_counter call
+@pytest.fixture
+def clock(monkeypatch):
+    steps = []
+
+    def perfCounter():
+        clock.now += steps.pop(0)
+        return clock.now
+
+    clock.now = 0.0
+    monkeypatch.setattr(instrumentation.time, 'perf_counter', perfCounter)
+    return steps
+
+
+def test_phase_times_add_up_until_popped(clock):
+    timer = PhaseTimer()
+    clock.extend([0.0, 1.5, 0.0, 0.25, 0.0, 2.0])
+    with timer.phase("evaluate"):
+        pass
+    with timer.phase("select"):
+        pass
+    with timer.phase("evaluate"):
+        pass
+    assert timer.popTimes() == {'time_evaluate': 3.5, 'time_select': 0.25}
+    assert timer.popTimes() == {}
+
+
+def test_phase_is_timed_when_it_raises(clock):
+    timer = PhaseTimer()
+    clock.extend([0.0, 0.5])
+    with pytest.raises(KeyError):
+        with timer.phase("vary"):
+            raise KeyError("route")
+    assert timer.popTimes() == {'time_vary': 0.5}
+
+
+def test_memory_is_recorded_only_while_tracing():
+    timer = PhaseTimer()
+    assert not tracemalloc.is_tracing()
+    assert set(timer.popTimes()) == set()
+    with RunProfiler("tracemalloc"):
+        blocks = [bytearray(1000) for _ in range(100)]
+        times = timer.popTimes()
+    assert set(times) == {'memory_current', 'memory_peak'}
+    assert times['memory_peak'] >= times['memory_current'] >= 100 * 1000
+    assert not tracemalloc.is_tracing()
+    del blocks
+
+
+def test_profilers_dump_their_stats(tmp_path):
+    with RunProfiler("cprofile", str(tmp_path / "run.prof")):
+        sorted(range(1000), key=lambda value: -value)
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+    with RunProfiler("tracemalloc", str(tmp_path / "run.snapshot")):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+    assert tracemalloc.Snapshot.load(str(tmp_path / "run.snapshot")).traces is not None
+
+    with pytest.raises(ValueError):
+        RunProfiler("perf")
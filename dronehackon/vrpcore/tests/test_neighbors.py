@@ -0,0 +1,60 @@
+import numpy
+import pytest
+
+from vrpcore.distances import distanceMatrix
+from vrpcore.neighbors import NeighborIndex
+
+COORDINATE_KEYS = {"euclidean": ('x', 'y'), "haversine": ('lat', 'long')}
+
+
+@pytest.fixture(params=["euclidean", "haversine"])
+def metric(request):
+    return request.param
+
+
+# Uniform points and a few tight clusters, around Delhi for lat/long and on a 100 km square for x/y
+def randomPoints(metric, num_customers, clustered=False, seed=0):
+    rng = numpy.random.default_rng(seed)
+    if clustered:
+        centers = rng.uniform(0, 1, (4, 2))
+        unit = centers[rng.integers(0, 4, num_customers + 1)] + rng.normal(0, 0.01, (num_customers + 1, 2))
+    else:
+        unit = rng.uniform(0, 1, (num_customers + 1, 2))
+    if metric == "haversine":
+        return numpy.array([28.5, 77.0]) + unit * 0.3
+    return unit * 100
+
+
+# Customers of each point by distance, the point itself and the depot left out
+def bruteForceNeighbors(coordinates, metric, k):
+    matrix = distanceMatrix(coordinates, metric)
+    neighbors = []
+    for i in range(len(matrix)):
+        customers = numpy.array([j for j in range(1, len(matrix)) if j != i])
+        order = numpy.argsort(matrix[i, customers], kind='stable')[:k]
+        neighbors.append(customers[order])
+    return numpy.array(neighbors), numpy.take_along_axis(matrix, numpy.array(neighbors), axis=1)
+
+
+@pytest.mark.parametrize("num_customers, k, leaf_size", [(60, 10, 4), (200, 7, 2), (200, 25, 16), (5, 10, 4)])
+@pytest.mark.parametrize("clustered", [False, True])
+def test_neighbors_match_brute_force(metric, num_customers, k, leaf_size, clustered):
+    coordinates = randomPoints(metric, num_customers, clustered, seed=num_customers)
+    index = NeighborIndex(coordinates, COORDINATE_KEYS[metric], k, leaf_size)
+    neighbors, distances = bruteForceNeighbors(coordinates, metric, min(k, num_customers - 1))
+
+    numpy.testing.assert_array_equal(index.neighbors, neighbors)
+    numpy.testing.assert_allclose(index.neighbor_distances, distances, rtol=1e-9)
+    numpy.testing.assert_allclose(index.depot_distance, distanceMatrix(coordinates, metric)[0], rtol=1e-9)
+    numpy.testing.assert_array_equal(index.nearest(3, 2), neighbors[3, :2])
+
+
+def test_query_returns_the_nearest_for_any_k(metric):
+    coordinates = randomPoints(metric, 80, seed=3)
+    index = NeighborIndex(coordinates, COORDINATE_KEYS[metric], num_neighbors=5)
+    point_ids = numpy.array([0, 80, 17, 17])
+    neighbors, _ = bruteForceNeighbors(coordinates, metric, 40)
+
+    found, _ = index.query(point_ids, 40)
+    numpy.testing.assert_array_equal(found, neighbors[point_ids])
+    assert index.query(point_ids, 0)[0].shape == (4, 0)
@@ -0,0 +1,51 @@
+import numpy
+import pytest
+from deap import base, tools
+from deap.tools.emo import assignCrowdingDist
+
+from vrpcore.selection import fitnessArray, sortFronts, crowdingDistance, selNSGA2Biobjective
+
+
+class FitnessMin(base.Fitness):
+    weights = (-1.0, -1.0)
+
+
+class Point(object):
+
+    def __init__(self, values):
+        self.fitness = FitnessMin(values)
+
+
+# Integer objectives give ties and duplicates, like vehicle counts do, continuous ones give none
+def randomPoints(num_points, seed, ties=True):
+    rng = numpy.random.default_rng(seed)
+    if ties:
+        values = numpy.column_stack([rng.integers(1, 6, num_points), rng.integers(0, 12, num_points)])
+    else:
+        values = rng.random((num_points, 2))
+    return [Point(tuple(float(value) for value in row)) for row in values]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fronts_and_crowding_match_deap(seed):
+    points = randomPoints(40, seed)
+    fronts, order = sortFronts(fitnessArray(points))
+    distances = crowdingDistance(fitnessArray(points), fronts, order)
+
+    expected_fronts = tools.sortNondominated(points, len(points))
+    for front_number, front in enumerate(expected_fronts):
+        assignCrowdingDist(front)
+        for point in front:
+            index = next(index for index, other in enumerate(points) if other is point)
+            assert fronts[index] == front_number
+            assert distances[index] == pytest.approx(point.fitness.crowding_dist, rel=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_selection_matches_deap(seed):
+    points = randomPoints(40, seed, ties=False)
+    chosen = {id(point): point.fitness.crowding_dist for point in selNSGA2Biobjective(points, 20)}
+    expected = {id(point): point.fitness.crowding_dist for point in tools.selNSGA2(points, 20)}
+    assert chosen.keys() == expected.keys()
+    for key, distance in expected.items():
+        assert chosen[key] == pytest.approx(distance, rel=1e-12)
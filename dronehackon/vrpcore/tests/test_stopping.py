@@ -0,0 +1,48 @@
+import numpy
+import pytest
+
+from vrpcore.stopping import paretoFront2d, hypervolume2d, HypervolumeStopping
+
+FRONT = [[1.0, 5.0], [2.0, 3.0], [4.0, 1.0]]
+REFERENCE = [5.0, 6.0]
+
+# Slabs of widths 1, 2 and 1 under heights 1, 3 and 5
+FRONT_VOLUME = 1.0 * 1.0 + 2.0 * 3.0 + 1.0 * 5.0
+
+
+def test_hypervolume_of_a_front():
+    assert hypervolume2d(FRONT, REFERENCE) == pytest.approx(FRONT_VOLUME)
+    assert hypervolume2d([[4.0, 5.0]], REFERENCE) == pytest.approx(1.0)
+    assert hypervolume2d(numpy.zeros((0, 2)), REFERENCE) == 0.0
+
+
+def test_dominated_and_out_of_reference_points_add_nothing():
+    # A dominated point, a repeated one, and points on or past the reference in either objective
+    values = FRONT + [[3.0, 4.0], [2.0, 3.0], [6.0, 0.5], [0.5, 7.0], [5.0, 2.0]]
+    assert paretoFront2d(values).tolist() == [[0.5, 7.0], [1.0, 5.0], [2.0, 3.0], [4.0, 1.0], [6.0, 0.5]]
+    assert hypervolume2d(values, REFERENCE) == pytest.approx(FRONT_VOLUME)
+    assert hypervolume2d([[6.0, 0.5], [0.5, 7.0]], REFERENCE) == 0.0
+
+
+def test_stops_after_window_stalled_generations():
+    stopping = HypervolumeStopping(threshold=0.01, window=2, reference=REFERENCE)
+    populations = [[[4.0, 5.0]], [[2.0, 3.0]], FRONT, FRONT, FRONT + [[3.0, 2.999]], FRONT]
+    reasons = [stopping.update(values, gen)[1] for gen, values in enumerate(populations)]
+
+    # Generation 4 improves by less than the threshold, so it is the second stalled one in a row
+    assert reasons[:4] == [None] * 4
+    assert reasons[4] == "hypervolume improved less than 0.01 for 2 generations"
+    assert stopping.history[:3] == pytest.approx([1.0, 9.0, FRONT_VOLUME])
+
+    stopping.reset()
+    assert stopping.update(FRONT, 0) == (pytest.approx(FRONT_VOLUME), None)
+
+
+def test_min_generations_and_default_reference():
+    stopping = HypervolumeStopping(window=1, min_generations=3, reference_margin=0.5)
+    reasons = [stopping.update(FRONT, gen)[1] for gen in range(4)]
+
+    # Stalled from generation 1 on, but only allowed to stop from generation 3
+    assert reasons[:3] == [None] * 3
+    assert reasons[3] is not None
+    assert stopping.reference.tolist() == [6.0, 7.5]
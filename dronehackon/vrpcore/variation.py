@@ -0,0 +1,98 @@
+import numpy
+
+
+# Ordered crossover of many pairs of parents at once, the batched cxOrderedVrp
+def cxOrderedBatch(parents1, parents2, rng):
+    """
+    Inputs : parents1, parents2 - (M x n) integer arrays, row i of both is a pair of permutations
+                                  of the same customer ids
+             rng - numpy random Generator
+    Outputs : (children1, children2) arrays, child 1 takes the cut segment of parent 2 and the
+              rest of parent 1 in its order from the second cut point on, and conversely
+    """
+    num_pairs, size = parents1.shape
+    if num_pairs == 0:
+        return parents1.copy(), parents2.copy()
+
+    # Two distinct cut points per pair, a < b, like random.sample(range(size), 2)
+    a = rng.integers(0, size, num_pairs)
+    b = rng.integers(0, size - 1, num_pairs)
+    b += b >= a
+    a, b = numpy.minimum(a, b), numpy.maximum(a, b)
+
+    # Positions from the second cut point on, the segment comes last
+    positions = (b[:, None] + 1 + numpy.arange(size)) % size
+    in_segment = (numpy.arange(size) >= a[:, None]) & (numpy.arange(size) <= b[:, None])
+
+    return (_orderedChild(parents1, parents2, positions, in_segment),
+            _orderedChild(parents2, parents1, positions, in_segment))
+
+
+def _orderedChild(keep_parent, segment_parent, positions, in_segment):
+    num_pairs, size = keep_parent.shape
+    rows = numpy.arange(num_pairs)[:, None]
+
+    # Customers of the other parent's segment are the holes of this one
+    holes = numpy.zeros((num_pairs, int(keep_parent.max()) + 1), dtype=bool)
+    holes[numpy.broadcast_to(rows, in_segment.shape)[in_segment], segment_parent[in_segment]] = True
+
+    # Customers that are not holes, in order from the second cut point, packed from there on
+    ordered = keep_parent[rows, positions]
+    kept = ~holes[rows, ordered]
+    packed = numpy.cumsum(kept, axis=1) - 1
+    child = numpy.empty_like(keep_parent)
+    kept_rows = numpy.broadcast_to(rows, kept.shape)[kept]
+    child[kept_rows, positions[kept_rows, packed[kept]]] = ordered[kept]
+
+    child[in_segment] = segment_parent[in_segment]
+    return child
+
+
+# Swap mutation of a whole batch, the batched mutationShuffle
+def mutationShuffleBatch(routes, indpb, rng):
+    """
+    Inputs : routes - (N x n) integer array, mutated in place
+             indpb - probability of each position to be swapped with another one
+             rng - numpy random Generator
+    Outputs : (routes, boolean array of the rows that got at least one swap)
+    """
+    num_routes, size = routes.shape
+    if size < 2:
+        return routes, numpy.zeros(num_routes, dtype=bool)
+
+    # Swap partner drawn among the other positions, as random.randint(0, size - 2) shifted past i
+    swap_rows, swap_positions = numpy.nonzero(rng.random((num_routes, size)) < indpb)
+    partners = rng.integers(0, size - 1, len(swap_rows))
+    partners += partners >= swap_positions
+
+    # Swaps of a row are applied one after another from its first position, rows in parallel
+    row_starts = numpy.searchsorted(swap_rows, swap_rows)
+    ranks = numpy.arange(len(swap_rows)) - row_starts
+    for rank in range(int(ranks.max()) + 1 if len(ranks) else 0):
+        selected = ranks == rank
+        rows, first, second = swap_rows[selected], swap_positions[selected], partners[selected]
+        routes[rows, first], routes[rows, second] = routes[rows, second], routes[rows, first]
+
+    changed = numpy.zeros(num_routes, dtype=bool)
+    changed[swap_rows] = True
+    return routes, changed
+
+
+# Crossover of consecutive pairs with probability cross_prob, then swap mutation of every route
+def varyBatch(routes, cross_prob, indpb, rng):
+    """
+    Inputs : routes - (N x n) integer array of the selected parents, rows 2i and 2i + 1 mate
+             cross_prob - probability of a pair to mate
+             indpb - probability of each position to be swapped, see mutationShuffleBatch
+             rng - numpy random Generator
+    Outputs : (offspring array, boolean array of the rows that differ from their parent)
+    """
+    offspring = numpy.array(routes, dtype=numpy.int32)
+    num_pairs = len(offspring) // 2
+
+    mating = numpy.flatnonzero(rng.random(num_pairs) <= cross_prob)
+    first, second = 2 * mating, 2 * mating + 1
+    offspring[first], offspring[second] = cxOrderedBatch(offspring[first], offspring[second], rng)
+
+    offspring, _ = mutationShuffleBatch(offspring, indpb, rng)
+    return offspring, (offspring != routes).any(axis=1)